@@ -1,156 +1,197 @@
 #!/usr/bin/env python3
 
 import sys
-import re
-import random
-
-pat_edge = re.compile(r'^edge\(([a-zA-Z_0-9]+), *([a-zA-Z_0-9]+)\)\.$')
-pat_clue = re.compile(r'^clue\(([a-z_A-Z0-9]+), *([0-9]+)\)\.$')
-pat_cell = re.compile(r'^cell_contains\(([a-z_A-Z0-9]+), *([a-zA-Z_0-9]+), *([a-zA-Z_0-9]+)\)\.$')
-
-def main(fn):
-    edges = {}
-    clues = {}
-    cells = {}
-    cap = {}
-
-    fin = open(fn, 'r')
-    for line in fin:
-        m = pat_edge.match(line.strip())
-        if m is not None:
-            n1 = m.group(1)
-            n2 = m.group(2)
-            e = (n1, n2)
-            assert(e not in edges)
-            edges[e] = []
-            continue
-
-        m = pat_clue.match(line.strip())
-        if m is not None:
-            c = m.group(1)
-            clue = int(m.group(2))
-            assert(c not in clues)
-            clues[c] = clue
-            continue
-
-        m = pat_cell.match(line.strip())
-        if m is not None:
-            c = m.group(1)
-            n1 = m.group(2)
-            n2 = m.group(3)
-            if c not in cells:
-                cells[c] = []
-            cells[c] += [(n1, n2)]
-            continue
-    fin.close()
+import os
+import glob
+import multiprocessing
+
+TOPDIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(TOPDIR))
+from slitherlink import asp
+from slitherlink import compress
+from slitherlink import stats as statsmod
+from slitherlink import catalog as catalogmod
+
+# If stats_fmt is 'table' or 'json', the statistics of the conversion are
+# printed to the standard error output. If sas is set, the grounded task is
+# written instead of the PDDL problem.
+def main(fn, preprocess = False, start_edge = False, compact_names = False,
+         stats_fmt = None, sas = False):
+    fnmap = None
+    if compact_names:
+        fnmap = os.path.basename(compress.stripExt(fn))[:-4] + '.map'
+    stats = None
+    if stats_fmt is not None:
+        stats = statsmod.Stats(fn)
+    ret = asp.convert(fn, sys.stdout, preprocess, start_edge, fnmap, stats, sas)
+    if stats is not None:
+        statsmod.printStats([stats], sys.stderr, stats_fmt)
+    return ret
+
+def _expandInput(inp):
+    if os.path.isdir(inp):
+        fns = []
+        for ext in [''] + compress.EXTS:
+            fns += glob.glob(os.path.join(inp, '*.asp' + ext))
+        return sorted(fns)
+    if glob.has_magic(inp):
+        return sorted(glob.glob(inp))
+    if compress.stripExt(inp).endswith('.asp'):
+        return [inp]
+
+    # Otherwise it is a list of instances such as problems.teamcompetition
+    # with paths relative to the list file
+    topdir = os.path.dirname(inp)
+    out = []
+    with open(inp, 'r') as fin:
+        for line in fin:
+            line = line.strip()
+            if len(line) == 0 or line.startswith('#'):
+                continue
+            out += [os.path.normpath(os.path.join(topdir, line))]
+    return out
+
+def _fileSize(fn):
+    if os.path.isfile(fn):
+        return os.path.getsize(fn)
+    return 0
 
-    for cell, es in cells.items():
-        assert(len(es) == len(set(es)))
-        if cell in clues:
-            cap[cell] = clues[cell]
+def _batchJob(job):
+    fn, fnout, preprocess, start_edge, compact_names, with_stats, sas = job
+    stats = None
+    if with_stats:
+        stats = statsmod.Stats(fn)
+    try:
+        with compress.openFile(fnout, 'w') as fout:
+            fnmap = None
+            if compact_names:
+                fnmap = compress.replaceExt(fnout, '.map')
+            asp.convert(fn, fout, preprocess, start_edge, fnmap, stats, sas)
+    except Exception as e:
+        if os.path.isfile(fnout):
+            os.unlink(fnout)
+        msg = str(e)
+        if len(msg) == 0:
+            msg = type(e).__name__
+        return (fn, fnout, msg, None)
+    return (fn, fnout, None, stats)
+
+# The problems are compressed if ext is .gz, .xz or .zst. If stats_fmt is
+# 'table' or 'json', the statistics of all conversions are printed at the
+# end in the order of the inputs. If catalog is given, the converted
+# problems are added to it, see slitherlink/catalog.py. If sas is set, the
+# grounded tasks are written as NAME.sas instead.
+def batch(num_workers, outdir, inputs, preprocess = False, start_edge = False,
+          compact_names = False, ext = '', stats_fmt = None, catalog = None,
+          sas = False):
+    fns = []
+    for inp in inputs:
+        for fn in _expandInput(inp):
+            if fn not in fns:
+                fns += [fn]
+    if len(fns) == 0:
+        print('Error: No input instances', file = sys.stderr)
+        return -1
+
+    os.makedirs(outdir, exist_ok = True)
+    jobs = []
+    for fn in fns:
+        name = os.path.basename(compress.stripExt(fn))[:-4]
+        fnout = os.path.join(outdir, name + ('.sas' if sas else '.pddl') + ext)
+        jobs += [(fn, fnout, preprocess, start_edge, compact_names,
+                  stats_fmt is not None or catalog is not None, sas)]
+
+    # Schedule the largest instances first so that they do not end up
+    # running alone at the end of the batch
+    sched = sorted(jobs, key = lambda x: -_fileSize(x[0]))
+    results = {}
+    with multiprocessing.Pool(num_workers) as pool:
+        for fn, fnout, err, stats in pool.imap_unordered(_batchJob, sched):
+            results[fn] = (fnout, err, stats)
+
+    failed = 0
+    all_stats = []
+    records = []
+    for job in jobs:
+        fn = job[0]
+        fnout, err, stats = results[fn]
+        if err is None:
+            print(f'OK   {fn} -> {fnout}')
+            if catalog is not None:
+                records += [catalogmod.record(fnout, 'asp-2011', stats.counts,
+                                              preprocess = preprocess,
+                                              start_edge = start_edge,
+                                              seconds = stats.total())]
         else:
-            cap[cell] = len(es)
-
-        for e in es:
-            if e not in edges:
-                n1, n2 = e
-                e = (n2, n1)
-            assert(e in edges)
-            edges[e] += [cell]
-
-    for e, c in edges.items():
-        assert(len(c) in [1,2])
-        if len(c) == 1:
-            n1, n2 = e
-            name = f'outside-cell-{n1}-{n2}'
-            edges[e] += [name]
-            cap[name] = 1
-            cells[name] = [e]
-
-    nodes = []
-    for e in edges.keys():
-        n1, n2 = e
-        nodes += [n1]
-        nodes += [n2]
-    nodes = sorted(list(set(nodes)))
-
-    max_capacity = max(cap.values())
-    capacity = ['cap-{0}'.format(i) for i in range(max_capacity + 1)]
-    capacity_inc = []
-    for i in range(max_capacity):
-        capacity_inc += ['(cell-capacity-inc cap-{0} cap-{1})'.format(i, i + 1)]
-
-    nodeobjs = ['n-{0}'.format(x) for x in nodes]
-    cellobjs = ['c-{0}'.format(x) for x in sorted(cells.keys())]
-    cellcap = []
-    for cname, cp in cap.items():
-        cellcap += [f'(cell-capacity c-{cname} cap-{cp})']
-    cellcap = sorted(cellcap)
-
-    nodefree = []
-    nodegoal = []
-    for n in nodes:
-        nodefree += [f'(node-degree0 n-{n})']
-        nodegoal += [f'(not (node-degree1 n-{n}))']
-    nodefree = sorted(nodefree)
-    nodegoal = sorted(nodegoal)
-
-    not_linked = []
-    cell_edge = []
-    for (n1, n2), (c1, c2) in edges.items():
-        cell_edge += [f'(cell-edge c-{c1} c-{c2} n-{n1} n-{n2})']
-        #not_linked += [f'(not-linked n-{n1} n-{n2})']
-
-    goal_cap = []
-    for c, clue in clues.items():
-        assert(clue <= cap[c])
-        goal_cap += [f'(cell-capacity c-{c} cap-0)']
-
-    capacity = ' '.join(capacity)
-    capacity_inc = '\n    '.join(capacity_inc)
-    nodeobjs = ' '.join(nodeobjs)
-    cellobjs = ' '.join(cellobjs)
-    cellcap = '\n    '.join(cellcap)
-    nodefree = '\n    '.join(nodefree)
-    nodegoal = '\n        '.join(nodegoal)
-    cell_edge = '\n    '.join(cell_edge)
-    not_linked = '\n    '.join(not_linked)
-    goal_cap = '\n        '.join(goal_cap)
-
-    name = fn.split('/')[-1][:-4]
-    s = f'''(define (problem sliterlink-{name})
-(:domain slitherlink)
-
-(:objects
-    {capacity} - cell-capacity-level
-    {nodeobjs} - node
-    {cellobjs} - cell
-)
-
-(:init
-    {capacity_inc}
-
-    {cellcap}
-
-    {nodefree}
-
-    {cell_edge}
-
-    {not_linked}
-)
-(:goal
-    (and
-        {nodegoal}
-
-        {goal_cap}
-    )
-)
-)
-
-
-'''
-    print(s)
+            print(f'FAIL {fn}: {err}')
+            failed += 1
+        if stats is not None and stats_fmt is not None:
+            all_stats += [stats]
+    if catalog is not None:
+        catalog.add(records)
+    print(f'Converted {len(jobs) - failed}/{len(jobs)}, failed {failed}')
+    statsmod.printStats(all_stats, sys.stdout, stats_fmt)
+    if failed > 0:
+        return -1
     return 0
 
 if __name__ == '__main__':
-    sys.exit(main(sys.argv[1]))
+    preprocess = '--preprocess' in sys.argv
+    start_edge = '--start-edge' in sys.argv
+    compact_names = '--compact-names' in sys.argv
+    sas = '--sas' in sys.argv
+    stats_fmt = None
+    if '--stats' in sys.argv:
+        stats_fmt = 'table'
+    if '--stats=json' in sys.argv:
+        stats_fmt = 'json'
+    argv = [x for x in sys.argv
+                if x not in ['--preprocess', '--start-edge', '--compact-names',
+                             '--sas', '--stats', '--stats=json']]
+    ext = ''
+    if '--compress' in argv[:-1]:
+        i = argv.index('--compress')
+        ext = '.' + argv[i + 1].lstrip('.')
+        argv = argv[:i] + argv[i + 2:]
+        if ext not in compress.EXTS:
+            print(f'Error: Unknown compression {ext}', file = sys.stderr)
+            sys.exit(-1)
+        if ext == '.zst' and compress.zstandard is None:
+            print('Error: The zstandard module is needed for zst', file = sys.stderr)
+            sys.exit(-1)
+    catalog = None
+    if '--catalog' in argv[:-1]:
+        i = argv.index('--catalog')
+        catalog = catalogmod.Catalog(argv[i + 1])
+        argv = argv[:i] + argv[i + 2:]
+    if len(argv) == 2:
+        sys.exit(main(argv[1], preprocess, start_edge, compact_names, stats_fmt,
+                      sas))
+
+    if len(argv) >= 5 and argv[1] == 'batch':
+        sys.exit(batch(int(argv[2]), argv[3], argv[4:], preprocess, start_edge,
+                       compact_names, ext, stats_fmt, catalog, sas))
+
+    print('Usage: {0} [--preprocess] [--start-edge] [--compact-names] [--sas] [--stats[=json]] problem.asp'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} [--preprocess] [--start-edge] [--compact-names] [--sas] [--stats[=json]] [--compress gz|xz|zst] [--catalog catalog.db] batch num-workers outdir input [input ...]'.format(sys.argv[0]), file = sys.stderr)
+    print('', file = sys.stderr)
+    print('input is a directory, a glob pattern, an .asp file or a list of .asp files', file = sys.stderr)
+    print('such as problems.teamcompetition', file = sys.stderr)
+    print('--preprocess drops the cell-edge facts of edges that cannot be on the loop', file = sys.stderr)
+    print('and pre-links the edges that must be on it.', file = sys.stderr)
+    print('--start-edge links an edge certain to be on the loop and disables link-0-0.', file = sys.stderr)
+    print('--compact-names gives nodes and cells short names and writes the map to the', file = sys.stderr)
+    print('original names to NAME.map next to NAME.pddl, or to the current directory', file = sys.stderr)
+    print('when a single problem is written to the standard output.', file = sys.stderr)
+    print('--sas writes the grounded task in the format of the Fast Downward', file = sys.stderr)
+    print('translator (NAME.sas) instead of the PDDL problem, so planners can skip', file = sys.stderr)
+    print('translating and grounding domain.pddl.', file = sys.stderr)
+    print('--compress writes the problems (and maps) of batch compressed as NAME.pddl.gz,', file = sys.stderr)
+    print('NAME.pddl.xz or NAME.pddl.zst. Inputs may be compressed in the same way.', file = sys.stderr)
+    print('--stats prints the time of every phase of the conversion and the counts of', file = sys.stderr)
+    print('objects, capacity levels and groundings of the link actions as a table,', file = sys.stderr)
+    print('--stats=json as JSON lines (to the standard error output for a single', file = sys.stderr)
+    print('problem, after the report of batch).', file = sys.stderr)
+    print('--catalog records the counts, source, hash and conversion time of every', file = sys.stderr)
+    print('problem of batch in an SQLite catalog, see query-catalog.py.', file = sys.stderr)
+    sys.exit(-1)
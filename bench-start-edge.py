@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import signal
+import subprocess
+import time
+
+TOPDIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, TOPDIR)
+from slitherlink import validate
+from slitherlink import compress
+
+# Returns the number of groundings of each link action that are reachable
+# in the delete relaxation of the task, which is what a grounding planner
+# instantiates. Negative preconditions are ignored except for
+# (disable-link-0-0) which is static once it holds in the initial state.
+def groundActions(task):
+    degree = [set([d]) if d >= 0 else set() for d in task.degree]
+    cap = [set([c]) if c >= 0 else set() for c in task.cap]
+    actions = [(a, b) for a in [0, 1] for b in [0, 1]]
+    if task.disabled:
+        actions.remove((0, 0))
+
+    changed = True
+    while changed:
+        changed = False
+        for (n1, n2), e in task.edges.items():
+            c1 = task.edge_cells[2 * e]
+            c2 = task.edge_cells[2 * e + 1]
+            if max(cap[c1], default = 0) < 1 or max(cap[c2], default = 0) < 1:
+                continue
+            for a, b in actions:
+                if a not in degree[n1] or b not in degree[n2]:
+                    continue
+                for n, d in [(n1, a + 1), (n2, b + 1)]:
+                    if d not in degree[n]:
+                        degree[n].add(d)
+                        changed = True
+                for c in [c1, c2]:
+                    lvl = min(cap[c]) - 1
+                    if lvl >= 0 and lvl not in cap[c]:
+                        cap[c].add(lvl)
+                        changed = True
+
+    count = {f'link-{a}-{b}' : 0 for a, b in actions}
+    for (n1, n2), e in task.edges.items():
+        c1 = task.edge_cells[2 * e]
+        c2 = task.edge_cells[2 * e + 1]
+        num_cap = len([x for x in cap[c1] if x > 0]) \
+                    * len([x for x in cap[c2] if x > 0])
+        for a, b in actions:
+            if a in degree[n1] and b in degree[n2]:
+                count[f'link-{a}-{b}'] += num_cap
+    return count
+
+# Runs the planner command with the domain and the problem appended,
+# returns the wall-clock time, 'failed', or 'timeout' if it ran longer than
+# time_limit seconds. The planner runs in its own session, so everything it
+# started is killed on timeout. Compressed problems are decompressed before
+# the clock starts.
+def runPlanner(planner, fn, time_limit = None):
+    domain = os.path.join(TOPDIR, 'domain.pddl')
+    with compress.plainFile(fn) as plain:
+        t = time.time()
+        p = subprocess.Popen(f'{planner} {domain} {plain}', shell = True,
+                             stdout = subprocess.DEVNULL,
+                             stderr = subprocess.DEVNULL,
+                             start_new_session = True)
+        try:
+            p.wait(timeout = time_limit)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(p.pid, signal.SIGKILL)
+            except OSError:
+                pass
+            p.wait()
+            return 'timeout'
+        t = time.time() - t
+    if p.returncode != 0:
+        return 'failed'
+    return t
+
+def _fmtTime(t):
+    if type(t) is str:
+        return t
+    if t is None:
+        return '-'
+    return f'{t:.2f}s'
+
+# Planner times are summed only over the problems solved with and without
+# start edges, so a problem solved by one variant only does not count
+# against it
+def main(base_dir, start_dir, planner = None, time_limit = None):
+    names = sorted([x for x in os.listdir(base_dir)
+                        if compress.stripExt(x).endswith('.pddl')
+                        and os.path.isfile(os.path.join(start_dir, x))])
+    if len(names) == 0:
+        print('Error: No problems found in both directories', file = sys.stderr)
+        return -1
+
+    total = [0, 0]
+    times = [0., 0.]
+    solved = [0, 0]
+    timeout = [0, 0]
+    both = 0
+    print('{0:40} {1:>10} {2:>10} {3:>8} {4:>9} {5:>9}'.format(
+            'problem', 'base', 'start', 'ratio', 'base-t', 'start-t'))
+    for name in names:
+        row = []
+        for i, d in enumerate([base_dir, start_dir]):
+            fn = os.path.join(d, name)
+            with compress.openFile(fn, 'r') as fin:
+                task = validate.loadPddl(fin)
+            num = sum(groundActions(task).values())
+            total[i] += num
+            t = None
+            if planner is not None:
+                t = runPlanner(planner, fn, time_limit)
+                if t == 'timeout':
+                    timeout[i] += 1
+                elif t != 'failed':
+                    solved[i] += 1
+            row += [num, t]
+        if planner is not None and type(row[1]) is float and type(row[3]) is float:
+            both += 1
+            times[0] += row[1]
+            times[1] += row[3]
+        print('{0:40} {1:>10} {2:>10} {3:>8.3f} {4:>9} {5:>9}'.format(
+                name, row[0], row[2], row[2] / max(row[0], 1),
+                _fmtTime(row[1]), _fmtTime(row[3])))
+
+    print('{0:40} {1:>10} {2:>10} {3:>8.3f}'.format(
+            'total', total[0], total[1], total[1] / max(total[0], 1)))
+    if planner is not None:
+        print('Solved: base {0}/{2} ({3} timeouts), start {1}/{2} ({4} timeouts)'.format(
+                solved[0], solved[1], len(names), timeout[0], timeout[1]))
+        print('Planner time on the {0} problems solved by both: base {1:.2f}s, start {2:.2f}s'.format(
+                both, times[0], times[1]))
+    return 0
+
+if __name__ == '__main__':
+    argv = sys.argv
+    time_limit = None
+    if '--time-limit' in argv[:-1]:
+        i = argv.index('--time-limit')
+        time_limit = float(argv[i + 1])
+        argv = argv[:i] + argv[i + 2:]
+    if len(argv) in [3, 4]:
+        sys.exit(main(*argv[1:], time_limit = time_limit))
+
+    print('Usage: {0} [--time-limit S] base-dir start-dir [planner]'.format(sys.argv[0]), file = sys.stderr)
+    print('', file = sys.stderr)
+    print('Compares the problems NAME.pddl present in both directories, e.g., written', file = sys.stderr)
+    print('by asp-to-pddl.py batch without and with --start-edge: the number of', file = sys.stderr)
+    print('link actions reachable in the delete relaxation and, if a planner command', file = sys.stderr)
+    print('is given, its running time. The planner is run as', file = sys.stderr)
+    print('"planner domain.pddl problem.pddl" and killed after --time-limit seconds.', file = sys.stderr)
+    print('The times are summed over the problems solved in both directories.', file = sys.stderr)
+    sys.exit(-1)
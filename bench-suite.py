@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import io
+import glob
+import json
+import random
+import time
+import fnmatch
+import platform
+import resource
+import tempfile
+import subprocess
+import importlib.util
+
+TOPDIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, TOPDIR)
+from slitherlink import asp
+from slitherlink import pddl
+from slitherlink import grid
+from slitherlink import synth
+from slitherlink import solver
+
+# Sizes of the synthetic grids converted by Prob, numbers of puzzles of the
+# gen-parallel cases (all of them PARALLEL_SIZE x PARALLEL_SIZE), and sizes
+# of the loops chained by _chainPlan and drawn by plan-to-ascii.py
+GRID_SIZES = [5, 10, 25, 50, 100, 200]
+PARALLEL = [1, 2, 4, 8, 16, 32]
+PARALLEL_SIZE = 10
+LOOP_SIZES = [50, 100, 200, 400]
+
+# Differences of the time and of the peak RSS below these limits are never
+# reported as regressions, they are mostly noise
+MIN_TIME_DIFF = 0.02
+MIN_RSS_DIFF_KB = 2048
+
+def _loadScript(name, fn):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(TOPDIR, fn))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+# Returns the list of cases (name, kind, args)
+def allCases():
+    cases = []
+    for fn in sorted(glob.glob(os.path.join(TOPDIR, 'asp-2011', '*.asp'))):
+        name = os.path.basename(fn)[:-4]
+        cases += [(f'asp/{name}', 'asp', [fn])]
+    for n in GRID_SIZES:
+        cases += [(f'gen/{n}x{n}', 'gen', [n, n, 1])]
+    for num in PARALLEL:
+        n = PARALLEL_SIZE
+        cases += [(f'gen-parallel/{num}x{n}x{n}', 'gen', [n, n, num])]
+    for n in LOOP_SIZES:
+        cases += [(f'chain/{n}x{n}', 'chain', [n])]
+    for n in LOOP_SIZES:
+        cases += [(f'plan-to-ascii/{n}x{n}', 'ascii', [n])]
+    for fn in sorted(glob.glob(os.path.join(TOPDIR, 'puzzles', '*.txt'))):
+        name = os.path.basename(fn)[:-4]
+        cases += [(f'solve/{name}', 'solve', [fn])]
+    return cases
+
+def selectCases(patterns):
+    cases = allCases()
+    if len(patterns) == 0:
+        return cases
+    return [c for c in cases
+                if any([fnmatch.fnmatch(c[0], p) for p in patterns])]
+
+# Returns the objects and the facts of the initial state of the problem
+def _countProblem(fn):
+    with open(fn, 'r') as fin:
+        parsed = pddl.parseProblem(fin.read())
+    return {'objects' : len(parsed.objects), 'facts' : len(parsed.init)}
+
+# Every case returns (phases, counts): the time of each of its phases and
+# the sizes of its input and output. Only the phases are timed.
+def _caseAsp(fn):
+    with tempfile.TemporaryDirectory(prefix = 'slitherlink-') as tmpdir:
+        fnout = os.path.join(tmpdir, 'prob.pddl')
+        t = time.perf_counter()
+        with open(fnout, 'w') as fout:
+            asp.convert(fn, fout)
+        phases = {'convert' : time.perf_counter() - t}
+        counts = {'bytes' : os.path.getsize(fnout)}
+        counts.update(_countProblem(fnout))
+    return phases, counts
+
+def _caseGen(rows, cols, num):
+    gen = _loadScript('generate_pddl', 'generator-solver/generate-pddl.py')
+    puzzles = [synth.randomPuzzle(rows, cols, seed = i) for i in range(num)]
+    # The name of the problem is random, its length must not change the size
+    # of the output
+    random.seed(0)
+
+    t = time.perf_counter()
+    prob = gen.Prob(use_start_edge = (num > 1))
+    for puzzle, solution in puzzles:
+        prob.add(puzzle, solution)
+    t2 = time.perf_counter()
+    text = prob.toPddl()
+    t3 = time.perf_counter()
+    phases = {'add' : t2 - t, 'to-pddl' : t3 - t2}
+
+    parsed = pddl.parseProblem(text)
+    counts = {'bytes' : len(text.encode('utf-8')),
+              'objects' : len(parsed.objects), 'facts' : len(parsed.init)}
+    return phases, counts
+
+def _caseChain(n):
+    gen = _loadScript('generate_pddl', 'generator-solver/generate-pddl.py')
+    puzzle, solution = synth.randomPuzzle(n, n)
+    edges = gen.solutionEdges(solution)
+
+    prob = gen.Prob()
+    t = time.perf_counter()
+    plan = prob._chainPlan(edges)
+    phases = {'chain' : time.perf_counter() - t}
+    return phases, {'objects' : len(plan)}
+
+# The plan links the edges of the loop in the order of the chain, the
+# capacities of the cells are not tracked
+def _writePlan(fout, g, plan):
+    degree = {}
+    for n1, n2 in plan:
+        d1 = degree.get(n1, 0)
+        d2 = degree.get(n2, 0)
+        c1, c2 = g.edgeCells(g.edge(n1, n2))
+        fout.write('(link-{0}-{1} n-{2}-{3} n-{4}-{5} {6} cap-1 cap-0 {7} cap-1 cap-0)\n'.format(
+                    d1, d2, n1[0], n1[1], n2[0], n2[1],
+                    g.cellName(c1), g.cellName(c2)))
+        degree[n1] = d1 + 1
+        degree[n2] = d2 + 1
+    fout.write('; cost = {0} (unit cost)\n'.format(len(plan)))
+
+def _caseAscii(n):
+    gen = _loadScript('generate_pddl', 'generator-solver/generate-pddl.py')
+    p2a = _loadScript('plan_to_ascii', 'generator-solver/plan-to-ascii.py')
+    puzzle, solution = synth.randomPuzzle(n, n)
+    plan = gen.chainPlan(gen.solutionEdges(solution))
+
+    with tempfile.TemporaryDirectory(prefix = 'slitherlink-') as tmpdir:
+        fnplan = os.path.join(tmpdir, 'sas_plan')
+        with open(fnplan, 'w') as fout:
+            _writePlan(fout, grid.Grid(n, n), plan)
+
+        out = io.StringIO()
+        stdout = sys.stdout
+        sys.stdout = out
+        try:
+            t = time.perf_counter()
+            p2a.main(fnplan)
+            phases = {'plan-to-ascii' : time.perf_counter() - t}
+        finally:
+            sys.stdout = stdout
+    return phases, {'objects' : len(plan), 'bytes' : len(out.getvalue())}
+
+# Solves a unique puzzle of puzzles/ with the native solver
+def _caseSolve(fn):
+    with open(fn, 'r') as fin:
+        puzzle = [line.strip() for line in fin if line.strip() != '']
+    t = time.perf_counter()
+    text = solver.solveGrid(puzzle)
+    phases = {'solve' : time.perf_counter() - t}
+    edges = 0 if text is None else text.count('-') + text.count('|')
+    return phases, {'objects' : edges}
+
+_CASES = {'asp' : _caseAsp, 'gen' : _caseGen, 'chain' : _caseChain,
+          'ascii' : _caseAscii, 'solve' : _caseSolve}
+
+# Runs the case in this process and prints its result as JSON. The peak RSS
+# is that of the whole process.
+def runCase(name):
+    found = [c for c in allCases() if c[0] == name]
+    if len(found) == 0:
+        print(f'Error: Unknown case {name}', file = sys.stderr)
+        return -1
+    _, kind, args = found[0]
+    phases, counts = _CASES[kind](*args)
+    res = {'name' : name,
+           'time' : sum(phases.values()),
+           'phases' : phases,
+           'rss_kb' : resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+           'counts' : counts}
+    print(json.dumps(res))
+    return 0
+
+# Every case is run in a fresh process so that its peak RSS is not
+# inflated by the previous cases. With repeat > 1, the minimal time and
+# RSS of the runs are kept.
+def _measure(name, repeat):
+    best = None
+    for _ in range(repeat):
+        p = subprocess.run([sys.executable, os.path.realpath(__file__),
+                            '_case', name],
+                           stdout = subprocess.PIPE, universal_newlines = True)
+        if p.returncode != 0:
+            return None
+        res = json.loads(p.stdout)
+        if best is None:
+            best = res
+            continue
+        if res['time'] < best['time']:
+            best['time'] = res['time']
+            best['phases'] = res['phases']
+        best['rss_kb'] = min(best['rss_kb'], res['rss_kb'])
+    return best
+
+def _printHeader(with_base):
+    line = '{0:45} {1:>10} {2:>10} {3:>12}'.format('case', 'time', 'peak-rss', 'bytes')
+    if with_base:
+        line += ' {0:>8} {1:>8}'.format('time', 'rss')
+    print(line)
+
+def _printRow(res, base = None):
+    line = '{0:45} {1:>9.3f}s {2:>8.1f}MB {3:>12}'.format(
+            res['name'], res['time'], res['rss_kb'] / 1024.,
+            res['counts'].get('bytes', '-'))
+    if base is not None:
+        line += ' {0:>7.2f}x {1:>7.2f}x'.format(
+                    res['time'] / max(base['time'], 1e-9),
+                    res['rss_kb'] / max(base['rss_kb'], 1))
+    print(line)
+
+# Returns the list of regressions of the results with respect to the
+# baseline. Changed counts are reported as warnings.
+def compare(base, results, threshold):
+    base = {r['name'] : r for r in base['cases']}
+    regressions = []
+    for res in results['cases']:
+        b = base.get(res['name'])
+        if b is None:
+            continue
+        if res['time'] > b['time'] * (1. + threshold) \
+                and res['time'] - b['time'] > MIN_TIME_DIFF:
+            regressions += ['{0}: time {1:.3f}s -> {2:.3f}s'.format(
+                                res['name'], b['time'], res['time'])]
+        if res['rss_kb'] > b['rss_kb'] * (1. + threshold) \
+                and res['rss_kb'] - b['rss_kb'] > MIN_RSS_DIFF_KB:
+            regressions += ['{0}: peak RSS {1:.1f}MB -> {2:.1f}MB'.format(
+                                res['name'], b['rss_kb'] / 1024.,
+                                res['rss_kb'] / 1024.)]
+        if res['counts'] != b['counts']:
+            print('Warning: {0}: counts changed from {1} to {2}'.format(
+                    res['name'], b['counts'], res['counts']), file = sys.stderr)
+    return regressions
+
+def _printRegressions(regressions, threshold):
+    for r in regressions:
+        print(f'REGRESSION {r}')
+    print('{0} regressions (threshold {1:.0f}%)'.format(
+            len(regressions), 100 * threshold))
+
+def run(fnout, patterns, fnbase = None, threshold = 0.2, repeat = 1):
+    cases = selectCases(patterns)
+    if len(cases) == 0:
+        print('Error: No cases selected', file = sys.stderr)
+        return -1
+
+    base_cases = {}
+    if fnbase is not None:
+        with open(fnbase, 'r') as fin:
+            base = json.load(fin)
+        base_cases = {r['name'] : r for r in base['cases']}
+
+    results = {'python' : platform.python_version(),
+               'machine' : platform.machine(),
+               'date' : time.strftime('%Y-%m-%d %H:%M:%S'),
+               'cases' : []}
+    failed = 0
+    _printHeader(fnbase is not None)
+    for name, _, _ in cases:
+        res = _measure(name, repeat)
+        if res is None:
+            print(f'FAIL {name}', file = sys.stderr)
+            failed += 1
+            continue
+        results['cases'] += [res]
+        _printRow(res, base_cases.get(name))
+
+    with open(fnout, 'w') as fout:
+        json.dump(results, fout, indent = 1)
+        fout.write('\n')
+
+    ret = 0
+    if failed > 0:
+        print(f'Error: {failed} cases failed', file = sys.stderr)
+        ret = -1
+    if fnbase is not None:
+        regressions = compare(base, results, threshold)
+        _printRegressions(regressions, threshold)
+        if len(regressions) > 0:
+            ret = -1
+    return ret
+
+def compareFiles(fnbase, fnres, threshold = 0.2):
+    with open(fnbase, 'r') as fin:
+        base = json.load(fin)
+    with open(fnres, 'r') as fin:
+        results = json.load(fin)
+    base_cases = {r['name'] : r for r in base['cases']}
+    _printHeader(True)
+    for res in results['cases']:
+        if res['name'] in base_cases:
+            _printRow(res, base_cases[res['name']])
+    regressions = compare(base, results, threshold)
+    _printRegressions(regressions, threshold)
+    if len(regressions) > 0:
+        return -1
+    return 0
+
+# Removes the option with its value from argv, returns (value, argv)
+def _option(argv, name, default = None):
+    if name not in argv[:-1]:
+        return default, argv
+    i = argv.index(name)
+    return argv[i + 1], argv[:i] + argv[i + 2:]
+
+def usage():
+    print('Usage: {0} [--baseline base.json] [--threshold 0.2] [--repeat N] run results.json [case-pattern ...]'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} [--threshold 0.2] compare base.json results.json'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} list [case-pattern ...]'.format(sys.argv[0]), file = sys.stderr)
+    print('', file = sys.stderr)
+    print('Measures the wall-clock time, the peak RSS, the numbers of objects and', file = sys.stderr)
+    print('facts, and the size of the output of the converters: asp-to-pddl on', file = sys.stderr)
+    print('asp-2011/*.asp, Prob.add() and Prob.toPddl() of generate-pddl.py on', file = sys.stderr)
+    print('synthetic puzzles (gen/ and gen-parallel/), and _chainPlan() and', file = sys.stderr)
+    print('plan-to-ascii.py on synthetic loops. Every case runs in its own process.', file = sys.stderr)
+    print('Cases are selected by glob patterns, e.g., "gen/*".', file = sys.stderr)
+    print('', file = sys.stderr)
+    print('The results are written as JSON. If a baseline written by an earlier run', file = sys.stderr)
+    print('is given, the cases slower or larger by more than the threshold are', file = sys.stderr)
+    print('reported as regressions and the exit code is non-zero.', file = sys.stderr)
+    sys.exit(-1)
+
+if __name__ == '__main__':
+    argv = sys.argv
+    fnbase, argv = _option(argv, '--baseline')
+    threshold, argv = _option(argv, '--threshold', '0.2')
+    repeat, argv = _option(argv, '--repeat', '1')
+    threshold = float(threshold)
+
+    if len(argv) == 3 and argv[1] == '_case':
+        sys.exit(runCase(argv[2]))
+    if len(argv) >= 3 and argv[1] == 'run':
+        sys.exit(run(argv[2], argv[3:], fnbase, threshold, int(repeat)))
+    if len(argv) == 4 and argv[1] == 'compare':
+        sys.exit(compareFiles(argv[2], argv[3], threshold))
+    if len(argv) >= 2 and argv[1] == 'list':
+        for name, _, _ in selectCases(argv[2:]):
+            print(name)
+        sys.exit(0)
+    usage()
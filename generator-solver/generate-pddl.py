@@ -8,127 +8,47 @@
 
 import sys
 import os
-import random
-import copy
+import json
+import time
+import concurrent.futures
 
 TOPDIR = os.path.dirname(os.path.realpath(__file__))
-
+sys.path.insert(0, os.path.dirname(TOPDIR))
+from slitherlink import pddl
+from slitherlink import loop
+from slitherlink import graph
+from slitherlink import cache as cachemod
+from slitherlink import solver
+from slitherlink import compress
+from slitherlink import stats as statsmod
+from slitherlink import dedup
+from slitherlink import corpus as corpusmod
+from slitherlink import puzzleloop
+from slitherlink import catalog as catalogmod
+from slitherlink import split as splitmod
+from slitherlink import sas as sasmod
+from slitherlink import validate
+from slitherlink.generator import Prob, solutionEdges, chainPlan, runSolve, \
+        writeProblem, writePlan, writeGridHeader, _fromCache, _toCache
+
+# Solves the puzzle stored in the file fn with the native solver and
+# returns the solution with the smallest number of edges as an ASCII grid
+# ('+' on every node, '-' and '|' for the edges of the loop). If there is no
+# solution, the grid contains only the clues.
 def solveCP(fn):
-    cols = 0
-    rows = 0
-    clues = {}
+    puzzle = []
     with open(fn, 'r') as fin:
-        for row, line in enumerate(fin):
+        for line in fin:
             line = line.strip()
             if len(line) == 0:
                 break
+            puzzle += [line]
 
-            rows += 1
-            for col, c in enumerate(line):
-                cols = max(cols, col + 1)
-                if c != '.':
-                    clues[(row, col)] = int(c)
-
-    from docplex.cp.model import CpoModel
-    m = CpoModel()
-
-    edge = []
-    horizontal = []
-    for row in range(rows + 1):
-        hr = []
-        for col in range(cols):
-            v = m.binary_var(f'he-{row}-{col}')
-            edge += [v]
-            hr += [v]
-        horizontal += [hr]
-
-    vertical = []
-    for row in range(rows):
-        r = []
-        for col in range(cols + 1):
-            v = m.binary_var(f've-{row}-{col}')
-            edge += [v]
-            r += [v]
-        vertical += [r]
-
-    for row in range(rows):
-        for col in range(cols):
-            if (row, col) in clues:
-                clue = clues[(row, col)]
-                top = horizontal[row][col]
-                bottom = horizontal[row + 1][col]
-                left = vertical[row][col]
-                right = vertical[row][col + 1]
-                m.add(top + bottom + left + right == clue)
-
-    for col in range(1, cols):
-        left = horizontal[0][col - 1]
-        right = horizontal[0][col]
-        bottom = vertical[0][col]
-        m.add((left + right + bottom) != 3)
-        m.add((left + right + bottom) != 1)
-
-        left = horizontal[rows][col - 1]
-        right = horizontal[rows][col]
-        top = vertical[rows - 1][col]
-        m.add((left + right + top) != 3)
-        m.add((left + right + top) != 1)
-
-    for row in range(1, rows):
-        up = vertical[row - 1][0]
-        down = vertical[row][0]
-        right = horizontal[row][0]
-        m.add((up + down + right) != 3)
-        m.add((up + down + right) != 1)
-
-        up = vertical[row - 1][cols]
-        down = vertical[row][cols]
-        left = horizontal[row][cols - 1]
-        m.add(up + down + left != 3)
-        m.add(up + down + left != 1)
-
-    m.add(horizontal[0][0] + vertical[0][0] != 1)
-    m.add(horizontal[0][cols - 1] + vertical[0][cols] != 1)
-    m.add(horizontal[rows][0] + vertical[rows - 1][0] != 1)
-    m.add(horizontal[rows][cols - 1] + vertical[rows - 1][cols] != 1)
-    for row in range(1, rows):
-        for col in range(1, cols):
-            up = vertical[row - 1][col]
-            down = vertical[row][col]
-            left = horizontal[row][col - 1]
-            right = horizontal[row][col]
-            m.add(up + down + left + right != 4)
-            m.add(up + down + left + right != 3)
-            m.add(up + down + left + right != 1)
-
-    m.minimize(m.sum(edge))
-
-    sol = m.solve()
-
-    grid = [[' ' for _ in range(2 * cols + 1)] for __ in range(2 * rows + 1)]
-    for r in range(rows + 1):
-        for c in range(cols + 1):
-            grid[2 * r][2 * c] = '+'
-    for (r, c), v in clues.items():
-        grid[2 * r + 1][2 * c + 1] = str(v)
-
-    if sol:
-        for ri, row in enumerate(horizontal):
-            for ci, e in enumerate(row):
-                if sol[e] > 0:
-                    grid[2 * ri][2 * ci + 1] = '-'
-        for ri, col in enumerate(vertical):
-            for ci, e in enumerate(col):
-                if sol[e] > 0:
-                    grid[2 * ri + 1][2 * ci] = '|'
-
-    s = ''
-    for row in grid:
-        for c in row:
-            s += c
-        s += '\n'
-    return s
-
+    sol = solver.solveGrid(puzzle, minimize = True)
+    if sol is None:
+        _, g, clues = solver.gridSolver(puzzle)
+        sol = solver.gridToAscii(g, clues, [])
+    return sol
 
 
 # Only works against the "old version" of the website, since the new version
@@ -181,412 +101,659 @@ def get_puzzle(page_url):
 
     return row_specs
 
-class Prob(object):
-    def __init__(self, use_start_edge = False):
-        self.use_start_edge = use_start_edge
-        self.puzzles = []
-        self.solutions = []
-        self.capacity = [f'cap-{i}' for i in range(5)]
-        self.capacity_inc = []
-        for i in range(4):
-            self.capacity_inc += ['(CELL-CAPACITY-INC cap-{0} cap-{1})'.format(i, i + 1)]
-
-        self.nodes = []
-        self.cells = []
-        self.cell_capacity = []
-        self.node_degree0 = []
-        self.cell_edge = []
-        self.nodegoal = []
-        self.goal_cap = []
-        self.linked = []
-
-        self.plans = []
-
-    def _chainPlan(self, plan):
-        out = [plan[0]]
-        nxt = plan[0][1]
-        while len(out) != len(plan):
-            found = False
-            for step in plan:
-                if step in out:
-                    continue
-                if nxt == step[0]:
-                    out += [step]
-                    nxt = step[1]
-                    found = True
-                    break
-                elif nxt == step[1]:
-                    out += [step]
-                    nxt = step[0]
-                    found = True
-                    break
-            if not found:
-                print('PLAN IS INVALID!', file = sys.stderr)
-                print(plan)
-                sys.exit(-1)
-        return out
-
-    def add(self, puzzle, solution):
-        IDX = ''
-        if len(self.puzzles) > 0:
-            IDX = str(len(self.puzzles))
-
-        self.puzzles += [copy.deepcopy(puzzle)]
-        self.solutions += [copy.deepcopy(solution)]
-
-        rows = len(puzzle)
-        cols = len(puzzle[0])
-
-        plan = []
-        for ri, srow in enumerate(solution):
-            if ri % 2 == 0:
-                for i in range(1, len(srow), 2):
-                    if srow[i] == '-':
-                        plan += [((ri // 2, i // 2), (ri // 2, i // 2 + 1))]
-            else:
-                for i in range(0, len(srow) + 1, 2):
-                    if srow[i] == '|':
-                        plan += [((ri // 2, i // 2), (ri // 2 + 1, i // 2))]
-        plan = self._chainPlan(plan)
-        self.plans += [plan]
-
-        start_edge = ['', '']
-        if self.use_start_edge:
-            start_edge = [f'n{IDX}-{{0}}-{{1}}'.format(plan[0][0][0], plan[0][0][1]),
-                          f'n{IDX}-{{0}}-{{1}}'.format(plan[0][1][0], plan[0][1][1])]
-            self.linked += ['(linked {0} {1})'.format(*start_edge)]
-
-        nodes = []
-        for r in range(rows + 1):
-            for c in range(cols + 1):
-                nodes += [f'n{IDX}-{r}-{c}']
-
-        cell_edge = []
-        for r in range(1, rows):
-            for c in range(cols):
-                upcell = f'cell{IDX}-{r - 1}-{c}'
-                downcell = f'cell{IDX}-{r}-{c}'
-                cto = c + 1
-                cell_edge += [f'(CELL-EDGE {upcell} {downcell} n{IDX}-{r}-{c} n{IDX}-{r}-{cto})']
-        for c in range(cols):
-            r = 0
-            upcell = f'cell{IDX}-outside-{c}-up'
-            downcell = f'cell{IDX}-{r}-{c}'
-            cto = c + 1
-            cell_edge += [f'(CELL-EDGE {upcell} {downcell} n{IDX}-{r}-{c} n{IDX}-{r}-{cto})']
-
-            r = rows
-            upcell = f'cell{IDX}-{r - 1}-{c}'
-            downcell = f'cell{IDX}-outside-{c}-down'
-            cto = c + 1
-            cell_edge += [f'(CELL-EDGE {upcell} {downcell} n{IDX}-{r}-{c} n{IDX}-{r}-{cto})']
-        for c in range(1, cols):
-            for r in range(rows):
-                leftcell = f'cell{IDX}-{r}-{c - 1}'
-                rightcell = f'cell{IDX}-{r}-{c}'
-                rto = r + 1
-                cell_edge += [f'(CELL-EDGE {leftcell} {rightcell} n{IDX}-{r}-{c} n{IDX}-{rto}-{c})']
-        for r in range(rows):
-            c = 0
-            leftcell = f'cell{IDX}-outside-{r}-left'
-            rightcell = f'cell{IDX}-{r}-{c}'
-            rto = r + 1
-            cell_edge += [f'(CELL-EDGE {leftcell} {rightcell} n{IDX}-{r}-{c} n{IDX}-{rto}-{c})']
-
-            c = cols
-            leftcell = f'cell{IDX}-{r}-{c - 1}'
-            rightcell = f'cell{IDX}-outside-{r}-right'
-            rto = r + 1
-            cell_edge += [f'(CELL-EDGE {leftcell} {rightcell} n{IDX}-{r}-{c} n{IDX}-{rto}-{c})']
-
-        lowercap = []
-        if self.use_start_edge:
-            for c in cell_edge:
-                if start_edge[0] in c and start_edge[1] in c:
-                    s = c.split()
-                    lowercap += [s[1], s[2]]
-
-        goal_cap = []
-        cell_capacity = []
-        cells = []
-        for r in range(rows):
-            for c in range(cols):
-                cells += [f'cell{IDX}-{r}-{c}']
-        for r in range(rows):
-            cap = 'cap-1'
-            cell = f'cell{IDX}-outside-{r}-left'
-            if cell in lowercap:
-                cap = 'cap-0'
-            cells += [cell]
-            cell_capacity += [f'(CELL-CAPACITY {cell} {cap})']
-
-            cap = 'cap-1'
-            cell = f'cell{IDX}-outside-{r}-right'
-            if cell in lowercap:
-                cap = 'cap-0'
-            cells += [cell]
-            cell_capacity += [f'(CELL-CAPACITY {cell} {cap})']
-
-        for c in range(cols):
-            cap = 'cap-1'
-            cell = f'cell{IDX}-outside-{c}-up'
-            if cell in lowercap:
-                cap = 'cap-0'
-            cells += [cell]
-            cell_capacity += [f'(CELL-CAPACITY {cell} {cap})']
-
-            cap = 'cap-1'
-            cell = f'cell{IDX}-outside-{c}-down'
-            if cell in lowercap:
-                cap = 'cap-0'
-            cells += [cell]
-            cell_capacity += [f'(CELL-CAPACITY {cell} {cap})']
-
-        for i, row in enumerate(puzzle):
-            for j, c in enumerate(row):
-                cell = f'cell{IDX}-{i}-{j}'
-                cap = 4
-                if c != '.':
-                    cap = int(c)
-                    goal_cap += [f'(CELL-CAPACITY {cell} cap-0)']
-                if cell in lowercap:
-                    cap -= 1
-                cell_capacity += [f'(CELL-CAPACITY {cell} cap-{cap})']
-
-
-        node_degree0 = []
-        for n in nodes:
-            if n in start_edge:
-                node_degree0 += [f'(node-degree1 {n})']
-            else:
-                node_degree0 += [f'(node-degree0 {n})']
-
-        nodegoal = []
-        for n in nodes:
-            nodegoal += [f'(not (node-degree1 {n}))']
-        nodegoal = sorted(nodegoal)
-
-        self.nodes += nodes
-        self.cells += cells
-        self.cell_capacity += cell_capacity
-        self.node_degree0 += node_degree0
-        self.cell_edge += cell_edge
-        self.nodegoal += nodegoal
-        self.goal_cap += goal_cap
-
-    def toPddl(self):
-        capacity = ' '.join(self.capacity)
-        nodes = ' '.join(self.nodes)
-        cells = ' '.join(self.cells)
-
-        capacity_inc = '\n    '.join(self.capacity_inc)
-        cell_capacity = '\n    '.join(self.cell_capacity)
-        node_degree0 = '\n    '.join(self.node_degree0)
-        cell_edge = '\n    '.join(self.cell_edge)
-
-        nodegoal = '\n        '.join(self.nodegoal)
-        goal_cap = '\n        '.join(self.goal_cap)
-
-        hcols = [len(x[0]) for x in self.puzzles]
-        hcols += [len(x[0]) for x in self.solutions]
-        hcols = max(hcols)
-        assert(len(self.puzzles) == len(self.solutions))
-
-        header = ''
-        hrows = max([len(x) for x in self.puzzles])
-        for row in range(hrows):
-            header += ';;'
-            for puzzle in self.puzzles:
-                header += '  '
-                if row < len(puzzle):
-                    header += puzzle[row]
-                    for _ in range(len(puzzle[row]), hcols):
-                        header += ' '
-                else:
-                    for _ in range(hcols):
-                        header += ' '
-            header += '\n'
-
-        header += ';;\n'
-        hrows = max([len(x) for x in self.solutions])
-        for row in range(hrows):
-            header += ';;'
-            for solution in self.solutions:
-                header += '  '
-                if row < len(solution):
-                    header += solution[row]
-                    for _ in range(len(solution[row]), hcols):
-                        header += ' '
-                else:
-                    for _ in range(hcols):
-                        header += ' '
-            header += '\n'
-
-        linked = copy.deepcopy(self.linked)
-        if self.use_start_edge:
-            linked += ['(disable-link-0-0)']
-        linked = '\n    '.join(linked)
-        rand = int(1000000 * random.random())
-        s = f'''{header}
-(define (problem sliterlink-{rand})
-(:domain slitherlink)
-
-(:objects
-    {capacity} - cell-capacity-level
-    {nodes} - node
-    {cells} - cell
-)
-
-(:init
-    {capacity_inc}
-
-    {cell_capacity}
-
-    {node_degree0}
-
-    {cell_edge}
-
-    {linked}
-)
-(:goal
-    (and
-        {nodegoal}
-
-        {goal_cap}
-    )
-)
-)
-
-
-'''
-        return s
-
-    def addGen(self, rows, cols):
-        prog = os.path.join(TOPDIR, 'generate')
-        if not os.path.isfile(prog):
-            print(f'Error: Missing program {prog}', file = sys.stderr)
-            return -1
-
-        cmd = f'{prog} {rows} {cols} tmp.gen.prob tmp.gen.sol'
-        ret = os.system(cmd)
-        assert(ret == 0)
-
-        puzzle = []
-        with open('tmp.gen.prob', 'r') as fin:
-            for line in fin:
-                line = line.strip('\n')
-                puzzle += [line]
-
-        solution = []
-        with open('tmp.gen.sol', 'r') as fin:
-            for line in fin:
-                line = line.strip('\n')
-                solution += [line]
-
-        self.add(puzzle, solution)
+# If compact_names is set, nodes and cells get short names and the map to
+# the original names is written next to the problem, to prob.map for
+# prob.pddl. The files are compressed according to their extensions, see
+# compress.py, and the map is compressed like the problem. If prob.stats is
+# set, the statistics are printed to the standard error output as a table
+# or as JSON lines according to stats_fmt. If catalog is given, the problem
+# is added to it with the source and seed, see slitherlink/catalog.py, and
+# prob.stats must be set.
+def writeFiles(prob, fnpddl, fnplan, compact_names = False, stats_fmt = 'table',
+               catalog = None, source = None, seed = None):
+    prob.printPreprocessStats()
+    if compact_names:
+        with compress.openFile(compress.replaceExt(fnpddl, '.map'), 'w') as fout:
+            graph.writeNameMap(fout, graph.compactNames(prob.graphs))
+
+    if prob.stats is not None:
+        prob.stats.counts = graph.problemCounts(prob.graphs, 5)
+
+    with compress.openFile(fnpddl, 'w') as fout:
+        writeProblem(prob, fout)
+
+    with compress.openFile(fnplan, 'w') as fout:
+        writePlan(prob, fout)
+
+    if catalog is not None:
+        catalog.add([catalogmod.record(fnpddl, source, prob.stats.counts,
+                                       prob.puzzles, prob.optimalCost(), fnplan,
+                                       prob.preprocess, prob.use_start_edge,
+                                       seed, prob.stats.total(),
+                                       start_edges = prob.start_edges)])
+    if prob.stats is not None and stats_fmt is not None:
+        statsmod.printStats([prob.stats], sys.stderr, stats_fmt)
+    return 0
 
-        os.unlink('tmp.gen.prob')
-        os.unlink('tmp.gen.sol')
-        return 0
+# The catalog needs the counts of the problem and its time
+def _stats(fnpddl, stats_fmt, catalog = None):
+    if stats_fmt is None and catalog is None:
+        return None
+    return statsmod.Stats(fnpddl)
+
+# If index is given, duplicates of the puzzles in it are not used and the
+# new puzzles are added to it once the problem is written
+def generate(rows, cols, fnpddl, fnplan, parallel = 1, jobs = None,
+             seed = None, cache = None, preprocess = False, start_edge = False,
+             compact_names = False, stats_fmt = None, index = None,
+             catalog = None, solution_start_edge = False):
+    prob = Prob(use_start_edge = (parallel > 1 or start_edge),
+                preprocess = preprocess,
+                stats = _stats(fnpddl, stats_fmt, catalog),
+                solution_start_edge = solution_start_edge)
+
+    try:
+        ret = prob.addGen(rows, cols, parallel, jobs, seed, cache, index)
+    except loop.LoopError as e:
+        print(f'PLAN IS INVALID! {e}', file = sys.stderr)
+        return -1
+    except RuntimeError as e:
+        print(f'Error: {e}', file = sys.stderr)
+        return -1
+    if ret != 0:
+        return ret
+    source = 'gen-parallel' if parallel > 1 else 'gen'
+    ret = writeFiles(prob, fnpddl, fnplan, compact_names, stats_fmt, catalog,
+                     source, seed)
+    if ret == 0 and index is not None:
+        index.add(prob.puzzles, fnpddl)
+    return ret
+
+# Solves the puzzle, or takes its solution from the cache, and writes the
+# problem and the plan
+def writePuzzle(puzzle, fnpddl, fnplan, cache = None, preprocess = False,
+                start_edge = False, compact_names = False, stats_fmt = None,
+                stats = None, catalog = None, solution_start_edge = False):
+    # Older entries without 'shortest' may not have the shortest loop
+    key = ('solve', '\n'.join(puzzle), 'shortest')
+    found = _fromCache(cache, key)
+    if found is not None:
+        _, solution, plan = found
+    else:
+        try:
+            with statsmod.phase(stats, 'solve'):
+                solution = runSolve(puzzle)
+            with statsmod.phase(stats, 'chain'):
+                plan = chainPlan(solutionEdges(solution))
+        except RuntimeError as e:
+            print(f'Error: {e}', file = sys.stderr)
+            return -1
+        except loop.LoopError as e:
+            print(f'PLAN IS INVALID! {e}', file = sys.stderr)
+            return -1
+        _toCache(cache, key, puzzle, solution, plan)
+
+    prob = Prob(use_start_edge = start_edge, preprocess = preprocess,
+                stats = stats, solution_start_edge = solution_start_edge)
+    prob.add(puzzle, solution, plan)
+    return writeFiles(prob, fnpddl, fnplan, compact_names, stats_fmt, catalog,
+                      'download')
+
+def download(spec, fnpddl, fnplan, cache = None, preprocess = False,
+             start_edge = False, compact_names = False, stats_fmt = None,
+             catalog = None, solution_start_edge = False):
+    if spec not in puzzleloop.SPEC_MAP:
+        print(f'Error: Unkown "{spec}"', file = sys.stderr)
+        return -1
 
-    def optimalCost(self):
-        cost = sum([len(sol) for sol in self.plans])
-        if self.use_start_edge:
-            cost -= len(self.plans)
-        return cost
+    stats = _stats(fnpddl, stats_fmt, catalog)
+    with statsmod.phase(stats, 'download'):
+        puzzle = get_puzzle(puzzleloop.puzzleUrl(spec))
+    return writePuzzle(puzzle, fnpddl, fnplan, cache, preprocess, start_edge,
+                       compact_names, stats_fmt, stats, catalog,
+                       solution_start_edge)
+
+# Solves the puzzles of the pages and writes NAME.pddl and NAME.plan for
+# every page to outdir. pages yields (NAME, fetch) where fetch() returns
+# the text of the page, and it is called by one of jobs threads.
+# Puzzles are solved by another jobs threads while the next pages are
+# fetched. Puzzles seen before, also those in the dedup.Index index if
+# given, are skipped, and only the puzzles of the written problems are
+# added to the index. If htmldir is given, the fetched pages are saved
+# there as NAME.html.
+def _bulk(pages, outdir, jobs, htmldir = None, cache = None, index = None,
+          preprocess = False, start_edge = False, compact_names = False,
+          catalog = None, solution_start_edge = False):
+    os.makedirs(outdir, exist_ok = True)
+    if htmldir is not None:
+        os.makedirs(htmldir, exist_ok = True)
+    if index is None:
+        index = dedup.Index(None)
+
+    def fetchJob(name, fetch):
+        text = fetch()
+        if htmldir is not None:
+            with open(os.path.join(htmldir, name + '.html'), 'w') as fout:
+                fout.write(text)
+        return puzzleloop.parseLoopTable(text)
+
+    def solveJob(name, puzzle):
+        fnpddl = os.path.join(outdir, name + '.pddl')
+        return writePuzzle(puzzle, fnpddl, os.path.join(outdir, name + '.plan'),
+                           cache, preprocess, start_edge, compact_names,
+                           stats = _stats(fnpddl, None, catalog),
+                           catalog = catalog,
+                           solution_start_edge = solution_start_edge)
+
+    num = 0
+    num_dup = 0
+    failed = 0
+    # Hashes of the puzzles of this run, the index gets only those solved
+    seen = set()
+    with concurrent.futures.ThreadPoolExecutor(max_workers = jobs) as fetch_pool, \
+            concurrent.futures.ThreadPoolExecutor(max_workers = jobs) as solve_pool:
+        fetched = {fetch_pool.submit(fetchJob, name, fetch) : name
+                        for name, fetch in pages}
+        solved = {}
+        for fut in concurrent.futures.as_completed(fetched):
+            name = fetched[fut]
+            num += 1
+            try:
+                puzzle = fut.result()
+            except (OSError, RuntimeError, ValueError) as e:
+                print(f'FAIL {name}: {e}')
+                failed += 1
+                continue
+            h = dedup.puzzleHash(puzzle)
+            # Pages arrive slowly, other runs may have added puzzles since
+            index.refresh()
+            if h in seen or index.containsHash(h):
+                print(f'DUP  {name}')
+                num_dup += 1
+                continue
+            seen.add(h)
+            solved[solve_pool.submit(solveJob, name, puzzle)] = (name, puzzle)
+
+        for fut in concurrent.futures.as_completed(solved):
+            name, puzzle = solved[fut]
+            try:
+                ret = fut.result()
+            except (OSError, RuntimeError, ValueError) as e:
+                print(f'FAIL {name}: {e}')
+                failed += 1
+                continue
+            if ret == 0:
+                index.add([puzzle], name)
+                print(f'OK   {name}')
+            else:
+                print(f'FAIL {name}')
+                failed += 1
+
+    print(f'Wrote {num - num_dup - failed}/{num}, duplicates {num_dup}, failed {failed}')
+    return 0 if failed == 0 else -1
+
+# Downloads num puzzles of the spec, see download(), with a pool of jobs
+# connections making at most rate requests per second in total, and writes
+# them as spec-NUM.pddl, e.g., 10x10-hard-0000.pddl, to outdir. The pages
+# are saved to outdir/html/ so that they can be parsed again by
+# parseHtml().
+def downloadBulk(spec, num, outdir, jobs = 4, rate = 1., retries = 3,
+                 url = puzzleloop.DEFAULT_URL, cache = None, index = None,
+                 preprocess = False, start_edge = False, compact_names = False,
+                 catalog = None, solution_start_edge = False):
+    if spec not in puzzleloop.SPEC_MAP:
+        print(f'Error: Unknown "{spec}"', file = sys.stderr)
+        return -1
 
+    session = puzzleloop.Session(rate = rate, retries = retries)
+    page_url = puzzleloop.puzzleUrl(spec, url)
+    prefix = spec.replace(' ', '-')
+    pages = [(f'{prefix}-{i:04d}', lambda: session.get(page_url))
+                for i in range(num)]
+    t = time.time()
+    try:
+        ret = _bulk(pages, outdir, jobs, os.path.join(outdir, 'html'), cache,
+                    index, preprocess, start_edge, compact_names, catalog,
+                    solution_start_edge)
+    finally:
+        session.close()
+    print(f'{session.num_requests} requests in {time.time() - t:.1f}s')
+    return ret
+
+# Writes the puzzles of the pages NAME.html saved in htmldir as NAME.pddl
+# to outdir
+def parseHtml(htmldir, outdir, jobs = None, cache = None, index = None,
+              preprocess = False, start_edge = False, compact_names = False,
+              catalog = None, solution_start_edge = False):
+    fns = sorted([fn for fn in os.listdir(htmldir) if fn.endswith('.html')])
+    if len(fns) == 0:
+        print(f'Error: No pages in {htmldir}', file = sys.stderr)
+        return -1
 
-def generate(rows, cols, fnpddl, fnplan, parallel = 1):
-    prob = Prob(use_start_edge = (parallel > 1))
+    def reader(fn):
+        def read():
+            with open(fn, 'r', errors = 'replace') as fin:
+                return fin.read()
+        return read
+    pages = [(fn[:-len('.html')], reader(os.path.join(htmldir, fn)))
+                for fn in fns]
+    return _bulk(pages, outdir, jobs or os.cpu_count() or 1, None, cache,
+                 index, preprocess, start_edge, compact_names, catalog,
+                 solution_start_edge)
+
+# Writes the problem again from the puzzles and solutions in the header of
+# a problem written by this script, e.g., to add --preprocess or
+# --start-edge to an archived problem. Problems with more than one puzzle
+# always get start edges as with gen-parallel, taken from the solution of a
+# puzzle if none is deduced.
+def reencode(fnold, fnpddl, fnplan, preprocess = False, start_edge = False,
+             compact_names = False, stats_fmt = None, catalog = None,
+             solution_start_edge = False):
+    stats = _stats(fnpddl, stats_fmt, catalog)
+    try:
+        with statsmod.phase(stats, 'parse'), \
+                compress.openFile(fnold, 'r') as fin:
+            old = pddl.readProblem(fin)
+    except (OSError, ValueError) as e:
+        print(f'Error: {fnold}: {e}', file = sys.stderr)
+        return -1
 
-    for i in range(parallel):
-        prob.addGen(rows, cols)
+    grids = pddl.headerGrids(old)
+    if grids is None:
+        print(f'Error: {fnold}: No puzzles in the header of the problem', file = sys.stderr)
+        return -1
 
-    out = prob.toPddl()
-    with open(fnpddl, 'w') as fout:
-        fout.write(';; {0}\n'.format(' '.join(sys.argv)))
-        fout.write(';;\n')
-        fout.write(out)
+    puzzles, solutions = grids
+    prob = Prob(use_start_edge = (len(puzzles) > 1 or start_edge),
+                preprocess = preprocess, stats = stats,
+                solution_start_edge = (len(puzzles) > 1 or solution_start_edge))
+    try:
+        for puzzle, solution in zip(puzzles, solutions):
+            prob.add(puzzle, solution)
+    except loop.LoopError as e:
+        print(f'PLAN IS INVALID! {e}', file = sys.stderr)
+        return -1
+    except RuntimeError as e:
+        print(f'Error: {fnold}: {e}', file = sys.stderr)
+        return -1
+    return writeFiles(prob, fnpddl, fnplan, compact_names, stats_fmt, catalog,
+                      'reencode')
+
+# Adds the puzzles of the problems written by this script to the index and
+# reports those that are already there
+def indexProblems(fnindex, fns):
+    index = dedup.Index(fnindex)
+    num = 0
+    num_dup = 0
+    for fn in fns:
+        try:
+            with compress.openFile(fn, 'r') as fin:
+                grids = pddl.headerGrids(pddl.readProblem(fin))
+        except (OSError, ValueError) as e:
+            print(f'Error: {fn}: {e}', file = sys.stderr)
+            return -1
+        if grids is None:
+            print(f'Error: {fn}: No puzzles in the header of the problem', file = sys.stderr)
+            return -1
 
-    with open(fnplan, 'w') as fout:
-        fout.write(';; Optimal cost: {0}\n'.format(prob.optimalCost()))
+        for i, puzzle in enumerate(grids[0]):
+            if index.contains(puzzle):
+                print(f'DUPLICATE {fn} puzzle {i}')
+                num_dup += 1
+            else:
+                index.add([puzzle], fn)
+            num += 1
+    print(f'Indexed {num} puzzles, {num_dup} duplicates, {len(index)} in {fnindex}')
     return 0
 
-def download(spec, fnpddl, fnplan):
-    spec_map = {
-        '5x5 normal' : None,
-        '5x5 hard' : '4',
-        '7x7 normal' : '10',
-        '7x7 hard' : '11',
-        '10x10 normal' : '1',
-        '10x10 hard' : '5',
-        '15x15 normal' : '2',
-        '15x15 hard' : '6',
-        '20x20 normal' : '3',
-        '20x20 hard' : '7',
-        '25x30 normal' : '8',
-        '25x30 hard' : '9',
-        'special daily loop' : '13',
-        'special weekly loop' : '12',
-        'special monthly loop' : '14',
-    }
-
-    if spec not in spec_map:
-        print(f'Error: Unkown "{spec}"', file = sys.stderr)
+# Generates the problems of the spec, see slitherlink/corpus.py, into the
+# directory or tar archive out, together with a copy of the spec in
+# spec.json and the metadata and optimal costs of the problems in
+# corpus.jsonl. Problems are written as soon as they are generated while
+# the following ones are generated with jobs workers.
+def buildCorpus(fnspec, out, jobs = None, cache = None, index = None,
+                stats_fmt = None, catalog = None):
+    try:
+        spec = corpusmod.readSpec(fnspec)
+    except (OSError, ValueError) as e:
+        print(f'Error: {fnspec}: {e}', file = sys.stderr)
         return -1
 
-    url = 'http://www.puzzle-loop.com/?v=0'
-    s = spec_map[spec]
-    if s is not None:
-        url += f'&size={s}'
-
-    puzzle = get_puzzle(url)
-    with open('tmp.gen.prob', 'w') as fout:
-        for row in puzzle:
-            fout.write(row + '\n')
-
-    cmd = f'{TOPDIR}/solve tmp.gen.prob 100 >tmp.gen.sol'
-    ret = os.system(cmd)
-    assert(ret == 0)
-
-    solution = []
-    with open('tmp.gen.sol', 'r') as fin:
-        for line in fin:
-            if len(line) == 0 or line[0] not in ['+', '|', ' ']:
-                continue
-            line = line.strip('\n')
-            solution += [line]
+    t = time.time()
+    num = corpusmod.numTasks(spec)
+    writer = corpusmod.openWriter(out)
+    writer.add('spec.json', lambda fout: fout.write(json.dumps(spec, indent = 2) + '\n'))
+    metas = []
+    stats = []
+    records = []
+    ret = 0
+    try:
+        with_stats = stats_fmt is not None or catalog is not None
+        for prob, meta in corpusmod.instances(spec, jobs, cache = cache,
+                                              index = index,
+                                              with_stats = with_stats):
+            metas += [corpusmod.writeInstance(writer, spec, prob, meta)]
+            if stats_fmt is not None:
+                stats += [prob.stats]
+            if catalog is not None:
+                m = metas[-1]
+                source = 'gen-parallel' if m['parallel'] > 1 else 'gen'
+                records += [catalogmod.record(
+                    os.path.join(out, m['name'] + '.pddl'), source,
+                    prob.stats.counts, prob.puzzles, m['optimal_cost'],
+                    os.path.join(out, m['name'] + '.plan'), prob.preprocess,
+                    prob.use_start_edge, m['seed'], prob.stats.total(),
+                    m['sha256'], m['plan_sha256'], prob.start_edges)]
+                # One transaction for many problems
+                if len(records) >= 100:
+                    catalog.add(records)
+                    records = []
+            print(f'[{len(metas)}/{num}] {meta["name"]}', file = sys.stderr)
+    except loop.LoopError as e:
+        print(f'PLAN IS INVALID! {e}', file = sys.stderr)
+        ret = -1
+    except RuntimeError as e:
+        print(f'Error: {e}', file = sys.stderr)
+        ret = -1
+    finally:
+        # Also the metadata of the problems written before an error
+        if catalog is not None:
+            catalog.add(records)
+        writer.add('corpus.jsonl',
+                   lambda fout: fout.write(''.join([json.dumps(m) + '\n' for m in metas])))
+        writer.close()
+
+    statsmod.printStats(stats, sys.stderr, stats_fmt)
+    print(f'Wrote {len(metas)}/{num} problems to {out} in {time.time() - t:.1f}s')
+    return ret
+
+# Returns the name of the file with the optimal cost of the problem or None
+def _costFile(fnpddl):
+    fn = compress.replaceExt(fnpddl, '.plan')
+    if fn == fnpddl or not os.path.isfile(fn):
+        return None
+    return fn
+
+# Writes one problem NAME-K.pddl for every connected component of the
+# problem, e.g., every puzzle of gen-parallel, to outdir, see
+# slitherlink/split.py. If the header of the problem has the puzzles and
+# their solutions, every part gets its puzzle in its header and
+# NAME-K.plan with its optimal cost.
+def splitProblem(fnpddl, outdir):
+    try:
+        with compress.openFile(fnpddl, 'r') as fin:
+            problem = pddl.readProblem(fin)
+        parts = splitmod.splitGraphs(problem.graphs)
+    except (OSError, ValueError) as e:
+        print(f'Error: {fnpddl}: {e}', file = sys.stderr)
+        return -1
 
-    prob = Prob()
-    prob.add(puzzle, solution)
+    # The puzzles of the header belong to the graphs only if every graph is
+    # one component
+    grids = pddl.headerGrids(problem)
+    if grids is not None and len(parts) != len(grids[0]):
+        grids = None
+
+    os.makedirs(outdir, exist_ok = True)
+    name = os.path.basename(compress.stripExt(fnpddl))
+    if name.endswith('.pddl'):
+        name = name[:-len('.pddl')]
+    total = 0
+    for k, (i, g) in enumerate(parts):
+        fn = os.path.join(outdir, f'{name}-{k}.pddl')
+        with compress.openFile(fn, 'w') as fout:
+            fout.write(f';; Part {k} of {len(parts)} of {fnpddl}\n')
+            fout.write(';;\n')
+            if grids is not None:
+                writeGridHeader(fout, [grids[0][i]], [grids[1][i]])
+            fout.write('\n')
+            pddl.writeGraphs(fout, f'{problem.name}-{k}', [g],
+                             problem.num_levels, problem.upper)
+        msg = ''
+        if grids is not None:
+            cost = len(solutionEdges(grids[1][i])) - len(g.linked)
+            total += cost
+            with open(os.path.join(outdir, f'{name}-{k}.plan'), 'w') as fout:
+                fout.write(f';; Optimal cost: {cost}\n')
+            msg = f' (optimal cost {cost})'
+        print(f'{fn}{msg}')
+
+    fncost = _costFile(fnpddl)
+    if grids is not None and fncost is not None:
+        optimal = validate.readOptimalCost(fncost)
+        if optimal is not None and optimal != total:
+            print(f'Error: The optimal costs of the parts sum up to {total},'
+                  f' not {optimal}', file = sys.stderr)
+            return -1
+    return 0
 
-    out = prob.toPddl()
-    with open(fnpddl, 'w') as fout:
-        fout.write(';; {0}\n'.format(' '.join(sys.argv)))
-        fout.write(';;\n')
-        fout.write(out)
+# Writes the plans of the parts of the problem written by splitProblem() one
+# after another to fnout, and validates the result against the problem and
+# its optimal cost in prob.plan if it exists
+def mergePlans(fnpddl, fnout, fnplans):
+    plans = []
+    for fn in fnplans:
+        try:
+            with compress.openFile(fn, 'r') as fin:
+                plans += [validate.readPlan(fin)]
+        except (OSError, ValueError) as e:
+            print(f'Error: {fn}: {e}', file = sys.stderr)
+            return -1
 
-    with open(fnplan, 'w') as fout:
-        fout.write(';; Optimal cost: {0}\n'.format(prob.optimalCost()))
+    fncost = _costFile(fnpddl)
+    if fncost is not None and os.path.abspath(fncost) == os.path.abspath(fnout):
+        print(f'Error: {fnout} holds the optimal cost of the problem', file = sys.stderr)
+        return -1
+    with compress.openFile(fnout, 'w') as fout:
+        splitmod.writeSteps(fout, splitmod.mergePlans(plans))
 
-    os.unlink('tmp.gen.prob')
-    os.unlink('tmp.gen.sol')
+    res = validate.validateFiles(fnpddl, [fnout], fncost)[0]
+    if not res['valid']:
+        print('FAIL {0}: {1}'.format(fnout, '; '.join(res['errors'])))
+        return -1
+    opt = ''
+    if res['optimal'] is True:
+        opt = ', optimal'
+    elif res['optimal'] is False:
+        opt = ', optimal cost is {0}'.format(res['optimal_cost'])
+    print('OK   {0} (cost {1}{2})'.format(fnout, res['cost'], opt))
+    return 0
 
+# Writes the grounded task of every problem to NAME.sas next to it, see
+# slitherlink/sas.py
+def groundProblems(fns):
+    ret = 0
+    for fn in fns:
+        fnsas = compress.replaceExt(fn, '.sas')
+        try:
+            with compress.openFile(fn, 'r') as fin:
+                problem = pddl.readProblem(fin)
+            with compress.openFile(fnsas, 'w') as fout:
+                counts = sasmod.writeGraphs(fout, problem.graphs)
+        except (OSError, ValueError) as e:
+            print(f'Error: {fn}: {e}', file = sys.stderr)
+            ret = -1
+            continue
+        print('{0}: {1} variables, {2} operators'.format(
+                fnsas, counts['variables'], counts['operators']))
+    return ret
+
+def _option(argv, name, default = None):
+    if name not in argv[:-1]:
+        return default, argv
+    i = argv.index(name)
+    return argv[i + 1], argv[:i] + argv[i + 2:]
+
+def usage():
+    print('Usage: {0} [--preprocess] [--start-edge] [--solution-start-edge] [--compact-names] [--stats[=json]] [--index index.txt] gen num-rows num-cols prob.pddl prob.plan [seed]'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} [--preprocess] [--solution-start-edge] [--compact-names] [--stats[=json]] [--index index.txt] gen-parallel num-parallel num-rows num-cols prob.pddl prob.plan [seed]'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} [--preprocess] [--start-edge] [--solution-start-edge] [--compact-names] [--stats[=json]] download spec prob.pddl prob.plan'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} [--preprocess] [--start-edge] [--solution-start-edge] [--compact-names] [--index index.txt] [--rate 1] [--retries 3] [--url URL] download-bulk spec num outdir [num-jobs]'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} [--preprocess] [--start-edge] [--solution-start-edge] [--compact-names] [--index index.txt] parse-html htmldir outdir [num-jobs]'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} [--preprocess] [--start-edge] [--solution-start-edge] [--compact-names] [--stats[=json]] reencode old.pddl prob.pddl prob.plan'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} [--stats[=json]] [--index index.txt] corpus spec.json outdir|out.tar[.gz|.xz] [num-jobs]'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} split prob.pddl outdir'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} merge prob.pddl merged.plan part.plan [part.plan ...]'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} sas prob.pddl [prob.pddl ...]'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} index index.txt prob.pddl [prob.pddl ...]'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} solve puzzle.txt'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} cache list'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} cache prune [max-size-MB]'.format(sys.argv[0]), file = sys.stderr)
+    print('', file = sys.stderr)
+    print('Puzzles generated with a seed and solutions of downloaded puzzles are', file = sys.stderr)
+    print('cached in $SLITHERLINK_CACHE (default ~/.cache/slitherlink-pddl, empty', file = sys.stderr)
+    print('to disable) limited to $SLITHERLINK_CACHE_SIZE MB.', file = sys.stderr)
+    print('', file = sys.stderr)
+    print('Puzzles are solved by generator-solver/solve if it is built, otherwise by', file = sys.stderr)
+    print('the native solver (also used by solve), which finds the shortest loop, so', file = sys.stderr)
+    print('that the optimal cost is right for puzzles with several solutions. This', file = sys.stderr)
+    print('takes a few seconds for hard 25x30 puzzles, up to about 25 s, e.g., on', file = sys.stderr)
+    print('puzzles/25x30-349clues.txt.', file = sys.stderr)
+    print('', file = sys.stderr)
+    print('With --preprocess, edges decided by local deductions are dropped from the', file = sys.stderr)
+    print('problem or pre-linked in its initial state.', file = sys.stderr)
+    print('With --start-edge, an edge certain to be part of the loop is linked in the', file = sys.stderr)
+    print('initial state and link-0-0 is disabled. gen-parallel always does this for', file = sys.stderr)
+    print('every puzzle. A puzzle without such an edge gets no start edge and keeps', file = sys.stderr)
+    print('link-0-0, unless --solution-start-edge (implying --start-edge) is given,', file = sys.stderr)
+    print('which links the first edge of its solution instead. gen-parallel generates', file = sys.stderr)
+    print('such puzzles again and links the first edge of the solution only after', file = sys.stderr)
+    print('20 attempts. The .plan file records the choice.', file = sys.stderr)
+    print('', file = sys.stderr)
+    print('With --compact-names, nodes and cells get short names and the map to the', file = sys.stderr)
+    print('original names is written to prob.map.', file = sys.stderr)
+    print('', file = sys.stderr)
+    print('download-bulk downloads num puzzles of the spec over num-jobs (default 4)', file = sys.stderr)
+    print('connections making at most --rate requests per second in total, retrying', file = sys.stderr)
+    print('failed requests --retries times, and solves them while the next ones are', file = sys.stderr)
+    print('downloaded. Problems are written as outdir/SPEC-NUM.pddl and the pages are', file = sys.stderr)
+    print('saved to outdir/html/, from where parse-html writes the problems again', file = sys.stderr)
+    print('without downloading them. Duplicate puzzles are skipped. --url replaces', file = sys.stderr)
+    print('the address of the website, e.g., by one of serve-puzzles.py.', file = sys.stderr)
+    print('', file = sys.stderr)
+    print('reencode writes a problem again from the puzzles and solutions in the', file = sys.stderr)
+    print('header of a problem written by this script.', file = sys.stderr)
+    print('', file = sys.stderr)
+    print('With --stats, the time of every phase and the counts of objects, capacity', file = sys.stderr)
+    print('levels and groundings of the link actions are printed to the standard', file = sys.stderr)
+    print('error output as a table, with --stats=json as a JSON line.', file = sys.stderr)
+    print('', file = sys.stderr)
+    print('gen and gen-parallel never use a puzzle twice in one problem, counting', file = sys.stderr)
+    print('rotations and reflections as the same puzzle, and with --index index.txt', file = sys.stderr)
+    print('they skip the puzzles listed in the index and add the new ones to it.', file = sys.stderr)
+    print('index adds the puzzles of existing problems to the index and reports the', file = sys.stderr)
+    print('duplicates among them.', file = sys.stderr)
+    print('', file = sys.stderr)
+    print('corpus generates all problems of the spec, see slitherlink/corpus.py, in', file = sys.stderr)
+    print('one run into a directory or a tar archive. The next problems are generated', file = sys.stderr)
+    print('by num-jobs workers (default the number of CPUs) while a problem is written.', file = sys.stderr)
+    print('', file = sys.stderr)
+    print('split writes a problem for every independent part of a problem, e.g.,', file = sys.stderr)
+    print('every puzzle of gen-parallel, to outdir as prob-K.pddl with prob-K.plan.', file = sys.stderr)
+    print('merge joins plans of the parts into a plan of the whole problem and', file = sys.stderr)
+    print('validates it against the problem and the optimal cost in prob.plan.', file = sys.stderr)
+    print('', file = sys.stderr)
+    print('sas writes the grounded task of every problem to prob.sas in the format of', file = sys.stderr)
+    print('the Fast Downward translator, so planners can skip translating domain.pddl.', file = sys.stderr)
+    print('', file = sys.stderr)
+    print('All commands writing problems accept --catalog catalog.db, which records', file = sys.stderr)
+    print('the size, counts, optimal cost, source, hashes and generation time of every', file = sys.stderr)
+    print('written problem in an SQLite catalog, see query-catalog.py.', file = sys.stderr)
+    print('', file = sys.stderr)
+    print('Problems, plans and maps named *.gz, *.xz or *.zst (if the zstandard module', file = sys.stderr)
+    print('is installed) are compressed, and so is the map of a compressed problem.', file = sys.stderr)
+    sys.exit(-1)
 
 if __name__ == '__main__':
-    if len(sys.argv) not in [7, 6, 5]:
-        print('Usage: {0} gen num-rows num-colst prob.pddl prob.plan'.format(sys.argv[0]), file = sys.stderr)
-        print('       {0} gen-parallel num-parallel num-rows num-colst prob.pddl prob.plan'.format(sys.argv[0]), file = sys.stderr)
-        print('       {0} download spec prob.pddl prob.plan'.format(sys.argv[0]), file = sys.stderr)
-        sys.exit(-1)
-
-    if sys.argv[1] == 'gen':
-        sys.exit(generate(int(sys.argv[2]), int(sys.argv[3]), sys.argv[4], sys.argv[5]))
-    elif sys.argv[1] == 'gen-parallel':
-        sys.exit(generate(int(sys.argv[3]), int(sys.argv[4]), sys.argv[5], sys.argv[6], parallel = int(sys.argv[2])))
-    elif sys.argv[1] == 'download':
-        sys.exit(download(sys.argv[2], sys.argv[3], sys.argv[4]))
+    # The options may be given anywhere, the full command line is still
+    # recorded in the generated problem
+    preprocess = '--preprocess' in sys.argv
+    start_edge = '--start-edge' in sys.argv
+    solution_start_edge = '--solution-start-edge' in sys.argv
+    start_edge = start_edge or solution_start_edge
+    compact_names = '--compact-names' in sys.argv
+    stats_fmt = None
+    if '--stats' in sys.argv:
+        stats_fmt = 'table'
+    if '--stats=json' in sys.argv:
+        stats_fmt = 'json'
+    argv = [x for x in sys.argv
+                if x not in ['--preprocess', '--start-edge', '--solution-start-edge',
+                             '--compact-names',
+                             '--stats', '--stats=json']]
+    index, argv = _option(argv, '--index')
+    if index is not None:
+        index = dedup.Index(index)
+    rate, argv = _option(argv, '--rate', '1')
+    retries, argv = _option(argv, '--retries', '3')
+    url, argv = _option(argv, '--url', puzzleloop.DEFAULT_URL)
+    catalog, argv = _option(argv, '--catalog')
+    if catalog is not None:
+        catalog = catalogmod.Catalog(catalog)
+    if len(argv) < 2:
+        usage()
+
+    cache = None
+    if cachemod.defaultPath() != '':
+        cache = cachemod.Cache()
+
+    if argv[1] == 'gen' and len(argv) in [6, 7]:
+        seed = argv[6] if len(argv) == 7 else None
+        sys.exit(generate(int(argv[2]), int(argv[3]), argv[4], argv[5],
+                          seed = seed, cache = cache, preprocess = preprocess,
+                          start_edge = start_edge, compact_names = compact_names,
+                          stats_fmt = stats_fmt, index = index,
+                          catalog = catalog,
+                          solution_start_edge = solution_start_edge))
+    elif argv[1] == 'gen-parallel' and len(argv) in [7, 8]:
+        seed = argv[7] if len(argv) == 8 else None
+        sys.exit(generate(int(argv[3]), int(argv[4]), argv[5], argv[6],
+                          parallel = int(argv[2]), seed = seed, cache = cache,
+                          preprocess = preprocess, compact_names = compact_names,
+                          stats_fmt = stats_fmt, index = index,
+                          catalog = catalog,
+                          solution_start_edge = solution_start_edge))
+    elif argv[1] == 'download' and len(argv) == 5:
+        sys.exit(download(argv[2], argv[3], argv[4], cache = cache,
+                          preprocess = preprocess, start_edge = start_edge,
+                          compact_names = compact_names, stats_fmt = stats_fmt,
+                          catalog = catalog,
+                          solution_start_edge = solution_start_edge))
+    elif argv[1] == 'download-bulk' and len(argv) in [5, 6]:
+        jobs = int(argv[5]) if len(argv) == 6 else 4
+        sys.exit(downloadBulk(argv[2], int(argv[3]), argv[4], jobs,
+                              float(rate), int(retries), url, cache = cache,
+                              index = index, preprocess = preprocess,
+                              start_edge = start_edge,
+                              compact_names = compact_names, catalog = catalog,
+                              solution_start_edge = solution_start_edge))
+    elif argv[1] == 'parse-html' and len(argv) in [4, 5]:
+        jobs = int(argv[4]) if len(argv) == 5 else None
+        sys.exit(parseHtml(argv[2], argv[3], jobs, cache = cache, index = index,
+                           preprocess = preprocess, start_edge = start_edge,
+                           compact_names = compact_names, catalog = catalog,
+                           solution_start_edge = solution_start_edge))
+    elif argv[1] == 'reencode' and len(argv) == 5:
+        sys.exit(reencode(argv[2], argv[3], argv[4], preprocess = preprocess,
+                          start_edge = start_edge, compact_names = compact_names,
+                          stats_fmt = stats_fmt, catalog = catalog,
+                          solution_start_edge = solution_start_edge))
+    elif argv[1] == 'corpus' and len(argv) in [4, 5]:
+        jobs = int(argv[4]) if len(argv) == 5 else None
+        sys.exit(buildCorpus(argv[2], argv[3], jobs, cache = cache,
+                             index = index, stats_fmt = stats_fmt,
+                             catalog = catalog))
+    elif argv[1] == 'split' and len(argv) == 4:
+        sys.exit(splitProblem(argv[2], argv[3]))
+    elif argv[1] == 'merge' and len(argv) >= 5:
+        sys.exit(mergePlans(argv[2], argv[3], argv[4:]))
+    elif argv[1] == 'sas' and len(argv) >= 3:
+        sys.exit(groundProblems(argv[2:]))
+    elif argv[1] == 'index' and len(argv) >= 4:
+        sys.exit(indexProblems(argv[2], argv[3:]))
+    elif argv[1] == 'solve' and len(argv) == 3:
+        sys.stdout.write(solveCP(argv[2]))
+    elif argv[1] == 'cache' and cache is not None:
+        sys.exit(cachemod.main(cache, argv[2:]))
     else:
-        print('Invalid command', file = sys.stderr)
-        sys.exit(-1)
-
+        usage()
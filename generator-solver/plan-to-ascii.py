@@ -1,71 +1,173 @@
 #!/usr/bin/env python3
 
 import sys
+import os
+import re
 
-def main(plan_fn, idx = ''):
-    NODE_NAME = 'n' + idx
-    if NODE_NAME == 'n0':
-        NODE_NAME = 'n'
+TOPDIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(TOPDIR))
+from slitherlink import graph
+from slitherlink import compress
 
-    row_edge = []
-    col_edge = []
-    cols = 0
-    rows = 0
-    fin = open(plan_fn, 'r')
+# Index of the sub-puzzle of the node name prefix: n is 0, n1 is 1, ...
+def prefixIdx(prefix):
+    if prefix == 'n':
+        return 0
+    return int(prefix[1:])
+
+# Adds the link between the nodes named a and b to links
+def _addLink(links, a, b, names):
+    if names is not None:
+        a = names.get(a, a)
+        b = names.get(b, b)
+    name, n1row, n1col = a.rsplit('-', 2)
+    name2, n2row, n2col = b.rsplit('-', 2)
+    assert(name == name2)
+    n1 = (int(n1row), int(n1col))
+    n2 = (int(n2row), int(n2col))
+    assert(n1[0] == n2[0] or n1[1] == n2[1])
+    if name not in links:
+        links[name] = []
+    links[name] += [(n1, n2)]
+
+# Reads the plan in one pass and returns a dictionary mapping the node name
+# prefix of every sub-puzzle (n, n1, n2, ...) to the list of its links
+# ((row, col), (row, col)). Node names are translated through the
+# dictionary names if given, see graph.readNameMap().
+def readLinks(fin, names = None, links = None):
+    if links is None:
+        links = {}
     for line in fin:
-        if line.startswith('(link-'):
-            s = line.split()
-            name, n1row, n1col = s[1].split('-')
-            name2, n2row, n2col = s[2].split('-')
-            assert(name == name2)
-            if name != NODE_NAME:
-                continue
-            n1row = int(n1row)
-            n1col = int(n1col)
-            n2row = int(n2row)
-            n2col = int(n2col)
-            assert(n1row == n2row or n1col == n2col)
-
-            if n1row == n2row:
-                row_edge += [((n1row, n1col), (n2row, n2col))]
-            else:
-                col_edge += [((n1row, n1col), (n2row, n2col))]
-
-            rows = max(rows, n1row + 1, n2row + 1)
-            cols = max(cols, n1col + 1, n2col + 1)
-    fin.close()
+        line = line.strip().lower()
+        if not line.startswith('(link-'):
+            continue
+        s = line.split()
+        _addLink(links, s[1], s[2], names)
+    return links
+
+_LINKED = re.compile(r'\(\s*linked\s+([^\s()]+)\s+([^\s()]+)\s*\)', re.I)
+
+# Adds the edges linked in the initial state of the problem (by
+# --preprocess or --start-edge) to links as readLinks() does, since the
+# plan has no actions for them. The domain has no other linked facts.
+def readLinked(fin, names = None, links = None):
+    if links is None:
+        links = {}
+    for line in fin:
+        for a, b in _LINKED.findall(line):
+            _addLink(links, a.lower(), b.lower(), names)
+    return links
+
+# Returns the rows of the ASCII drawing of the links. Every row is filled
+# in one preallocated buffer.
+def render(links):
+    rows = 0
+    cols = 0
+    for (r1, c1), (r2, c2) in links:
+        rows = max(rows, r1 + 1, r2 + 1)
+        cols = max(cols, c1 + 1, c2 + 1)
 
+    width = 2 * cols - 1
     out = []
-    for i in range(2 * rows - 1):
-        out += [[' ' for j in range(2 * cols - 1)]]
+    for ri in range(2 * rows - 1):
+        row = bytearray(b' ') * width
+        if ri % 2 == 0:
+            row[0::2] = b'+' * cols
+        out += [row]
 
-    for ri in range(len(out)):
-        if ri % 2 == 1:
-            continue
-        for i, c in enumerate(out[ri]):
-            if i % 2 == 0:
-                out[ri][i] = '+'
-
-    for ((r1, c1), (r2, c2)) in row_edge:
-        assert(r1 == r2)
-        assert(abs(c1 - c2) == 1)
-        row = 2 * r1
-        col = min(c1, c2) * 2
-        out[row][col + 1] = '-'
-
-    for ((r1, c1), (r2, c2)) in col_edge:
-        assert(c1 == c2)
-        assert(abs(r1 - r2) == 1)
-        col = 2 * c1
-        row = min(r1, r2) * 2
-        out[row + 1][col] = '|'
-
-    for row in out:
-        print(''.join(row))
+    for (r1, c1), (r2, c2) in links:
+        if r1 == r2:
+            assert(abs(c1 - c2) == 1)
+            out[2 * r1][2 * min(c1, c2) + 1] = ord('-')
+        else:
+            assert(c1 == c2)
+            assert(abs(r1 - r2) == 1)
+            out[2 * min(r1, r2) + 1][2 * c1] = ord('|')
+    return [row.decode('ascii') for row in out]
+
+# Renders the drawings next to each other
+def sideBySide(drawings):
+    out = []
+    height = max([len(d) for d in drawings])
+    for ri in range(height):
+        line = []
+        for d in drawings:
+            width = len(d[0]) if len(d) > 0 else 0
+            line += [d[ri] if ri < len(d) else ' ' * width]
+        out += ['  '.join(line).rstrip()]
+    return out
+
+def _open(plan_fn):
+    if plan_fn == '-':
+        return sys.stdin
+    return compress.openFile(plan_fn, 'r')
+
+def main(plan_fn, idx = '0', outdir = None, fnmap = None, fnprob = None):
+    names = None
+    if fnmap is not None:
+        with compress.openFile(fnmap, 'r') as fin:
+            names = graph.readNameMap(fin)
+
+    links = {}
+    if fnprob is not None:
+        with compress.openFile(fnprob, 'r') as fin:
+            readLinked(fin, names, links)
+
+    fin = _open(plan_fn)
+    readLinks(fin, names, links)
+    if fin is not sys.stdin:
+        fin.close()
+
+    prefixes = sorted(links.keys(), key = prefixIdx)
+    if idx == 'all':
+        drawings = [render(links[p]) for p in prefixes]
+        if len(drawings) > 0:
+            for row in sideBySide(drawings):
+                print(row)
+        return 0
+
+    if idx == 'split':
+        os.makedirs(outdir, exist_ok = True)
+        for p in prefixes:
+            fn = os.path.join(outdir, f'puzzle-{prefixIdx(p)}.txt')
+            with open(fn, 'w') as fout:
+                for row in render(links[p]):
+                    fout.write(row + '\n')
+        return 0
+
+    name = 'n' + idx
+    if name == 'n0':
+        name = 'n'
+    for row in render(links.get(name, [])):
+        print(row)
+    return 0
 
 if __name__ == '__main__':
-    if len(sys.argv) not in [2, 3]:
-        print('Usage: {0} problem.plan [sub-idx]'.format(sys.argv[0]), file = sys.stderr)
-        sys.exit(-1)
+    argv = sys.argv
+    fnmap = None
+    if '--map' in argv[:-1]:
+        i = argv.index('--map')
+        fnmap = argv[i + 1]
+        argv = argv[:i] + argv[i + 2:]
+    fnprob = None
+    if '--problem' in argv[:-1]:
+        i = argv.index('--problem')
+        fnprob = argv[i + 1]
+        argv = argv[:i] + argv[i + 2:]
+
+    if len(argv) == 4 and argv[2] == 'split':
+        sys.exit(main(*argv[1:], fnmap = fnmap, fnprob = fnprob))
+    if len(argv) in [2, 3] and argv[2:] != ['split']:
+        sys.exit(main(*argv[1:], fnmap = fnmap, fnprob = fnprob))
 
-    sys.exit(main(*sys.argv[1:]))
+    print('Usage: {0} [--map prob.map] [--problem prob.pddl] problem.plan [sub-idx]'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} [--map prob.map] [--problem prob.pddl] problem.plan all'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} [--map prob.map] [--problem prob.pddl] problem.plan split outdir'.format(sys.argv[0]), file = sys.stderr)
+    print('', file = sys.stderr)
+    print('"all" draws all sub-puzzles side by side, "split" writes the drawing of', file = sys.stderr)
+    print('every sub-puzzle to outdir/puzzle-IDX.txt. Use - to read the plan from', file = sys.stderr)
+    print('the standard input. Plans of problems written with --compact-names are', file = sys.stderr)
+    print('decoded with the map of the names written next to the problem.', file = sys.stderr)
+    print('Edges linked in the initial state of the problem (with --preprocess or', file = sys.stderr)
+    print('--start-edge) are not in the plan and are drawn only if --problem is given.', file = sys.stderr)
+    sys.exit(-1)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+# Local stand-in for the old version of www.puzzle-loop.com for testing
+# generate-pddl.py download-bulk without the network. It serves the saved
+# pages of htmldir in turn, or synthetic puzzles of the size requested by
+# the "size" parameter (see slitherlink/synth.py), over keep-alive
+# connections. With --fail-every N, every N-th request is answered with
+# 503 to exercise the retries; failed requests don't use up a page.
+
+import sys
+import os
+import threading
+import urllib.parse
+import http.server
+
+TOPDIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(TOPDIR))
+from slitherlink import puzzleloop
+from slitherlink import synth
+
+# (rows, cols) of the value of the size parameter
+def _sizes():
+    out = {}
+    for spec, size in puzzleloop.SPEC_MAP.items():
+        s = spec.split()[0].split('x')
+        if len(s) == 2:
+            out[size] = (int(s[0]), int(s[1]))
+        else:
+            out[size] = (10, 10)
+    return out
+
+class Server(http.server.ThreadingHTTPServer):
+    def __init__(self, port, pages, fail_every):
+        super().__init__(('127.0.0.1', port), Handler)
+        self.pages = pages
+        self.fail_every = fail_every
+        self.sizes = _sizes()
+        self.lock = threading.Lock()
+        self.num_requests = 0
+        self.num_pages = 0
+
+    # Returns the number of the page to serve, 0 if the request fails
+    def nextPage(self):
+        with self.lock:
+            self.num_requests += 1
+            if self.fail_every > 0 and self.num_requests % self.fail_every == 0:
+                return 0
+            self.num_pages += 1
+            return self.num_pages
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # The headers and the body are written separately
+    disable_nagle_algorithm = True
+
+    def _send(self, status, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        srv = self.server
+        n = srv.nextPage()
+        if n == 0:
+            self._send(503, 'Service Unavailable\n')
+            return
+
+        if len(srv.pages) > 0:
+            with open(srv.pages[(n - 1) % len(srv.pages)], 'r') as fin:
+                self._send(200, fin.read())
+            return
+
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        size = query.get('size', [None])[0]
+        if size not in srv.sizes:
+            self._send(404, 'Unknown size\n')
+            return
+        rows, cols = srv.sizes[size]
+        puzzle, _ = synth.randomPuzzle(rows, cols, seed = n)
+        self._send(200, puzzleloop.renderPage(puzzle))
+
+    def log_message(self, fmt, *args):
+        pass
+
+def main(port, htmldir = None, fail_every = 0):
+    pages = []
+    if htmldir is not None:
+        pages = sorted([os.path.join(htmldir, fn) for fn in os.listdir(htmldir)
+                            if fn.endswith('.html')])
+        if len(pages) == 0:
+            print(f'Error: No pages in {htmldir}', file = sys.stderr)
+            return -1
+
+    srv = Server(port, pages, fail_every)
+    print(f'Serving on http://127.0.0.1:{srv.server_address[1]}/?v=0', file = sys.stderr)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    srv.server_close()
+    print(f'{srv.num_requests} requests', file = sys.stderr)
+    return 0
+
+def usage():
+    print('Usage: {0} [--fail-every N] port [htmldir]'.format(sys.argv[0]), file = sys.stderr)
+    sys.exit(-1)
+
+if __name__ == '__main__':
+    argv = sys.argv
+    fail_every = 0
+    if '--fail-every' in argv[:-1]:
+        i = argv.index('--fail-every')
+        fail_every = int(argv[i + 1])
+        argv = argv[:i] + argv[i + 2:]
+    if len(argv) not in [2, 3]:
+        usage()
+    sys.exit(main(int(argv[1]), argv[2] if len(argv) == 3 else None, fail_every))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import json
+import sqlite3
+
+TOPDIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, TOPDIR)
+from slitherlink import catalog as catalogmod
+
+# Short names of columns in --min-X and --max-X
+_ALIASES = {'cost' : 'optimal_cost'}
+
+_NUMERIC = [c for c, t in catalogmod.COLUMNS if t in ['INTEGER', 'REAL']]
+
+_TABLE = ['name', 'source', 'size', 'puzzles', 'nodes', 'cells', 'edges',
+          'clues', 'optimal_cost']
+
+def _column(name):
+    name = _ALIASES.get(name, name)
+    if name not in catalogmod.COLUMN_NAMES:
+        raise ValueError(f'Unknown column {name}')
+    return name
+
+# Returns (where, params) of the filters given as pairs (option, value)
+def buildQuery(filters):
+    conds = []
+    params = []
+    for opt, val in filters:
+        if opt == '--source':
+            sources = val.split(',')
+            conds += ['source IN ({0})'.format(', '.join(['?'] * len(sources)))]
+            params += sources
+        elif opt == '--size':
+            rows, cols = val.split('x')
+            conds += ['rows = ? AND cols = ?']
+            params += [int(rows), int(cols)]
+        elif opt == '--where':
+            conds += [f'({val})']
+        elif opt.startswith('--min-') or opt.startswith('--max-'):
+            col = _column(opt[len('--min-'):])
+            if col not in _NUMERIC:
+                raise ValueError(f'Column {col} is not a number')
+            conds += ['{0} {1} ?'.format(col, '>=' if opt.startswith('--min-') else '<=')]
+            params += [float(val)]
+        else:
+            raise ValueError(f'Unknown option {opt}')
+    return ' AND '.join(conds), params
+
+def _printTable(rows, fout):
+    out = []
+    for r in rows:
+        r = dict(r)
+        r['size'] = f'{r["rows"]}x{r["cols"]}' if r['rows'] is not None else '-'
+        out += [[str(r[c]) if r[c] is not None else '-' for c in _TABLE]]
+    widths = [max([len(c)] + [len(x[i]) for x in out]) for i, c in enumerate(_TABLE)]
+    fout.write('  '.join([c.ljust(w) for c, w in zip(_TABLE, widths)]).rstrip() + '\n')
+    for x in out:
+        fout.write('  '.join([v.ljust(w) for v, w in zip(x, widths)]).rstrip() + '\n')
+
+def main(fndb, filters, order = 'path', limit = None, fmt = 'paths'):
+    if not os.path.isfile(fndb):
+        print(f'Error: No catalog {fndb}', file = sys.stderr)
+        return -1
+    try:
+        where, params = buildQuery(filters)
+        desc = order.startswith('-')
+        order = _column(order.lstrip('-')) + (' DESC' if desc else '')
+    except ValueError as e:
+        print(f'Error: {e}', file = sys.stderr)
+        return -1
+
+    catalog = catalogmod.Catalog(fndb)
+    try:
+        rows = catalog.query(where, params, order, limit)
+    except sqlite3.Error as e:
+        print(f'Error: {e}', file = sys.stderr)
+        return -1
+    finally:
+        catalog.close()
+
+    if fmt == 'count':
+        print(len(rows))
+    elif fmt == 'json':
+        for r in rows:
+            print(json.dumps(r))
+    elif fmt == 'table':
+        _printTable(rows, sys.stdout)
+    else:
+        for r in rows:
+            print(r['path'])
+    return 0
+
+def usage():
+    print('Usage: {0} [filter ...] [--order [-]column] [--limit N] [--format paths|table|json|count] catalog.db'.format(sys.argv[0]), file = sys.stderr)
+    print('', file = sys.stderr)
+    print('Prints the problems of the catalog written by generate-pddl.py and', file = sys.stderr)
+    print('asp-to-pddl.py with --catalog that match all filters, by default their', file = sys.stderr)
+    print('paths, one per line. Filters:', file = sys.stderr)
+    print('  --source gen,gen-parallel,download,reencode,asp-2011', file = sys.stderr)
+    print('  --size ROWSxCOLS', file = sys.stderr)
+    print('  --min-COLUMN N, --max-COLUMN N  e.g., --max-cost 80 --min-cells 2000', file = sys.stderr)
+    print('  --where SQL                     any SQL condition on the columns', file = sys.stderr)
+    print('Columns: {0}'.format(', '.join(catalogmod.COLUMN_NAMES)), file = sys.stderr)
+    print('cost is short for optimal_cost.', file = sys.stderr)
+    sys.exit(-1)
+
+if __name__ == '__main__':
+    argv = sys.argv[1:]
+    if len(argv) == 0 or len(argv) % 2 == 0:
+        usage()
+
+    filters = []
+    order = 'path'
+    limit = None
+    fmt = 'paths'
+    for opt, val in zip(argv[:-1:2], argv[1:-1:2]):
+        if opt == '--order':
+            order = val
+        elif opt == '--limit':
+            limit = int(val)
+        elif opt == '--format':
+            if val not in ['paths', 'table', 'json', 'count']:
+                usage()
+            fmt = val
+        elif opt.startswith('--'):
+            filters += [(opt, val)]
+        else:
+            usage()
+    sys.exit(main(argv[-1], filters, order, limit, fmt))
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import glob
+import json
+import time
+import shlex
+import shutil
+import signal
+import tempfile
+import threading
+import concurrent.futures
+
+TOPDIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, TOPDIR)
+from slitherlink import validate
+from slitherlink import compress
+
+# Exit codes of Fast Downward for running out of memory and time
+MEMORY_EXIT_CODES = [20, 22]
+TIME_EXIT_CODES = [21, 23]
+
+# Seconds by which the measured CPU time of a planner killed at the CPU
+# limit may fall short of it
+CPU_TIME_SLACK = 0.1
+
+# Statuses of runs in which the planner finished on its own, the problems
+# with other statuses are run again by --resume
+FINAL_STATUSES = ['solved', 'invalid', 'no-plan']
+
+# Returns the name of the problem without the directory and the extensions
+def problemName(fn):
+    name = os.path.basename(compress.stripExt(fn))
+    if name.endswith('.pddl'):
+        name = name[:-len('.pddl')]
+    return name
+
+def _expandProblems(inp):
+    if os.path.isdir(inp):
+        fns = []
+        for ext in [''] + compress.EXTS:
+            fns += glob.glob(os.path.join(inp, '*.pddl' + ext))
+        return sorted(fns)
+    if glob.has_magic(inp):
+        return sorted(glob.glob(inp))
+    return [inp]
+
+# The optimal cost of NAME.pddl is stored in NAME.plan next to it by
+# generate-pddl.py, possibly compressed
+def _findCost(fn):
+    base = os.path.join(os.path.dirname(fn), problemName(fn) + '.plan')
+    for ext in [''] + compress.EXTS:
+        if os.path.isfile(base + ext):
+            return base + ext
+    return None
+
+# Fills in the command template: {domain}, {problem}, {plan} (the file the
+# plan should be written to) and {name}. If the template uses neither
+# {domain} nor {problem}, both are appended.
+def plannerCommand(template, domain, problem, plan, name):
+    if '{domain}' not in template and '{problem}' not in template:
+        template += ' {domain} {problem}'
+    return template.format(domain = shlex.quote(domain),
+                           problem = shlex.quote(problem),
+                           plan = shlex.quote(plan), name = name)
+
+# The limits are set by the shell running the planner, so that they apply
+# to the planner and all of its subprocesses. cpu_limit is in whole seconds
+# and memory_limit in MB.
+def _limitedCommand(cmd, cpu_limit, memory_limit):
+    limits = ''
+    if cpu_limit is not None:
+        limits += f'ulimit -t {cpu_limit}; '
+    if memory_limit is not None:
+        limits += f'ulimit -v {int(memory_limit * 1024)}; '
+    return limits + 'exec ' + cmd
+
+# Starts the shell command in the directory in a new session, so that it can
+# be killed with all its subprocesses, with both outputs going to the log.
+# posix_spawn() is used because forking with a preexec_fn is not safe in
+# the threads of the pool.
+def _spawn(cmd, workdir, flog):
+    cmd = f'cd {shlex.quote(workdir)} && {cmd}'
+    actions = [(os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+               (os.POSIX_SPAWN_DUP2, flog.fileno(), 1),
+               (os.POSIX_SPAWN_DUP2, flog.fileno(), 2)]
+    return os.posix_spawn('/bin/sh', ['/bin/sh', '-c', cmd], os.environ,
+                          file_actions = actions, setsid = True)
+
+# Returns the plan written to the work directory if the planner was not
+# given {plan}: sas_plan, or the last of sas_plan.1, sas_plan.2, ... of
+# anytime planners
+def _findPlan(workdir):
+    fn = os.path.join(workdir, 'sas_plan')
+    if os.path.isfile(fn):
+        return fn
+    plans = []
+    for fn in glob.glob(os.path.join(workdir, 'sas_plan.*')):
+        suffix = fn.rsplit('.', 1)[1]
+        if suffix.isdigit():
+            plans += [(int(suffix), fn)]
+    if len(plans) == 0:
+        return None
+    return max(plans)[1]
+
+# The kernel stops a process that used up its CPU time with SIGXCPU or
+# SIGKILL, so the CPU time is checked as well, allowing for the coarse CPU
+# time accounting of the kernel. A planner that was killed may have left a
+# truncated plan, so an invalid plan counts only if the planner exited on
+# its own.
+def _status(returncode, timed_out, has_plan, valid, cpu_time, cpu_limit):
+    if has_plan and valid:
+        return 'solved'
+    if has_plan and not timed_out and returncode >= 0:
+        return 'invalid'
+    if timed_out:
+        return 'timeout'
+    if returncode == -signal.SIGXCPU or returncode in TIME_EXIT_CODES:
+        return 'cpu-limit'
+    if cpu_limit is not None and returncode < 0 \
+            and cpu_time >= cpu_limit - CPU_TIME_SLACK:
+        return 'cpu-limit'
+    if returncode in MEMORY_EXIT_CODES:
+        return 'memory-limit'
+    if returncode == 0:
+        return 'no-plan'
+    return 'error'
+
+# Runs the planner on one problem in its own working directory and returns
+# the result. The planner and everything it started are killed once the
+# wall-clock limit is reached. The peak RSS and the CPU time include the
+# subprocesses the planner waited for.
+def runJob(job):
+    fn, template, domain, outdir, time_limit, cpu_limit, memory_limit = job
+    name = problemName(fn)
+    fnplan = os.path.join(outdir, name + '.sas_plan')
+    fnlog = os.path.join(outdir, name + '.log')
+    if os.path.isfile(fnplan):
+        os.unlink(fnplan)
+
+    res = {'problem' : fn, 'name' : name}
+    with tempfile.TemporaryDirectory(prefix = 'slitherlink-') as workdir, \
+            compress.plainFile(fn) as problem:
+        wplan = os.path.join(workdir, 'plan')
+        cmd = plannerCommand(template, os.path.abspath(domain),
+                             os.path.abspath(problem), wplan, name)
+        cmd = _limitedCommand(cmd, cpu_limit, memory_limit)
+
+        timed_out = []
+        def kill(pid):
+            timed_out.append(True)
+            try:
+                os.killpg(pid, signal.SIGKILL)
+            except OSError:
+                pass
+
+        t = time.time()
+        with open(fnlog, 'w') as flog:
+            pid = _spawn(cmd, workdir, flog)
+            timer = None
+            if time_limit is not None:
+                timer = threading.Timer(time_limit, kill, [pid])
+                timer.start()
+            _, status, ru = os.wait4(pid, 0)
+            if timer is not None:
+                timer.cancel()
+        wall = time.time() - t
+
+        found = wplan if os.path.isfile(wplan) else _findPlan(workdir)
+        if found is not None:
+            shutil.copyfile(found, fnplan)
+
+    res['returncode'] = os.waitstatus_to_exitcode(status)
+    res['wall_time'] = wall
+    res['cpu_time'] = ru.ru_utime + ru.ru_stime
+    res['peak_rss_kb'] = ru.ru_maxrss
+
+    val = None
+    if os.path.isfile(fnplan):
+        val = validate.validateFiles(fn, [fnplan], _findCost(fn))[0]
+        res['plan'] = fnplan
+        res['cost'] = val['cost']
+        res['optimal_cost'] = val['optimal_cost']
+        res['optimal'] = val['optimal']
+        res['errors'] = val['errors']
+    res['status'] = _status(res['returncode'], len(timed_out) > 0,
+                            val is not None, val is not None and val['valid'],
+                            res['cpu_time'], cpu_limit)
+    return res
+
+def _printResult(res):
+    line = '{0:12} {1} ({2:.1f}s, {3:.0f}MB'.format(
+            res['status'].upper(), res['name'], res['wall_time'],
+            res['peak_rss_kb'] / 1024.)
+    if res.get('cost') is not None:
+        line += ', cost {0}'.format(res['cost'])
+        if res['optimal'] is False:
+            line += ', optimal cost is {0}'.format(res['optimal_cost'])
+        elif res['optimal'] is True:
+            line += ', optimal'
+    print(line + ')')
+    sys.stdout.flush()
+
+# Reads the results of an earlier run, skipping a truncated last line
+def _readResults(fn):
+    out = []
+    if not os.path.isfile(fn):
+        return out
+    with open(fn, 'r') as fin:
+        for line in fin:
+            try:
+                out += [json.loads(line)]
+            except ValueError:
+                break
+    return out
+
+# Runs the planner on all problems with num_workers jobs at the same time.
+# Every result is appended to fn_results as a JSON line as soon as its job
+# finishes. With resume, the problems whose last result in fn_results has a
+# final status are skipped, and the others are run again.
+def run(num_workers, template, outdir, fn_results, inputs, domain = None,
+        time_limit = None, cpu_limit = None, memory_limit = None,
+        resume = False):
+    if domain is None:
+        domain = os.path.join(TOPDIR, 'domain.pddl')
+    fns = []
+    for inp in inputs:
+        for fn in _expandProblems(inp):
+            if fn not in fns:
+                fns += [fn]
+
+    done = []
+    if resume:
+        last = {}
+        for res in _readResults(fn_results):
+            last[res['problem']] = res
+        done = [r for r in last.values() if r['status'] in FINAL_STATUSES]
+        finished = set([r['problem'] for r in done])
+        fns = [fn for fn in fns if fn not in finished]
+    if len(fns) + len(done) == 0:
+        print('Error: No problems', file = sys.stderr)
+        return -1
+
+    names = [problemName(fn) for fn in fns]
+    if len(set(names)) != len(names):
+        print('Error: Problems with the same name would overwrite their plans', file = sys.stderr)
+        return -1
+
+    os.makedirs(outdir, exist_ok = True)
+    jobs = [(fn, template, domain, outdir, time_limit, cpu_limit, memory_limit)
+                for fn in fns]
+    # The largest problems first so that they do not end up running alone
+    jobs.sort(key = lambda x: -os.path.getsize(x[0]))
+
+    # The final results of the earlier run are written again in case its
+    # last line was cut off, the other results are replaced by new runs
+    results = list(done)
+    with open(fn_results, 'w') as fout:
+        for res in done:
+            fout.write(json.dumps(res) + '\n')
+        fout.flush()
+        with concurrent.futures.ThreadPoolExecutor(max_workers = num_workers) as pool:
+            futures = [pool.submit(runJob, job) for job in jobs]
+            for f in concurrent.futures.as_completed(futures):
+                res = f.result()
+                fout.write(json.dumps(res) + '\n')
+                fout.flush()
+                _printResult(res)
+                results += [res]
+
+    count = {}
+    for res in results:
+        count[res['status']] = count.get(res['status'], 0) + 1
+    solved = [r for r in results if r['status'] == 'solved']
+    line = 'Solved {0}/{1}, optimal {2}, suboptimal {3}, unknown optimum {4}'.format(
+            len(solved), len(results),
+            len([r for r in solved if r['optimal'] is True]),
+            len([r for r in solved if r['optimal'] is False]),
+            len([r for r in solved if r['optimal'] is None]))
+    for status, num in sorted(count.items()):
+        if status != 'solved':
+            line += f', {status} {num}'
+    print(line)
+    if count.get('invalid', 0) > 0:
+        return -1
+    return 0
+
+# Removes the option with its value from argv, returns (value, argv)
+def _option(argv, name, default = None):
+    if name not in argv[:-1]:
+        return default, argv
+    i = argv.index(name)
+    return argv[i + 1], argv[:i] + argv[i + 2:]
+
+# Returns the value of the option as a positive number, exits on an invalid
+# value before any results are written
+def _limit(value, name, parse = float):
+    if value is None:
+        return None
+    try:
+        num = parse(value)
+    except ValueError:
+        num = 0
+    if num <= 0:
+        print(f'Error: Invalid {name} "{value}"', file = sys.stderr)
+        sys.exit(-1)
+    return num
+
+if __name__ == '__main__':
+    argv = sys.argv
+    resume = '--resume' in argv
+    argv = [x for x in argv if x != '--resume']
+    domain, argv = _option(argv, '--domain')
+    time_limit, argv = _option(argv, '--time-limit')
+    cpu_limit, argv = _option(argv, '--cpu-limit')
+    memory_limit, argv = _option(argv, '--memory-limit')
+    time_limit = _limit(time_limit, '--time-limit')
+    # ulimit -t takes whole seconds
+    cpu_limit = _limit(cpu_limit, '--cpu-limit', int)
+    memory_limit = _limit(memory_limit, '--memory-limit')
+
+    if len(argv) >= 6:
+        sys.exit(run(int(argv[1]), argv[2], argv[3], argv[4], argv[5:],
+                     domain, time_limit, cpu_limit, memory_limit, resume))
+
+    print('Usage: {0} [--domain domain.pddl] [--time-limit S] [--cpu-limit S] [--memory-limit MB] [--resume] num-workers planner outdir results.jsonl problem [problem ...]'.format(sys.argv[0]), file = sys.stderr)
+    print('', file = sys.stderr)
+    print('Runs the planner on every problem (a .pddl file, possibly compressed, a', file = sys.stderr)
+    print('directory or a glob pattern) with num-workers planners running at the same', file = sys.stderr)
+    print('time, each in its own temporary directory. planner is a shell command in', file = sys.stderr)
+    print('which {domain}, {problem}, {plan} and {name} are replaced by the domain, the', file = sys.stderr)
+    print('problem, the file the plan should be written to and the name of the problem;', file = sys.stderr)
+    print('the domain and the problem are appended if neither of them is used. If', file = sys.stderr)
+    print('{plan} is not used, the plan is read from sas_plan (or the last sas_plan.N).', file = sys.stderr)
+    print('', file = sys.stderr)
+    print('The plan of NAME.pddl and the output of the planner are stored in', file = sys.stderr)
+    print('outdir/NAME.sas_plan and outdir/NAME.log. The plan is validated and its', file = sys.stderr)
+    print('cost compared with the optimal cost in NAME.plan written by', file = sys.stderr)
+    print('generate-pddl.py. The status, cost, wall-clock and CPU time and the peak', file = sys.stderr)
+    print('memory of every run are appended to results.jsonl as soon as it finishes.', file = sys.stderr)
+    print('--time-limit kills the planner after S seconds of wall-clock time,', file = sys.stderr)
+    print('--cpu-limit and --memory-limit limit its CPU time (in whole seconds) and', file = sys.stderr)
+    print('address space.', file = sys.stderr)
+    print('--resume skips the problems already solved (or found invalid or unsolvable)', file = sys.stderr)
+    print('in results.jsonl and runs the others again, e.g., after a timeout or a crash.', file = sys.stderr)
+    sys.exit(-1)
@@ -0,0 +1 @@
+# Code shared by asp-2011/asp-to-pddl.py and generator-solver/generate-pddl.py
@@ -0,0 +1,160 @@
+# Reader of ASP Competition 2011 Generalized Slitherlink instances and their
+# conversion to PDDL problems, or to grounded tasks (see sas.py).
+
+import sys
+
+from slitherlink import pddl
+from slitherlink import sas as sasmod
+from slitherlink import compress
+from slitherlink import graph as graphmod
+from slitherlink import preprocess as preprocessmod
+from slitherlink import stats as statsmod
+
+# Argument types of the facts we care about: 't' is a constant term and 'i'
+# a non-negative integer. Facts of other predicates are skipped.
+FACTS = {
+    'edge' : 'tt',
+    'clue' : 'ti',
+    'cell_contains' : 'ttt',
+}
+
+def _isTerm(a):
+    return a.isalnum() or (len(a) > 0 and a.replace('_', '0').isalnum())
+
+def _parseFactsStrict(fn, lines):
+    facts = {pred : [] for pred in FACTS.keys()}
+    for lineno, line in enumerate(lines, 1):
+        line = line.strip()
+        if len(line) == 0 or line[0] == '%':
+            continue
+
+        pred, _, args = line.partition('(')
+        if not args.endswith(').'):
+            raise ValueError(f'{fn}:{lineno}: Malformed fact: {line}')
+        spec = FACTS.get(pred.strip())
+        if spec is None:
+            continue
+
+        args = [a.strip() for a in args[:-2].split(',')]
+        if len(args) != len(spec):
+            raise ValueError(f'{fn}:{lineno}: Expected {len(spec)} arguments'
+                             f' of {pred}: {line}')
+        for i, t in enumerate(spec):
+            if not _isTerm(args[i]):
+                raise ValueError(f'{fn}:{lineno}: Invalid term "{args[i]}":'
+                                 f' {line}')
+            if t == 'i':
+                if not args[i].isdigit():
+                    raise ValueError(f'{fn}:{lineno}: Expected integer instead'
+                                     f' of "{args[i]}": {line}')
+                args[i] = int(args[i])
+        facts[pred.strip()] += [tuple(args)]
+    return facts
+
+def _parseFactsFast(lines):
+    # Only handles the canonical form pred(a,b,...). with one fact per line
+    # and no whitespace or comments. Returns None if anything else is found.
+    raw = {pred : [] for pred in FACTS.keys()}
+    for line in lines:
+        pred, _, args = line.partition('(')
+        out = raw.get(pred)
+        if out is not None and args[-2:] == ').':
+            out += [args[:-2]]
+        elif len(line) > 0:
+            return None
+
+    facts = {}
+    for pred, spec in FACTS.items():
+        args = ','.join(raw[pred]).split(',')
+        if len(raw[pred]) == 0:
+            args = []
+        if len(args) != len(spec) * len(raw[pred]):
+            return None
+        if not ''.join(args).replace('_', '0').isalnum() or not all(args):
+            return None
+
+        cols = [args[i::len(spec)] for i in range(len(spec))]
+        for i, t in enumerate(spec):
+            if t == 'i':
+                if not ''.join(cols[i]).isdigit():
+                    return None
+                cols[i] = list(map(int, cols[i]))
+        facts[pred] = list(zip(*cols))
+    return facts
+
+# Reads the whole file as one buffer and returns a dictionary mapping each
+# predicate from FACTS to a list of argument tuples. The fast path covers
+# files in the canonical form; anything else (whitespace, comments, errors) is
+# parsed line by line and malformed facts are reported with their line
+# number.
+def readFacts(fn):
+    with compress.openFile(fn, 'rb') as fin:
+        data = fin.read()
+    if not data.isascii():
+        raise ValueError(f'{fn}: Non-ASCII input')
+    lines = data.decode('ascii').split('\n')
+
+    facts = _parseFactsFast(lines)
+    if facts is None:
+        facts = _parseFactsStrict(fn, lines)
+    return facts
+
+# If preprocess is set, edges decided by local deductions are dropped or
+# pre-linked. If start_edge is set, an edge certain to be part of the loop
+# is linked and link-0-0 is disabled. If fnmap is given, nodes and cells get
+# short names and the map to the original names is written to fnmap. If
+# stats is given, the phases are timed and the counts of the problem are
+# stored in it, see stats.py. If sas is set, the grounded task is written
+# instead of the PDDL problem.
+def convert(fn, fout, preprocess = False, start_edge = False, fnmap = None,
+            stats = None, sas = False):
+    with statsmod.phase(stats, 'parse'):
+        facts = readFacts(fn)
+    g = graphmod.fromFacts(facts, stats = stats)
+    num_levels = g.maxCapacity() + 1
+
+    linked = []
+    if preprocess or start_edge:
+        with statsmod.phase(stats, 'solver-input'):
+            edges, cells = g.solverInput()
+
+    start = -1
+    if start_edge:
+        with statsmod.phase(stats, 'start-edge'):
+            start = preprocessmod.startEdge(g.num_nodes, edges, cells)
+        if start >= 0:
+            linked = [start]
+        else:
+            print(f'{fn}: No edge is certain to be part of the loop,'
+                  ' link-0-0 is left to the planner', file = sys.stderr)
+
+    if preprocess:
+        with statsmod.phase(stats, 'preprocess'):
+            res = preprocessmod.deduce(g.num_nodes, edges, cells, start)
+        num_dropped = 0
+        if res is not None:
+            linked = res.linked
+            g.val = res.val
+            num_dropped = res.num_off
+        print(f'{fn}: Preprocessing dropped {num_dropped} cell-edge facts'
+              f' and pre-linked {len(linked)} edges', file = sys.stderr)
+
+    for e in linked:
+        g.link(e)
+
+    if fnmap is not None:
+        with compress.openFile(fnmap, 'w') as fmap:
+            graphmod.writeNameMap(fmap, graphmod.compactNames([g]))
+
+    if stats is not None:
+        stats.counts = graphmod.problemCounts([g], num_levels)
+
+    name = compress.stripExt(fn).split('/')[-1][:-4]
+    def write(fout):
+        if sas:
+            sasmod.writeGraphs(fout, [g])
+            return
+        pddl.writeGraphs(fout, f'sliterlink-{name}', [g], num_levels)
+        fout.write('\n')
+    statsmod.timeWrite(stats, fout, write)
+    return 0
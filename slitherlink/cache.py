@@ -0,0 +1,164 @@
+# Content-addressed on-disk cache of generated and solved puzzles.
+#
+# Every entry is a JSON file named by the SHA-256 hash of its key. Keys are
+# tuples of strings and integers, e.g., ('generate', rows, cols, seed, i) for
+# the i-th puzzle generated with the given seed or ('solve', puzzle-text,
+# 'shortest') for solutions of downloaded puzzles. The modification time of an entry is
+# updated on every hit and the least recently used entries are evicted once
+# the total size of the cache exceeds its limit.
+
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+import threading
+
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+def defaultPath():
+    path = os.environ.get('SLITHERLINK_CACHE')
+    if path is not None:
+        return path
+    base = os.environ.get('XDG_CACHE_HOME',
+                          os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'slitherlink-pddl')
+
+def defaultMaxSize():
+    size = os.environ.get('SLITHERLINK_CACHE_SIZE')
+    if size is not None:
+        return int(size) * 1024 * 1024
+    return DEFAULT_MAX_SIZE
+
+def keyHash(key):
+    data = json.dumps(list(key), separators = (',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+class Cache(object):
+    def __init__(self, path = None, max_size = None):
+        if path is None:
+            path = defaultPath()
+        if max_size is None:
+            max_size = defaultMaxSize()
+        self.path = path
+        self.max_size = max_size
+        # Total size of the cache, computed on the first insertion, and the
+        # lock guarding it and pruning against concurrent put() calls
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _fn(self, h):
+        return os.path.join(self.path, h[:2], h + '.json')
+
+    def get(self, key):
+        fn = self._fn(keyHash(key))
+        try:
+            with open(fn, 'r') as fin:
+                entry = json.load(fin)
+            os.utime(fn)
+        except (OSError, ValueError):
+            return None
+        if entry.get('key') != list(key):
+            return None
+        return entry['value']
+
+    def put(self, key, value):
+        fn = self._fn(keyHash(key))
+        os.makedirs(os.path.dirname(fn), exist_ok = True)
+        data = json.dumps({'key' : list(key), 'value' : value})
+
+        # Write to a temporary file first so that concurrent readers never
+        # see a partial entry
+        fd, tmp = tempfile.mkstemp(dir = os.path.dirname(fn), suffix = '.tmp')
+        with os.fdopen(fd, 'w') as fout:
+            fout.write(data)
+        size = os.path.getsize(tmp)
+
+        with self._lock:
+            # An entry written again replaces the old one of the same key
+            try:
+                old_size = os.stat(fn).st_size
+            except FileNotFoundError:
+                old_size = 0
+            os.replace(tmp, fn)
+            if self._size is None:
+                self._size = sum([esize for _, _, esize, _ in self.entries()])
+            else:
+                self._size += size - old_size
+            if self._size > self.max_size:
+                self._prune(self.max_size * 9 // 10)
+
+    # Yields (hash, mtime, size, filename) of all entries
+    def entries(self):
+        if not os.path.isdir(self.path):
+            return
+        for d in sorted(os.listdir(self.path)):
+            dpath = os.path.join(self.path, d)
+            if not os.path.isdir(dpath):
+                continue
+            for name in sorted(os.listdir(dpath)):
+                if not name.endswith('.json'):
+                    continue
+                fn = os.path.join(dpath, name)
+                try:
+                    st = os.stat(fn)
+                except OSError:
+                    continue
+                yield name[:-len('.json')], st.st_mtime, st.st_size, fn
+
+    # Removes the least recently used entries until the cache is not larger
+    # than max_size bytes. Returns the number of removed entries.
+    def prune(self, max_size = None):
+        if max_size is None:
+            max_size = self.max_size
+        with self._lock:
+            return self._prune(max_size)
+
+    def _prune(self, max_size):
+        entries = sorted(self.entries(), key = lambda x: x[1])
+        size = sum([x[2] for x in entries])
+        removed = 0
+        for _, _, esize, fn in entries:
+            if size <= max_size:
+                break
+            try:
+                os.unlink(fn)
+            except OSError:
+                pass
+            size -= esize
+            removed += 1
+        self._size = size
+        return removed
+
+def _describe(fn):
+    try:
+        with open(fn, 'r') as fin:
+            key = json.load(fin)['key']
+    except (OSError, ValueError, KeyError):
+        return '?'
+    if key[0] == 'solve':
+        rows = key[1].split('\n')
+        return f'solve {len(rows)}x{len(rows[0])}'
+    return ' '.join([str(x) for x in key])
+
+def main(cache, argv):
+    if argv == ['list']:
+        total = 0
+        for h, mtime, size, fn in sorted(cache.entries(), key = lambda x: x[1]):
+            tm = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(mtime))
+            print(f'{h[:16]}  {tm}  {size:8d}  {_describe(fn)}')
+            total += size
+        print(f'Total {total} bytes in {cache.path}, limit {cache.max_size}')
+        return 0
+
+    if len(argv) in [1, 2] and argv[0] == 'prune':
+        max_size = cache.max_size
+        if len(argv) == 2:
+            max_size = int(argv[1]) * 1024 * 1024
+        removed = cache.prune(max_size)
+        print(f'Removed {removed} entries from {cache.path}')
+        return 0
+
+    print('Invalid cache command', file = sys.stderr)
+    return -1
@@ -0,0 +1,129 @@
+# Catalog of converted and generated problems in an SQLite database.
+#
+# The converters add a row per written problem with its size, the counts of
+# graph.problemCounts(), the optimal cost if known, where it came from
+# (gen, gen-parallel, download, reencode or asp-2011), the SHA-256 of the
+# problem and plan files, and when and in how many seconds it was made.
+# Rows are keyed by the absolute path of the problem, so writing a problem
+# again replaces its row. The columns used for selecting instances are
+# indexed, see query-catalog.py.
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+COLUMNS = [
+    ('path', 'TEXT PRIMARY KEY'),
+    ('name', 'TEXT NOT NULL'),
+    ('source', 'TEXT NOT NULL'),
+    ('plan', 'TEXT'),
+    ('rows', 'INTEGER'),
+    ('cols', 'INTEGER'),
+    ('puzzles', 'INTEGER'),
+    ('nodes', 'INTEGER'),
+    ('cells', 'INTEGER'),
+    ('edges', 'INTEGER'),
+    ('clues', 'INTEGER'),
+    ('levels', 'INTEGER'),
+    ('linked', 'INTEGER'),
+    ('actions', 'INTEGER'),
+    ('optimal_cost', 'INTEGER'),
+    ('preprocess', 'INTEGER'),
+    ('start_edge', 'INTEGER'),
+    ('start_edges', 'TEXT'),
+    ('seed', 'TEXT'),
+    ('sha256', 'TEXT'),
+    ('plan_sha256', 'TEXT'),
+    ('created', 'REAL'),
+    ('seconds', 'REAL'),
+]
+COLUMN_NAMES = [c for c, _ in COLUMNS]
+
+_INDEXES = [['source'], ['rows', 'cols'], ['optimal_cost'], ['cells'],
+            ['nodes'], ['sha256']]
+
+def fileHash(fn):
+    h = hashlib.sha256()
+    with open(fn, 'rb') as fin:
+        for block in iter(lambda: fin.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+# Returns the row of the problem written to path. counts are those of
+# graph.problemCounts() and puzzles is the list of the puzzles of a problem
+# of generate-pddl.py. start_edges says how the start edge of every puzzle
+# was chosen, see generator.Prob. The hashes are computed from the files if
+# they are not given.
+def record(path, source, counts, puzzles = None, optimal_cost = None,
+           plan = None, preprocess = False, start_edge = False, seed = None,
+           seconds = None, sha256 = None, plan_sha256 = None,
+           start_edges = None):
+    name = os.path.basename(path).split('.')[0]
+    rows = cols = None
+    if puzzles is not None and len(puzzles) > 0:
+        rows = max([len(p) for p in puzzles])
+        cols = max([len(p[0]) for p in puzzles])
+    if sha256 is None and os.path.isfile(path):
+        sha256 = fileHash(path)
+    if plan is not None and plan_sha256 is None and os.path.isfile(plan):
+        plan_sha256 = fileHash(plan)
+
+    rec = {'path' : os.path.abspath(path), 'name' : name, 'source' : source,
+           'plan' : os.path.abspath(plan) if plan is not None else None,
+           'rows' : rows, 'cols' : cols,
+           'puzzles' : len(puzzles) if puzzles is not None else 1,
+           'optimal_cost' : optimal_cost, 'preprocess' : int(preprocess),
+           'start_edge' : int(start_edge),
+           'start_edges' : ' '.join(start_edges) if start_edges else None,
+           'seed' : seed, 'sha256' : sha256,
+           'plan_sha256' : plan_sha256, 'created' : time.time(),
+           'seconds' : seconds}
+    for c in ['nodes', 'cells', 'edges', 'clues', 'levels', 'linked', 'actions']:
+        rec[c] = counts.get(c)
+    return rec
+
+class Catalog(object):
+    # The catalog may be shared by threads, and by processes through the
+    # locking of SQLite
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, timeout = 60, check_same_thread = False)
+        self.db.row_factory = sqlite3.Row
+        cols = ', '.join([f'{c} {t}' for c, t in COLUMNS])
+        with self.db:
+            self.db.execute(f'CREATE TABLE IF NOT EXISTS instances ({cols})')
+            # Columns added since the catalog was created
+            have = [r['name'] for r in self.db.execute('PRAGMA table_info(instances)')]
+            for c, t in COLUMNS:
+                if c not in have:
+                    self.db.execute(f'ALTER TABLE instances ADD COLUMN {c} {t}')
+            for idx in _INDEXES:
+                self.db.execute('CREATE INDEX IF NOT EXISTS instances_{0} ON instances ({1})'.format(
+                                    '_'.join(idx), ', '.join(idx)))
+
+    def close(self):
+        self.db.close()
+
+    def add(self, records):
+        if len(records) == 0:
+            return
+        sql = 'INSERT OR REPLACE INTO instances ({0}) VALUES ({1})'.format(
+                    ', '.join(COLUMN_NAMES), ', '.join(['?'] * len(COLUMN_NAMES)))
+        with self.lock, self.db:
+            self.db.executemany(sql, [[r[c] for c in COLUMN_NAMES] for r in records])
+
+    # Returns the rows as dicts. where is an SQL condition with ? for the
+    # values of params, order a column name.
+    def query(self, where = None, params = (), order = 'path', limit = None):
+        sql = 'SELECT * FROM instances'
+        if where is not None and len(where) > 0:
+            sql += f' WHERE {where}'
+        if order is not None:
+            sql += f' ORDER BY {order}'
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+        with self.lock:
+            return [dict(r) for r in self.db.execute(sql, params)]
@@ -0,0 +1,72 @@
+# Transparent compression of problems, plans and instances, chosen by the
+# extension of the file name: .gz (gzip), .xz (xz) and .zst (Zstandard,
+# only if the zstandard module is installed). Other files are opened as
+# they are. Data is compressed and decompressed as it is written and read.
+
+import builtins
+import contextlib
+import gzip
+import lzma
+import os
+import shutil
+import tempfile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+EXTS = ['.gz', '.xz', '.zst']
+
+# Returns the compression extension of the file name or ''
+def compressionExt(fn):
+    for ext in EXTS:
+        if fn.endswith(ext):
+            return ext
+    return ''
+
+# Returns the file name without the compression extension
+def stripExt(fn):
+    ext = compressionExt(fn)
+    if ext == '':
+        return fn
+    return fn[:-len(ext)]
+
+# Replaces the extension of the file name keeping the compression, e.g.,
+# prob.pddl.gz becomes prob.map.gz for ext '.map'
+def replaceExt(fn, ext):
+    return os.path.splitext(stripExt(fn))[0] + ext + compressionExt(fn)
+
+# Opens the file like open(), mode is one of 'r', 'w', 'rb' and 'wb'
+def openFile(fn, mode = 'r'):
+    ext = compressionExt(fn)
+    text = 'b' not in mode
+    if ext == '.gz':
+        mode = mode[0] + ('t' if text else 'b')
+        return gzip.open(fn, mode, compresslevel = 6)
+    if ext == '.xz':
+        mode = mode[0] + ('t' if text else 'b')
+        return lzma.open(fn, mode)
+    if ext == '.zst':
+        if zstandard is None:
+            raise RuntimeError(f'{fn}: The zstandard module is needed for .zst files')
+        return zstandard.open(fn, mode)
+    return builtins.open(fn, mode)
+
+# Yields the name of an uncompressed copy of the file for programs that
+# cannot read compressed files, e.g., planners. The copy is streamed to a
+# temporary file which is removed afterwards. Uncompressed files are used
+# directly.
+@contextlib.contextmanager
+def plainFile(fn):
+    if compressionExt(fn) == '':
+        yield fn
+        return
+
+    name = os.path.basename(stripExt(fn))
+    with tempfile.TemporaryDirectory(prefix = 'slitherlink-') as tmpdir:
+        out = os.path.join(tmpdir, name)
+        with openFile(fn, 'rb') as fin:
+            with builtins.open(out, 'wb') as fout:
+                shutil.copyfileobj(fin, fout)
+        yield out
@@ -0,0 +1,255 @@
+# Lazy generation of corpora of problems of generate-pddl.py from a spec.
+#
+# A spec is a JSON object such as
+#
+#   {"seed" : "ipc2023",
+#    "preprocess" : false, "start_edge" : false, "solution_start_edge" : false,
+#    "compact_names" : false,
+#    "groups" : [{"rows" : 10, "cols" : 10, "count" : 100},
+#                {"rows" : 5, "count" : 20, "parallel" : [2, 4, 8]}]}
+#
+# Every group gives count problems of every width in parallel (default 1,
+# i.e., gen rather than gen-parallel) with puzzles of rows x cols (cols
+# defaults to rows). Only "groups" is required. "solution_start_edge" links
+# the first edge of the solution of a puzzle without an edge certain to be
+# part of the loop, see generator.Prob; without it such puzzles are
+# generated again in problems of several puzzles. The problems are named
+# ROWSxCOLS-pWIDTH-NUM. If the spec has a seed, the puzzles of a problem are
+# cached under the seed and the name of the problem, so building the same
+# corpus again takes them from the cache.
+#
+# instances() yields the problems one by one while the following ones are
+# generated in the background. At most `ahead` problems are being generated
+# or waiting to be consumed at any time, so the memory does not grow with the
+# size of the corpus. No puzzle is used twice in a corpus, counting
+# rotations and reflections as the same puzzle, see dedup.py.
+
+import os
+import io
+import json
+import hashlib
+import tarfile
+import threading
+import time
+import collections
+import concurrent.futures
+
+from slitherlink import graph
+from slitherlink import dedup
+from slitherlink import stats as statsmod
+from slitherlink.generator import Prob, MAX_REGENERATE, writeProblem, writePlan
+
+_OPTIONS = ['seed', 'preprocess', 'start_edge', 'solution_start_edge',
+            'compact_names', 'groups']
+_GROUP_KEYS = ['rows', 'cols', 'count', 'parallel']
+
+def _positive(group, key):
+    v = group[key]
+    if type(v) is not int or v < 1:
+        raise ValueError(f'"{key}" must be a positive integer, not {json.dumps(v)}')
+    return v
+
+# Checks the spec and fills in the defaults, raises ValueError
+def checkSpec(spec):
+    if type(spec) is not dict or type(spec.get('groups')) is not list:
+        raise ValueError('The spec must be an object with a list "groups"')
+    for key in spec:
+        if key not in _OPTIONS:
+            raise ValueError(f'Unknown option "{key}"')
+    out = {'seed' : spec.get('seed'),
+           'preprocess' : bool(spec.get('preprocess', False)),
+           'start_edge' : bool(spec.get('start_edge', False)),
+           'solution_start_edge' : bool(spec.get('solution_start_edge', False)),
+           'compact_names' : bool(spec.get('compact_names', False)),
+           'groups' : []}
+    if out['seed'] is not None:
+        out['seed'] = str(out['seed'])
+
+    for group in spec['groups']:
+        if type(group) is not dict or 'rows' not in group or 'count' not in group:
+            raise ValueError('Every group must be an object with "rows" and "count"')
+        for key in group:
+            if key not in _GROUP_KEYS:
+                raise ValueError(f'Unknown key "{key}" of a group')
+        group = dict(group)
+        group.setdefault('cols', group['rows'])
+        group.setdefault('parallel', 1)
+        if type(group['parallel']) is not list:
+            group['parallel'] = [group['parallel']]
+        for key in ['rows', 'cols', 'count']:
+            _positive(group, key)
+        for width in group['parallel']:
+            _positive({'parallel' : width}, 'parallel')
+        out['groups'] += [group]
+    return out
+
+def readSpec(fn):
+    with open(fn, 'r') as fin:
+        return checkSpec(json.load(fin))
+
+# Yields the metadata of the problems of the spec in the order of the corpus
+def tasks(spec):
+    for group in spec['groups']:
+        rows, cols = group['rows'], group['cols']
+        for width in group['parallel']:
+            for i in range(group['count']):
+                name = f'{rows}x{cols}-p{width}-{i:05d}'
+                seed = None
+                if spec['seed'] is not None:
+                    seed = spec['seed'] + '/' + name
+                yield {'name' : name, 'rows' : rows, 'cols' : cols,
+                       'parallel' : width, 'seed' : seed}
+
+def numTasks(spec):
+    return sum([g['count'] * len(g['parallel']) for g in spec['groups']])
+
+# The index shared by the threads generating the problems
+class _SharedIndex(object):
+    def __init__(self, index):
+        self.index = index
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        with self.lock:
+            self.index.refresh()
+
+    def containsHash(self, h):
+        with self.lock:
+            return self.index.containsHash(h)
+
+    # Adds the puzzles to the index if none of them is there yet, returns
+    # False otherwise
+    def claim(self, puzzles, source):
+        with self.lock:
+            if any([self.index.contains(p) for p in puzzles]):
+                return False
+            self.index.add(puzzles, source)
+            return True
+
+def _build(spec, meta, cache, index, with_stats):
+    # A problem generated at the same time as another one with some of its
+    # puzzles is generated again under a new seed
+    for attempt in range(MAX_REGENERATE + 1):
+        stats = statsmod.Stats(meta['name']) if with_stats else None
+        prob = Prob(use_start_edge = (meta['parallel'] > 1 or spec['start_edge']
+                                      or spec['solution_start_edge']),
+                    preprocess = spec['preprocess'], stats = stats,
+                    solution_start_edge = spec['solution_start_edge'])
+        seed = meta['seed']
+        if seed is not None and attempt > 0:
+            seed += f'/{attempt}'
+        prob.addGen(meta['rows'], meta['cols'], meta['parallel'], jobs = 1,
+                    seed = seed, cache = cache, index = index)
+        if index.claim(prob.puzzles, meta['name']):
+            return prob
+    raise RuntimeError(f'No new puzzles for {meta["name"]} found in'
+                       f' {MAX_REGENERATE} attempts')
+
+# Yields (prob, metadata) for every problem of the spec checked by
+# checkSpec(), where prob is a generator.Prob and metadata is a dict with the
+# name, rows, cols, parallel and seed of the problem. At most jobs problems
+# are generated at the same time (the default is the number of CPUs) and at
+# most ahead problems (default 2 * jobs) are kept in memory. The puzzles of
+# the problems are added to the dedup.Index index if given, and the puzzles
+# already in it are not used. Errors of the generator are raised as
+# RuntimeError or loop.LoopError once the consumer gets to the problem.
+def instances(spec, jobs = None, ahead = None, cache = None, index = None,
+              with_stats = False):
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    if ahead is None:
+        ahead = 2 * jobs
+    ahead = max(ahead, jobs)
+    shared = _SharedIndex(index if index is not None else dedup.Index(None))
+
+    pending = collections.deque()
+    it = tasks(spec)
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers = jobs)
+    try:
+        while True:
+            for meta in it:
+                pending += [(pool.submit(_build, spec, meta, cache, shared,
+                                         with_stats), meta)]
+                if len(pending) >= ahead:
+                    break
+            if len(pending) == 0:
+                break
+            fut, meta = pending.popleft()
+            yield fut.result(), meta
+    finally:
+        # Also if the consumer stops early
+        pool.shutdown(wait = True, cancel_futures = True)
+
+# Returns the text written by write(fout) encoded as UTF-8
+def _render(write):
+    fout = io.StringIO()
+    write(fout)
+    return fout.getvalue().encode('utf-8')
+
+# Corpus written to a directory
+class DirWriter(object):
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok = True)
+
+    # write(fout) writes the text of the file, returns the SHA-256 of the
+    # file
+    def add(self, name, write):
+        data = _render(write)
+        with open(os.path.join(self.path, name), 'wb') as fout:
+            fout.write(data)
+        return hashlib.sha256(data).hexdigest()
+
+    def close(self):
+        pass
+
+# Corpus written to a tar archive as a stream, so nothing but the file being
+# added is kept in memory
+class TarWriter(object):
+    def __init__(self, path, comp):
+        self.tar = tarfile.open(path, 'w|' + comp)
+
+    def add(self, name, write):
+        data = _render(write)
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        self.tar.addfile(info, io.BytesIO(data))
+        return hashlib.sha256(data).hexdigest()
+
+    def close(self):
+        self.tar.close()
+
+_TAR_EXTS = [('.tar', ''), ('.tar.gz', 'gz'), ('.tgz', 'gz'), ('.tar.xz', 'xz'),
+             ('.tar.bz2', 'bz2')]
+
+def isTar(path):
+    return any([path.endswith(ext) for ext, _ in _TAR_EXTS])
+
+# Returns the writer of the corpus: a tar archive compressed according to
+# its extension if path ends with .tar, .tar.gz, .tgz, .tar.xz or .tar.bz2,
+# and a directory otherwise
+def openWriter(path):
+    for ext, comp in _TAR_EXTS:
+        if path.endswith(ext):
+            return TarWriter(path, comp)
+    return DirWriter(path)
+
+# Writes NAME.pddl, NAME.plan and, if the spec says so, NAME.map of the
+# problem, and returns the metadata with the optimal cost of the problem, how
+# its start edges were chosen and the SHA-256 of the problem and the plan
+def writeInstance(writer, spec, prob, meta):
+    name = meta['name']
+    if spec['compact_names']:
+        names = graph.compactNames(prob.graphs)
+        writer.add(name + '.map', lambda fout: graph.writeNameMap(fout, names))
+    if prob.stats is not None:
+        prob.stats.counts = graph.problemCounts(prob.graphs, 5)
+    out = dict(meta)
+    out['optimal_cost'] = prob.optimalCost()
+    if prob.use_start_edge:
+        out['start_edges'] = prob.start_edges
+    out['sha256'] = writer.add(name + '.pddl', lambda fout: writeProblem(prob, fout))
+    out['plan_sha256'] = writer.add(name + '.plan', lambda fout: writePlan(prob, fout))
+    return out
@@ -0,0 +1,97 @@
+# Detection of duplicate puzzles up to rotations and reflections.
+#
+# The canonical form of a puzzle is the smallest of the texts of its 8
+# images under the symmetries of the square (4 rotations, each of them
+# possibly mirrored), so all images of a puzzle have the same canonical form
+# and the same hash. An index of the hashes of previously generated puzzles
+# is stored in a text file with one line per puzzle, "hash source", and it
+# is appended to by every generator run. The file is read once, lookups are
+# done in an in-memory set, so they take constant time regardless of the
+# size of the corpus, and lines appended by other runs are read only by
+# refresh().
+
+import os
+import hashlib
+
+def _rotate(puzzle):
+    rows = len(puzzle)
+    return [''.join([puzzle[rows - 1 - r][c] for r in range(rows)])
+                for c in range(len(puzzle[0]))]
+
+def _mirror(puzzle):
+    return [row[::-1] for row in puzzle]
+
+# Returns the 8 images of the puzzle given as a list of rows
+def images(puzzle):
+    out = []
+    p = list(puzzle)
+    for _ in range(4):
+        out += [p, _mirror(p)]
+        p = _rotate(p)
+    return out
+
+def canonical(puzzle):
+    return min(['\n'.join(p) for p in images(puzzle)])
+
+# 128 bits of the SHA-256 hash of the canonical form
+def puzzleHash(puzzle):
+    return hashlib.sha256(canonical(puzzle).encode('ascii')).hexdigest()[:32]
+
+# If path is None, the index is kept only in memory
+class Index(object):
+    def __init__(self, path):
+        self.path = path
+        self.hashes = set()
+        # Number of bytes of the file already read
+        self._offset = 0
+        self.refresh()
+
+    # Reads the lines appended to the file by other processes since the
+    # last refresh, e.g., before a batch of lookups. Costs a single stat if
+    # there are none.
+    def refresh(self):
+        if self.path is None:
+            return
+        try:
+            size = os.stat(self.path).st_size
+        except FileNotFoundError:
+            return
+        if size <= self._offset:
+            return
+        with open(self.path, 'rb') as fin:
+            fin.seek(self._offset)
+            data = fin.read()
+        # A line being written by another process is read next time
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].decode('ascii').split('\n'):
+            s = line.split()
+            if len(s) > 0:
+                self.hashes.add(s[0])
+        self._offset += end
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def containsHash(self, h):
+        return h in self.hashes
+
+    def contains(self, puzzle):
+        return self.containsHash(puzzleHash(puzzle))
+
+    # Adds the puzzles to the index, source is stored with them, e.g., the
+    # name of the problem
+    def add(self, puzzles, source = '-'):
+        lines = ''
+        for puzzle in puzzles:
+            h = puzzleHash(puzzle)
+            self.hashes.add(h)
+            lines += f'{h} {source}\n'
+        if len(lines) == 0 or self.path is None:
+            return
+        d = os.path.dirname(self.path)
+        if d != '':
+            os.makedirs(d, exist_ok = True)
+        # One write in append mode, so that lines of concurrent runs do not
+        # interleave
+        with open(self.path, 'a') as fout:
+            fout.write(lines)
@@ -0,0 +1,373 @@
+# Generation of the problems of generator-solver/generate-pddl.py from
+# puzzles of the external generator, or from any puzzles with their
+# solutions.
+
+import sys
+import os
+import random
+import copy
+import io
+import subprocess
+import tempfile
+import concurrent.futures
+
+from slitherlink import pddl
+from slitherlink import sas as sasmod
+from slitherlink import loop
+from slitherlink import grid
+from slitherlink import graph
+from slitherlink import solver
+from slitherlink import preprocess as preprocessmod
+from slitherlink import stats as statsmod
+from slitherlink import dedup
+
+# Directory of the external programs generate and solve
+PROGDIR = os.path.join(os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+                       'generator-solver')
+
+# Returns the list of edges ((row, col), (row, col)) of the ASCII solution
+def solutionEdges(solution):
+    plan = []
+    for ri, srow in enumerate(solution):
+        if ri % 2 == 0:
+            for i in range(1, len(srow), 2):
+                if srow[i] == '-':
+                    plan += [((ri // 2, i // 2), (ri // 2, i // 2 + 1))]
+        else:
+            for i in range(0, len(srow) + 1, 2):
+                if srow[i] == '|':
+                    plan += [((ri // 2, i // 2), (ri // 2 + 1, i // 2))]
+    return plan
+
+def chainPlan(plan):
+    return loop.chainLoop(plan)
+
+# Returns (puzzle, solution, plan) of the cache entry or None
+def _fromCache(cache, key):
+    if cache is None:
+        return None
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    plan = [tuple([tuple(n) for n in step]) for step in entry['plan']]
+    return entry['puzzle'], entry['solution'], plan
+
+def _toCache(cache, key, puzzle, solution, plan):
+    if cache is not None:
+        cache.put(key, {'puzzle' : puzzle, 'solution' : solution, 'plan' : plan})
+
+def _readLines(fn):
+    out = []
+    with open(fn, 'r') as fin:
+        for line in fin:
+            out += [line.strip('\n')]
+    return out
+
+def _run(cmd):
+    p = subprocess.run(cmd, stdout = subprocess.PIPE, stderr = subprocess.PIPE,
+                       universal_newlines = True)
+    if p.returncode != 0:
+        raise RuntimeError('{0} failed with exit code {1}:\n{2}'.format(
+                            ' '.join(cmd), p.returncode, p.stderr[-2000:]))
+    return p
+
+# The external programs are always run in a private temporary directory so
+# that any number of them can run concurrently, even from several
+# generate-pddl.py processes in the same directory.
+def runGenerate(rows, cols):
+    prog = os.path.join(PROGDIR, 'generate')
+    with tempfile.TemporaryDirectory(prefix = 'slitherlink-') as tmpdir:
+        fnprob = os.path.join(tmpdir, 'gen.prob')
+        fnsol = os.path.join(tmpdir, 'gen.sol')
+        _run([prog, str(rows), str(cols), fnprob, fnsol])
+        return _readLines(fnprob), _readLines(fnsol)
+
+# Falls back to the native solver if the external one is not built. The
+# native solver looks for the shortest loop, so that the optimal cost is
+# right for puzzles with several solutions as well; proving that no loop
+# is shorter takes about twice as long as finding the first one, 23 s on
+# puzzles/25x30-349clues.txt.
+def runSolve(puzzle):
+    prog = os.path.join(PROGDIR, 'solve')
+    if not os.path.isfile(prog):
+        sol = solver.solveGrid(puzzle, minimize = True)
+        if sol is None:
+            raise RuntimeError('The puzzle has no solution')
+        return sol.rstrip('\n').split('\n')
+
+    with tempfile.TemporaryDirectory(prefix = 'slitherlink-') as tmpdir:
+        fnprob = os.path.join(tmpdir, 'gen.prob')
+        with open(fnprob, 'w') as fout:
+            for row in puzzle:
+                fout.write(row + '\n')
+        p = _run([prog, fnprob, '100'])
+
+    solution = []
+    for line in p.stdout.split('\n'):
+        if len(line) == 0 or line[0] not in ['+', '|', ' ']:
+            continue
+        solution += [line]
+    return solution
+
+def _writeGrids(fout, grids, width):
+    for row in range(max([len(x) for x in grids])):
+        fout.write(';;')
+        for grid in grids:
+            fout.write('  ')
+            if row < len(grid):
+                fout.write(grid[row].ljust(width))
+            else:
+                fout.write(' ' * width)
+        fout.write('\n')
+
+# Writes the puzzles and their solutions side by side as comments, as read
+# back by pddl.headerGrids()
+def writeGridHeader(fout, puzzles, solutions):
+    width = max([len(x[0]) for x in puzzles] + [len(x[0]) for x in solutions])
+    _writeGrids(fout, puzzles, width)
+    fout.write(';;\n')
+    _writeGrids(fout, solutions, width)
+
+# Number of times a duplicate puzzle is generated again before giving up
+MAX_REGENERATE = 20
+
+class Prob(object):
+    # If preprocess is set, edges that cannot be part of the loop are dropped
+    # and a path of edges that must be part of it is pre-linked, see
+    # slitherlink/preprocess.py. If stats is given, the phases are timed in
+    # it, see slitherlink/stats.py.
+    # If use_start_edge is set, an edge certain to be part of the loop is
+    # linked in every puzzle. If no such edge is deduced, the first edge of
+    # the solution is linked instead only if solution_start_edge is set,
+    # otherwise the puzzle gets no start edge and link-0-0 stays enabled,
+    # which works only for problems of a single puzzle (addGen() generates
+    # such puzzles of several again instead).
+    def __init__(self, use_start_edge = False, preprocess = False, stats = None,
+                 solution_start_edge = False):
+        self.use_start_edge = use_start_edge
+        self.solution_start_edge = solution_start_edge
+        self.preprocess = preprocess
+        self.stats = stats
+        # Numbers of generated puzzles rejected by addGen() as duplicates and
+        # for having no start edge
+        self.num_duplicates = 0
+        self.num_no_start_edge = 0
+        # Number of dropped CELL-EDGE facts and of pre-linked edges
+        self.num_dropped = 0
+        self.num_linked = 0
+        # How the start edge of every puzzle was chosen: 'deduced',
+        # 'solution' or 'none', empty unless use_start_edge is set
+        self.start_edges = []
+        self.puzzles = []
+        self.solutions = []
+        self.graphs = []
+        self.plans = []
+
+    def _chainPlan(self, plan):
+        return chainPlan(plan)
+
+    # plan is the chained solution as returned by _chainPlan(), it is
+    # computed from solution if not given. solution_start_edge overrides
+    # the one of the problem for this puzzle.
+    def add(self, puzzle, solution, plan = None, solution_start_edge = None):
+        if solution_start_edge is None:
+            solution_start_edge = self.solution_start_edge
+        IDX = ''
+        if len(self.puzzles) > 0:
+            IDX = str(len(self.puzzles))
+
+        self.puzzles += [copy.deepcopy(puzzle)]
+        self.solutions += [copy.deepcopy(solution)]
+
+        rows = len(puzzle)
+        cols = len(puzzle[0])
+
+        if plan is None:
+            with statsmod.phase(self.stats, 'chain'):
+                plan = self._chainPlan(solutionEdges(solution))
+        self.plans += [plan]
+
+        # The grid creates the cells outside of it as well
+        with statsmod.phase(self.stats, 'grid'):
+            g = grid.Grid(rows, cols)
+            p = graph.fromGrid(puzzle, IDX, g)
+
+        start = -1
+        if self.use_start_edge:
+            with statsmod.phase(self.stats, 'start-edge'):
+                start = preprocessmod.startEdgeGrid(puzzle)
+            if start >= 0:
+                self.start_edges += ['deduced']
+            elif solution_start_edge:
+                print(f'Warning: No edge of puzzle {len(self.graphs)} is certain'
+                      ' to be part of the loop, linking the first edge of its'
+                      ' solution', file = sys.stderr)
+                start = g.edge(*plan[0])
+                self.start_edges += ['solution']
+            else:
+                print(f'Warning: No edge of puzzle {len(self.graphs)} is certain'
+                      ' to be part of the loop, link-0-0 stays enabled',
+                      file = sys.stderr)
+                self.start_edges += ['none']
+        linked = [start] if start >= 0 else []
+
+        if self.preprocess:
+            with statsmod.phase(self.stats, 'preprocess'):
+                res = preprocessmod.deduceGrid(puzzle, start)
+            if res is not None:
+                p.val = res.val
+                linked = res.linked
+                self.num_dropped += res.num_off
+
+        for e in linked:
+            p.link(e)
+        self.num_linked += len(linked)
+        self.graphs += [p]
+
+        # link-0-0 can start the loop of only one puzzle, and none once
+        # another puzzle has a linked edge
+        if self.use_start_edge and len(self.graphs) > 1 \
+                and any([len(x.linked) == 0 for x in self.graphs]):
+            raise RuntimeError('A puzzle of a problem of several puzzles has no'
+                               ' edge certain to be part of the loop, see'
+                               ' --solution-start-edge')
+
+    def writePddl(self, fout):
+        assert(len(self.puzzles) == len(self.solutions))
+        writeGridHeader(fout, self.puzzles, self.solutions)
+        fout.write('\n')
+
+        rand = int(1000000 * random.random())
+        pddl.writeGraphs(fout, f'sliterlink-{rand}', self.graphs, 5,
+                         upper = True)
+
+    def toPddl(self):
+        fout = io.StringIO()
+        self.writePddl(fout)
+        return fout.getvalue()
+
+    # Writes the grounded task of the problem, see slitherlink/sas.py
+    def writeSas(self, fout):
+        return sasmod.writeGraphs(fout, self.graphs)
+
+    def toSas(self):
+        fout = io.StringIO()
+        self.writeSas(fout)
+        return fout.getvalue()
+
+    # Generates num puzzles with the external generator running at most jobs
+    # instances of it at the same time (the default is the number of CPUs).
+    # The puzzles are added in the order of their jobs.
+    # If seed is given, the i-th puzzle is looked up in the cache under the
+    # key (rows, cols, seed, i) and generated only if it is not found there.
+    # Puzzles that are rotations or reflections of other puzzles of the
+    # problem, or of puzzles in the dedup.Index index if given, are generated
+    # again, at most MAX_REGENERATE times each. So are the puzzles without an
+    # edge certain to be part of the loop if the problem needs start edges
+    # for several puzzles, and the first edge of the solution is linked in
+    # the last attempt. Regenerated puzzles are cached under the key extended
+    # with the number of the attempt.
+    def addGen(self, rows, cols, num = 1, jobs = None, seed = None, cache = None,
+               index = None):
+        prog = os.path.join(PROGDIR, 'generate')
+        if seed is None:
+            cache = None
+
+        def job(i, attempt = 0):
+            key = ('generate', rows, cols, seed, i)
+            if attempt > 0:
+                key += (attempt,)
+            found = _fromCache(cache, key)
+            if found is not None:
+                return found
+            if not os.path.isfile(prog):
+                raise RuntimeError(f'Missing program {prog}')
+            puzzle, solution = runGenerate(rows, cols)
+            plan = chainPlan(solutionEdges(solution))
+            _toCache(cache, key, puzzle, solution, plan)
+            return puzzle, solution, plan
+
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        with statsmod.phase(self.stats, 'generate'):
+            with concurrent.futures.ThreadPoolExecutor(max_workers = jobs) as pool:
+                results = list(pool.map(job, range(num)))
+
+        # link-0-0 can start the loop of only one puzzle
+        need_start_edge = self.use_start_edge and not self.solution_start_edge \
+                            and len(self.graphs) + num > 1
+        if index is not None:
+            index.refresh()
+        seen = set()
+        fallback = [False] * num
+        for i in range(num):
+            attempt = 0
+            while True:
+                h = dedup.puzzleHash(results[i][0])
+                if h in seen or (index is not None and index.containsHash(h)):
+                    if attempt == MAX_REGENERATE:
+                        raise RuntimeError(f'No new puzzle {rows}x{cols} found in'
+                                           f' {MAX_REGENERATE} attempts')
+                    self.num_duplicates += 1
+                elif need_start_edge and preprocessmod.startEdgeGrid(results[i][0]) < 0:
+                    if attempt == MAX_REGENERATE:
+                        fallback[i] = True
+                        break
+                    self.num_no_start_edge += 1
+                else:
+                    break
+                attempt += 1
+                with statsmod.phase(self.stats, 'generate'):
+                    results[i] = job(i, attempt)
+            seen.add(h)
+        if self.num_duplicates > 0:
+            print(f'Regenerated {self.num_duplicates} duplicate puzzles', file = sys.stderr)
+        if self.num_no_start_edge > 0:
+            print(f'Regenerated {self.num_no_start_edge} puzzles without a start edge',
+                  file = sys.stderr)
+
+        for i, (puzzle, solution, plan) in enumerate(results):
+            self.add(puzzle, solution, plan, solution_start_edge = fallback[i] or None)
+        return 0
+
+    def optimalCost(self):
+        cost = sum([len(sol) for sol in self.plans])
+        return cost - self.num_linked
+
+    # Returns one problem for every puzzle, see slitherlink/split.py. The
+    # objects keep their names, so plans of the parts are plans of this
+    # problem, and the optimal costs of the parts sum up to its optimal cost.
+    def split(self):
+        if len(self.graphs) > 1 and any([len(g.linked) == 0 for g in self.graphs]):
+            raise ValueError('Puzzles without a linked edge share link-0-0')
+        out = []
+        for i, g in enumerate(self.graphs):
+            p = Prob(self.use_start_edge, self.preprocess,
+                     solution_start_edge = self.solution_start_edge)
+            p.start_edges = self.start_edges[i:i + 1]
+            p.puzzles = [self.puzzles[i]]
+            p.solutions = [self.solutions[i]]
+            p.plans = [self.plans[i]]
+            p.graphs = [g]
+            p.num_linked = len(g.linked)
+            out += [p]
+        assert(sum([p.optimalCost() for p in out]) == self.optimalCost())
+        return out
+
+    def printPreprocessStats(self):
+        if self.preprocess:
+            print('Preprocessing dropped {0} CELL-EDGE facts and pre-linked {1} edges'.format(
+                    self.num_dropped, self.num_linked), file = sys.stderr)
+
+# Writes the problem preceded by the command line that generated it
+def writeProblem(prob, fout):
+    fout.write(';; {0}\n'.format(' '.join(sys.argv)))
+    fout.write(';;\n')
+    statsmod.timeWrite(prob.stats, fout, prob.writePddl)
+
+# Writes the plan stub with the optimal cost of the problem and, if start
+# edges were used, how the start edge of every puzzle was chosen
+def writePlan(prob, fout):
+    fout.write(';; Optimal cost: {0}\n'.format(prob.optimalCost()))
+    if prob.use_start_edge:
+        fout.write(';; Start edges: {0}\n'.format(' '.join(prob.start_edges)))
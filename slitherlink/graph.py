@@ -0,0 +1,311 @@
+# Integer-indexed Slitherlink graph shared by the converters.
+#
+# Nodes, cells and edges are numbered from 0. The end nodes and the two
+# cells of every edge are stored in flat integer arrays, and the edges
+# incident to every node and bordering every cell in CSR form: the edges of
+# node n are node_edges[node_start[n]:node_start[n + 1]], and similarly for
+# cells. Every cell has a clue (-1 if it has none) and a capacity, i.e., the
+# number of links that can still be placed around it. Object names are
+# stored once per object and used only when the problem is written, see
+# pddl.writeGraphs().
+#
+# Graphs are loaded either from the facts of an ASP instance (fromFacts())
+# or from a rectangular puzzle (fromGrid()). Edges may be linked in the
+# initial state with link(), and edges known not to be part of the loop are
+# marked OFF in val and left out of the problem.
+
+from array import array
+
+from slitherlink import grid as gridmod
+from slitherlink import stats as statsmod
+
+# Values of edges in val as in solver.py
+UNKNOWN = 0
+ON = 1
+OFF = 2
+
+class Graph(object):
+    __slots__ = ('node_names', 'cell_names', 'edge_nodes', 'edge_cells',
+                 'cell_clue', 'cap', 'clue_cells', 'cap_order', 'linked',
+                 'val', 'node_start', 'node_edges', 'cell_start', 'cell_edges')
+
+    def __init__(self):
+        self.node_names = []
+        self.cell_names = []
+        # edge_nodes[2 * e], edge_nodes[2 * e + 1] are the end points of the
+        # edge e, edge_cells[2 * e], edge_cells[2 * e + 1] its cells
+        self.edge_nodes = array('i')
+        self.edge_cells = array('i')
+        self.cell_clue = array('b')
+        self.cap = array('b')
+        # Cells with clues in the order of the goals, the order of the
+        # capacities in the initial state (None for the order of cells),
+        # linked edges, and the values of edges (None if nothing is known)
+        self.clue_cells = []
+        self.cap_order = None
+        self.linked = []
+        self.val = None
+        # CSR adjacency, built on first use
+        self.node_start = None
+        self.node_edges = None
+        self.cell_start = None
+        self.cell_edges = None
+
+    @property
+    def num_nodes(self):
+        return len(self.node_names)
+
+    @property
+    def num_cells(self):
+        return len(self.cell_names)
+
+    @property
+    def num_edges(self):
+        return len(self.edge_nodes) // 2
+
+    def addNode(self, name):
+        self.node_names += [name]
+        return len(self.node_names) - 1
+
+    def addCell(self, name, cap, clue = -1):
+        self.cell_names += [name]
+        self.cap.append(cap)
+        self.cell_clue.append(clue)
+        if clue >= 0:
+            self.clue_cells += [len(self.cell_names) - 1]
+        return len(self.cell_names) - 1
+
+    def addEdge(self, n1, n2, c1, c2):
+        self.edge_nodes.extend((n1, n2))
+        self.edge_cells.extend((c1, c2))
+        return len(self.edge_nodes) // 2 - 1
+
+    # Builds the CSR adjacency of nodes and cells, it has to be called again
+    # if edges are added later
+    def finish(self):
+        self.node_start, self.node_edges = _csr(self.num_nodes, self.edge_nodes)
+        self.cell_start, self.cell_edges = _csr(self.num_cells, self.edge_cells)
+
+    def edgeNodes(self, e):
+        return self.edge_nodes[2 * e], self.edge_nodes[2 * e + 1]
+
+    def edgeCells(self, e):
+        return self.edge_cells[2 * e], self.edge_cells[2 * e + 1]
+
+    def nodeEdges(self, n):
+        if self.node_start is None:
+            self.finish()
+        return self.node_edges[self.node_start[n]:self.node_start[n + 1]]
+
+    def cellEdges(self, c):
+        if self.cell_start is None:
+            self.finish()
+        return self.cell_edges[self.cell_start[c]:self.cell_start[c + 1]]
+
+    # Links the edge in the initial state
+    def link(self, e):
+        self.linked += [e]
+        for c in self.edgeCells(e):
+            self.cap[c] -= 1
+
+    def degree(self):
+        degree = array('b', [0]) * self.num_nodes
+        for e in self.linked:
+            for n in self.edgeNodes(e):
+                degree[n] += 1
+        return degree
+
+    def maxCapacity(self):
+        return max(self.cap)
+
+    # Returns the edges and the cells with clues in the form expected by
+    # solver.Solver
+    def solverInput(self):
+        edges = [self.edgeNodes(e) for e in range(self.num_edges)]
+        cells = [(list(self.cellEdges(c)), self.cell_clue[c])
+                    for c in self.clue_cells]
+        return edges, cells
+
+# Returns the CSR arrays (start, edges) of the items given for both ends of
+# every edge in the flat array pairs
+def _csr(num, pairs):
+    order = sorted(range(len(pairs)), key = pairs.__getitem__)
+    start = array('i', [0]) * (num + 1)
+    for x in pairs:
+        start[x + 1] += 1
+    for i in range(num):
+        start[i + 1] += start[i]
+    return start, array('i', [i // 2 for i in order])
+
+# Builds the graph from the facts of an ASP instance as returned by
+# asp.readFacts(). Nodes and cells are numbered in the order of their names
+# and the edges in the order of the edge facts. The cells of an edge are
+# those containing it in the order of the cell_contains facts, and an edge
+# bordering only one cell gets an extra cell outside-cell-N1-N2 with
+# capacity 1. Cells with a clue have the clue as their capacity, the others
+# the number of their edges. The phases are timed in stats if given.
+def fromFacts(facts, node_prefix = 'n-', cell_prefix = 'c-', stats = None):
+    with statsmod.phase(stats, 'associate'):
+        edges, clues, cell_edges, edge_cells = _associate(facts)
+    with statsmod.phase(stats, 'outside-cells'):
+        _outsideCells(edges, cell_edges, edge_cells)
+    with statsmod.phase(stats, 'index'):
+        return _index(edges, clues, cell_edges, edge_cells, node_prefix,
+                      cell_prefix)
+
+# Returns the edges as pairs of nodes, the clues of cells, and the edges of
+# every cell and the cells of every edge
+def _associate(facts):
+    edges = []
+    edge_idx = {}
+    for n1, n2 in facts['edge']:
+        assert((n1, n2) not in edge_idx)
+        edge_idx[(n1, n2)] = len(edges)
+        edges += [(n1, n2)]
+
+    clues = {}
+    for c, clue in facts['clue']:
+        assert(c not in clues)
+        clues[c] = clue
+
+    cell_edges = {}
+    edge_cells = [[] for _ in edges]
+    for c, n1, n2 in facts['cell_contains']:
+        e = edge_idx.get((n1, n2))
+        if e is None:
+            e = edge_idx[(n2, n1)]
+        cell_edges.setdefault(c, [])
+        assert(e not in cell_edges[c])
+        cell_edges[c] += [e]
+        edge_cells[e] += [c]
+    return edges, clues, cell_edges, edge_cells
+
+def _outsideCells(edges, cell_edges, edge_cells):
+    for e, cs in enumerate(edge_cells):
+        assert(len(cs) in [1, 2])
+        if len(cs) == 1:
+            n1, n2 = edges[e]
+            name = f'outside-cell-{n1}-{n2}'
+            cs += [name]
+            cell_edges[name] = [e]
+
+def _index(edges, clues, cell_edges, edge_cells, node_prefix, cell_prefix):
+    nodes = set()
+    for n1, n2 in edges:
+        nodes.add(n1)
+        nodes.add(n2)
+    nodes = sorted(nodes)
+    node_id = {n : i for i, n in enumerate(nodes)}
+    cells = sorted(cell_edges.keys())
+    cell_id = {c : i for i, c in enumerate(cells)}
+
+    g = Graph()
+    g.node_names = [f'{node_prefix}{n}' for n in nodes]
+    g.cell_names = [f'{cell_prefix}{c}' for c in cells]
+    g.cell_clue = array('b', [clues.get(c, -1) for c in cells])
+    g.cap = array('b', [clues[c] if c in clues else len(cell_edges[c])
+                            for c in cells])
+    # The goals follow the order of the clue facts
+    g.clue_cells = [cell_id[c] for c in clues.keys()]
+    g.edge_nodes = array('i', [node_id[n] for e in edges for n in e])
+    g.edge_cells = array('i', [cell_id[c] for cs in edge_cells for c in cs])
+    return g
+
+# Builds the graph of the rectangular puzzle given as a list of rows ('.'
+# for cells without a clue) numbered as in grid.Grid g, which is created if
+# not given. The names of objects are prefixed with n{idx} and cell{idx} as
+# in the problems of generate-pddl.py, and the capacities of the cells
+# outside of the grid are listed first.
+def fromGrid(puzzle, idx = '', g = None):
+    if g is None:
+        g = gridmod.Grid(len(puzzle), len(puzzle[0]))
+    out = Graph()
+    out.node_names = g.nodeNames(f'n{idx}')
+    clues = {}
+    for r, row in enumerate(puzzle):
+        for c, ch in enumerate(row):
+            if ch != '.':
+                clues[g.cell(r, c)] = int(ch)
+    for cell, name in enumerate(g.cellNames(f'cell{idx}')):
+        if cell >= g.num_inner_cells:
+            out.addCell(name, 1)
+        else:
+            out.addCell(name, clues.get(cell, 4), clues.get(cell, -1))
+    out.edge_nodes = array('i', g.edge_nodes)
+    out.edge_cells = array('i', g.edge_cells)
+    out.cap_order = list(range(g.num_inner_cells, g.num_cells)) \
+                        + list(range(g.num_inner_cells))
+    return out
+
+# Returns the counts of the objects of the problem made of the graphs and
+# upper bounds on the numbers of groundings of the link actions of
+# domain.pddl: link-0-0 and each of link-0-1, link-1-0 and link-1-1
+# (link-x-y), and of all of them together (actions). Capacities never grow,
+# so an action is applicable to an edge only with the capacity levels of
+# its cells between 1 and their initial capacities, and link-0-0 cannot be
+# applied at all if (disable-link-0-0) is in the initial state.
+def problemCounts(graphs, num_levels):
+    counts = {'nodes' : 0, 'cells' : 0, 'edges' : 0, 'clues' : 0,
+              'levels' : num_levels, 'linked' : 0}
+    num_ground = 0
+    for g in graphs:
+        counts['nodes'] += g.num_nodes
+        counts['cells'] += g.num_cells
+        counts['clues'] += len(g.clue_cells)
+        counts['linked'] += len(g.linked)
+        cap = g.cap
+        ec = g.edge_cells
+        for e in range(g.num_edges):
+            if g.val is not None and g.val[e] == OFF:
+                continue
+            counts['edges'] += 1
+            num_ground += max(cap[ec[2 * e]], 0) * max(cap[ec[2 * e + 1]], 0)
+
+    counts['link-0-0'] = num_ground if counts['linked'] == 0 else 0
+    counts['link-x-y'] = num_ground
+    counts['actions'] = counts['link-0-0'] + 3 * num_ground
+    return counts
+
+_DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
+
+def _base36(i):
+    out = _DIGITS[i % 36]
+    i //= 36
+    while i > 0:
+        out = _DIGITS[i % 36] + out
+        i //= 36
+    return out
+
+# Replaces the names of all nodes and cells of the graphs by short ids: n_
+# or c_ followed by the index of the object in base 36. The underscore keeps
+# the ids apart from PDDL keywords, e.g., node 893 would be "not" otherwise.
+# Returns the list of pairs (short name, original name) to be stored with
+# writeNameMap().
+def compactNames(graphs):
+    pairs = []
+    num_nodes = 0
+    num_cells = 0
+    for g in graphs:
+        names = [f'n_{_base36(num_nodes + i)}' for i in range(g.num_nodes)]
+        pairs += zip(names, g.node_names)
+        g.node_names = names
+        num_nodes += g.num_nodes
+
+        names = [f'c_{_base36(num_cells + i)}' for i in range(g.num_cells)]
+        pairs += zip(names, g.cell_names)
+        g.cell_names = names
+        num_cells += g.num_cells
+    return pairs
+
+# The map has one line "short-name original-name" per object
+def writeNameMap(fout, pairs):
+    for short, name in pairs:
+        fout.write(f'{short} {name}\n')
+
+def readNameMap(fin):
+    names = {}
+    for line in fin:
+        s = line.split()
+        if len(s) == 2:
+            names[s[0]] = s[1]
+    return names
@@ -0,0 +1,115 @@
+# Integer-indexed model of a rectangular Slitherlink grid.
+#
+# Nodes (vertices) are numbered row by row, node (r, c) has index
+# r * (cols + 1) + c. Cells inside the grid are numbered row by row as well
+# and are followed by the cells outside of the grid bordering its left,
+# right, upper and lower edges. Every edge of the grid borders exactly two
+# cells and the pairs of cells and nodes of all edges are stored in flat
+# integer arrays. PDDL names are produced only on request.
+
+from array import array
+
+class Grid(object):
+    __slots__ = ('rows', 'cols', 'num_nodes', 'num_inner_cells', 'num_cells',
+                 'num_edges', 'edge_cells', 'edge_nodes', 'hedge', 'vedge')
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.num_nodes = (rows + 1) * (cols + 1)
+        self.num_inner_cells = rows * cols
+        self.num_cells = self.num_inner_cells + 2 * rows + 2 * cols
+
+        # edge_cells[2 * e], edge_cells[2 * e + 1] are the cells bordering
+        # the edge e, and edge_nodes[2 * e], edge_nodes[2 * e + 1] are its
+        # end points
+        self.edge_cells = array('i')
+        self.edge_nodes = array('i')
+        # Index of the horizontal edge from node (r, c) to (r, c + 1) and
+        # of the vertical edge from (r, c) to (r + 1, c)
+        self.hedge = array('i', [-1]) * ((rows + 1) * cols)
+        self.vedge = array('i', [-1]) * (rows * (cols + 1))
+
+        for r in range(1, rows):
+            for c in range(cols):
+                self._addHEdge(r, c, self.cell(r - 1, c), self.cell(r, c))
+        for c in range(cols):
+            self._addHEdge(0, c, self.outsideUp(c), self.cell(0, c))
+            self._addHEdge(rows, c, self.cell(rows - 1, c), self.outsideDown(c))
+        for c in range(1, cols):
+            for r in range(rows):
+                self._addVEdge(r, c, self.cell(r, c - 1), self.cell(r, c))
+        for r in range(rows):
+            self._addVEdge(r, 0, self.outsideLeft(r), self.cell(r, 0))
+            self._addVEdge(r, cols, self.cell(r, cols - 1), self.outsideRight(r))
+        self.num_edges = len(self.edge_cells) // 2
+
+    def _addHEdge(self, r, c, c1, c2):
+        self.hedge[r * self.cols + c] = len(self.edge_cells) // 2
+        self.edge_cells.extend((c1, c2))
+        self.edge_nodes.extend((self.node(r, c), self.node(r, c + 1)))
+
+    def _addVEdge(self, r, c, c1, c2):
+        self.vedge[r * (self.cols + 1) + c] = len(self.edge_cells) // 2
+        self.edge_cells.extend((c1, c2))
+        self.edge_nodes.extend((self.node(r, c), self.node(r + 1, c)))
+
+    def node(self, r, c):
+        return r * (self.cols + 1) + c
+
+    def cell(self, r, c):
+        return r * self.cols + c
+
+    def outsideLeft(self, r):
+        return self.num_inner_cells + 2 * r
+
+    def outsideRight(self, r):
+        return self.num_inner_cells + 2 * r + 1
+
+    def outsideUp(self, c):
+        return self.num_inner_cells + 2 * self.rows + 2 * c
+
+    def outsideDown(self, c):
+        return self.num_inner_cells + 2 * self.rows + 2 * c + 1
+
+    # Returns the index of the edge between nodes given as (row, col) pairs
+    def edge(self, n1, n2):
+        (r1, c1), (r2, c2) = sorted([n1, n2])
+        if r1 == r2 and c2 == c1 + 1:
+            return self.hedge[r1 * self.cols + c1]
+        if c1 == c2 and r2 == r1 + 1:
+            return self.vedge[r1 * (self.cols + 1) + c1]
+        raise ValueError(f'Nodes {n1} and {n2} are not adjacent')
+
+    def edgeCells(self, e):
+        return self.edge_cells[2 * e], self.edge_cells[2 * e + 1]
+
+    def edgeNodes(self, e):
+        return self.edge_nodes[2 * e], self.edge_nodes[2 * e + 1]
+
+    def nodeName(self, n, prefix = 'n'):
+        r, c = divmod(n, self.cols + 1)
+        return f'{prefix}-{r}-{c}'
+
+    def nodeNames(self, prefix = 'n'):
+        return [f'{prefix}-{r}-{c}' for r in range(self.rows + 1)
+                                      for c in range(self.cols + 1)]
+
+    def cellNames(self, prefix = 'cell'):
+        names = [f'{prefix}-{r}-{c}' for r in range(self.rows)
+                                       for c in range(self.cols)]
+        for r in range(self.rows):
+            names += [f'{prefix}-outside-{r}-left', f'{prefix}-outside-{r}-right']
+        for c in range(self.cols):
+            names += [f'{prefix}-outside-{c}-up', f'{prefix}-outside-{c}-down']
+        return names
+
+    def cellName(self, cell, prefix = 'cell'):
+        if cell < self.num_inner_cells:
+            r, c = divmod(cell, self.cols)
+            return f'{prefix}-{r}-{c}'
+
+        i, side = divmod(cell - self.num_inner_cells, 2)
+        if i < self.rows:
+            return f'{prefix}-outside-{i}-' + ('right' if side else 'left')
+        return f'{prefix}-outside-{i - self.rows}-' + ('down' if side else 'up')
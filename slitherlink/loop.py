@@ -0,0 +1,83 @@
+# Ordering and validation of Slitherlink solutions given as sets of edges.
+
+class LoopError(Exception):
+    # kind is one of:
+    #   'empty'        -- there are no edges at all
+    #   'duplicate'    -- the same edge is listed more than once
+    #   'degree'       -- some nodes have degree other than 0 or 2 (dead ends
+    #                     or branches), these are listed in nodes
+    #   'disconnected' -- the edges form more than one closed loop, num_loops
+    #                     is the number of loops
+    def __init__(self, kind, msg, nodes = [], num_loops = 0):
+        super().__init__(msg)
+        self.kind = kind
+        self.nodes = nodes
+        self.num_loops = num_loops
+
+# Returns, for each node, the list of indices of edges incident to it
+def adjacency(edges):
+    adj = {}
+    for ei, (n1, n2) in enumerate(edges):
+        if n1 in adj:
+            adj[n1] += [ei]
+        else:
+            adj[n1] = [ei]
+        if n2 in adj:
+            adj[n2] += [ei]
+        else:
+            adj[n2] = [ei]
+    return adj
+
+# Walks the loop starting from the edge with index start following the
+# orientation of that edge. Returns the list of visited edge indices in the
+# order of the walk. Requires every node to have degree 2.
+def _walk(edges, adj, start):
+    out = [start]
+    cur = start
+    nxt = edges[start][1]
+    while True:
+        e1, e2 = adj[nxt]
+        cur = e2 if e1 == cur else e1
+        if cur == start:
+            return out
+        out += [cur]
+        n1, n2 = edges[cur]
+        nxt = n2 if n1 == nxt else n1
+
+# Checks that edges form exactly one closed loop where every node has degree
+# 0 or 2, and returns the edges in the order in which they are traversed
+# starting from edges[0]. The edges themselves are not re-oriented.
+# Raises LoopError otherwise. Runs in time linear in the number of edges.
+def chainLoop(edges):
+    if len(edges) == 0:
+        raise LoopError('empty', 'There are no edges')
+
+    seen = set()
+    for n1, n2 in edges:
+        e = (n1, n2) if n1 <= n2 else (n2, n1)
+        if e in seen:
+            raise LoopError('duplicate', f'Edge {e} is listed more than once',
+                            nodes = list(e))
+        seen.add(e)
+
+    adj = adjacency(edges)
+    bad = sorted([n for n, es in adj.items() if len(es) != 2])
+    if len(bad) > 0:
+        raise LoopError('degree',
+                        f'{len(bad)} nodes have degree other than 0 or 2,'
+                        f' e.g., {bad[0]} has degree {len(adj[bad[0]])}',
+                        nodes = bad)
+
+    order = _walk(edges, adj, 0)
+    if len(order) != len(edges):
+        visited = set(order)
+        num_loops = 1
+        for ei in range(len(edges)):
+            if ei not in visited:
+                visited.update(_walk(edges, adj, ei))
+                num_loops += 1
+        raise LoopError('disconnected',
+                        f'The edges form {num_loops} separate loops',
+                        num_loops = num_loops)
+
+    return [edges[ei] for ei in order]
@@ -0,0 +1,398 @@
+# Streaming writer and reader of Slitherlink PDDL problem files.
+#
+# All sections are consumed from iterables and written to the output file
+# in chunks, so the problem text is never held in memory as a whole.
+# Problems are read back with regular expressions over the whole text,
+# which does not depend on the layout of the atoms.
+
+import itertools
+import re
+
+from slitherlink import graph as graphmod
+
+# Number of items joined into one write() call
+CHUNK_SIZE = 4096
+
+_ATOM = re.compile(r'\(([^()]*)\)')
+_NEG_ATOM = re.compile(r'\(\s*not\s*\(([^()]*)\)\s*\)')
+_COMMENT = re.compile(r';[^\n]*')
+_PROBLEM = re.compile(r'\(\s*problem\s+([^\s()]+)')
+_LEVEL = re.compile(r'cap-(\d+)$')
+# Names of nodes and cells of the problems of generate-pddl.py, the group is
+# the index of the sub-puzzle
+_GRID_NODE = re.compile(r'n(\d*)-(\d+)-(\d+)$')
+_GRID_CELL = re.compile(r'cell(\d*)-')
+
+def writeJoined(fout, sep, items):
+    it = iter(items)
+    chunk = list(itertools.islice(it, CHUNK_SIZE))
+    if len(chunk) == 0:
+        return
+    fout.write(sep.join(chunk))
+    while True:
+        chunk = list(itertools.islice(it, CHUNK_SIZE))
+        if len(chunk) == 0:
+            return
+        fout.write(sep)
+        fout.write(sep.join(chunk))
+
+# objects is a list of pairs (type, iterable of object names), init and goal
+# are lists of sections, each being an iterable of atoms. Sections are
+# separated by an empty line.
+def writeProblem(fout, name, objects, init, goal, domain = 'slitherlink'):
+    fout.write(f'(define (problem {name})\n')
+    fout.write(f'(:domain {domain})\n')
+    fout.write('\n')
+    fout.write('(:objects\n')
+    for typ, names in objects:
+        fout.write('    ')
+        writeJoined(fout, ' ', names)
+        fout.write(f' - {typ}\n')
+    fout.write(')\n')
+    fout.write('\n')
+
+    fout.write('(:init\n')
+    for i, section in enumerate(init):
+        if i > 0:
+            fout.write('\n\n')
+        fout.write('    ')
+        writeJoined(fout, '\n    ', section)
+    fout.write('\n)\n')
+
+    fout.write('(:goal\n')
+    fout.write('    (and\n')
+    for i, section in enumerate(goal):
+        if i > 0:
+            fout.write('\n\n')
+        fout.write('        ')
+        writeJoined(fout, '\n        ', section)
+    fout.write('\n    )\n')
+    fout.write(')\n')
+    fout.write(')\n\n\n')
+
+# Writes the problem of solving all graphs (see graph.py) at once, e.g., the
+# sub-puzzles of one problem. The capacity levels are cap-0 to
+# cap-{num_levels - 1}. If upper is set, the static predicates are written
+# in upper case as in the problems of generate-pddl.py.
+def writeGraphs(fout, name, graphs, num_levels, upper = False):
+    cell_capacity_inc = 'CELL-CAPACITY-INC' if upper else 'cell-capacity-inc'
+    cell_capacity = 'CELL-CAPACITY' if upper else 'cell-capacity'
+    cell_edge = 'CELL-EDGE' if upper else 'cell-edge'
+
+    levels = [f'cap-{i}' for i in range(num_levels)]
+    capacity_inc = [f'({cell_capacity_inc} cap-{i} cap-{i + 1})'
+                        for i in range(num_levels - 1)]
+
+    def cellCapacity():
+        for g in graphs:
+            order = g.cap_order if g.cap_order is not None else range(g.num_cells)
+            for c in order:
+                yield f'({cell_capacity} {g.cell_names[c]} cap-{g.cap[c]})'
+
+    def nodeDegree():
+        for g in graphs:
+            degree = g.degree()
+            for n, name in enumerate(g.node_names):
+                yield f'(node-degree{degree[n]} {name})'
+
+    def cellEdge():
+        for g in graphs:
+            cells = g.cell_names
+            nodes = g.node_names
+            ec = g.edge_cells
+            en = g.edge_nodes
+            for i in range(0, len(ec), 2):
+                if g.val is not None and g.val[i // 2] == graphmod.OFF:
+                    continue
+                yield f'({cell_edge} {cells[ec[i]]} {cells[ec[i + 1]]}' \
+                      f' {nodes[en[i]]} {nodes[en[i + 1]]})'
+
+    def linked():
+        for g in graphs:
+            for e in g.linked:
+                n1, n2 = g.edgeNodes(e)
+                yield f'(linked {g.node_names[n1]} {g.node_names[n2]})'
+        if any([len(g.linked) > 0 for g in graphs]):
+            yield '(disable-link-0-0)'
+
+    def nodeGoal():
+        for g in graphs:
+            for name in sorted(g.node_names):
+                yield f'(not (node-degree1 {name}))'
+
+    def goalCap():
+        for g in graphs:
+            for c in g.clue_cells:
+                yield f'({cell_capacity} {g.cell_names[c]} cap-0)'
+
+    writeProblem(fout, name,
+                 objects = [('cell-capacity-level', levels),
+                            ('node', itertools.chain(*[g.node_names for g in graphs])),
+                            ('cell', itertools.chain(*[g.cell_names for g in graphs]))],
+                 init = [capacity_inc, cellCapacity(), nodeDegree(), cellEdge(),
+                         linked()],
+                 goal = [nodeGoal(), goalCap()])
+
+
+class ParsedProblem(object):
+    __slots__ = ('name', 'objects', 'init', 'goal', 'neg_goal')
+
+    def __init__(self):
+        self.name = ''
+        # Pairs (name, type), and atoms as lists of tokens
+        self.objects = []
+        self.init = []
+        self.goal = []
+        self.neg_goal = []
+
+# Splits the text of a problem into its name, its objects, and the atoms of
+# its initial state and goal. Everything is converted to lower case.
+def parseProblem(text):
+    text = _COMMENT.sub('', text).lower()
+    out = ParsedProblem()
+    m = _PROBLEM.search(text)
+    if m is not None:
+        out.name = m.group(1)
+
+    i_obj = text.find('(:objects')
+    i_init = text.find('(:init')
+    i_goal = text.find('(:goal')
+    if i_obj < 0 or i_init < i_obj or i_goal < i_init:
+        raise ValueError('Missing :objects, :init or :goal section')
+
+    names = []
+    tokens = text[i_obj + len('(:objects'):i_init].replace(')', ' ').split()
+    i = 0
+    while i < len(tokens):
+        if tokens[i] != '-':
+            names += [tokens[i]]
+            i += 1
+            continue
+        if i + 1 >= len(tokens):
+            raise ValueError('Missing type in :objects')
+        out.objects += [(name, tokens[i + 1]) for name in names]
+        names = []
+        i += 2
+    if len(names) > 0:
+        raise ValueError('Objects without a type')
+
+    out.init = [atom.split() for atom in _ATOM.findall(text, i_init, i_goal)]
+    goal = text[i_goal:]
+    out.neg_goal = [atom.split() for atom in _NEG_ATOM.findall(goal)]
+    for atom in _ATOM.findall(_NEG_ATOM.sub('', goal)):
+        args = atom.split()
+        if len(args) > 0 and args[0] != 'and':
+            out.goal += [args]
+    return out
+
+# A problem read by readProblem(): the graphs of its sub-puzzles, the
+# number of capacity levels, whether the static predicates are in upper
+# case, and the comment lines at its beginning
+class Problem(object):
+    __slots__ = ('name', 'graphs', 'num_levels', 'upper', 'header')
+
+    def __init__(self):
+        self.name = ''
+        self.graphs = []
+        self.num_levels = 0
+        self.upper = False
+        self.header = []
+
+    # Writes the problem again, writeGraphs(fout, *problem.args()) gives the
+    # same atoms in the same order as the problem that was read
+    def args(self):
+        return self.name, self.graphs, self.num_levels, self.upper
+
+def _levels(objects, inc):
+    levels = [name for name, typ in objects if typ == 'cell-capacity-level']
+    for i, name in enumerate(levels):
+        m = _LEVEL.match(name)
+        if m is None or int(m.group(1)) != i:
+            raise ValueError(f'Unexpected capacity level {name}')
+    if sorted(inc) != [(f'cap-{i}', f'cap-{i + 1}') for i in range(len(levels) - 1)]:
+        raise ValueError('Capacity levels do not form a chain')
+    return len(levels)
+
+# Returns the key of the sub-puzzle of every node and cell: the index of the
+# sub-puzzle for the problems of generate-pddl.py, and '' for the others
+def _groups(nodes, cells):
+    node_keys = []
+    for name in nodes:
+        m = _GRID_NODE.match(name)
+        if m is None:
+            return [''] * len(nodes), [''] * len(cells)
+        node_keys += [m.group(1)]
+    cell_keys = []
+    for name in cells:
+        m = _GRID_CELL.match(name)
+        if m is None:
+            return [''] * len(nodes), [''] * len(cells)
+        cell_keys += [m.group(1)]
+    return node_keys, cell_keys
+
+# Reads a problem written by writeGraphs() back into graphs, one for every
+# sub-puzzle. The capacities of cells are those of the initial state, and
+# the clue of a cell in the goal is its capacity plus the number of its
+# linked edges. Node degrees must match the linked edges.
+def readProblem(fin):
+    text = fin.read()
+    out = Problem()
+    for line in text.split('\n'):
+        if not line.startswith(';'):
+            break
+        out.header += [line]
+    out.upper = 'CELL-EDGE' in text
+    parsed = parseProblem(text)
+    out.name = parsed.name
+
+    nodes = [name for name, typ in parsed.objects if typ == 'node']
+    cells = [name for name, typ in parsed.objects if typ == 'cell']
+    for name, typ in parsed.objects:
+        if typ not in ['node', 'cell', 'cell-capacity-level']:
+            raise ValueError(f'Unknown type {typ}')
+    node_keys, cell_keys = _groups(nodes, cells)
+
+    # Every object is mapped to its graph and its index in it
+    graphs = {}
+    node_idx = {}
+    cell_idx = {}
+    for key in node_keys + cell_keys:
+        if key not in graphs:
+            graphs[key] = graphmod.Graph()
+    for name, key in zip(nodes, node_keys):
+        g = graphs[key]
+        node_idx[name] = (g, g.addNode(name))
+    for name, key in zip(cells, cell_keys):
+        g = graphs[key]
+        cell_idx[name] = (g, g.addCell(name, -1))
+    out.graphs = list(graphs.values())
+    for g in out.graphs:
+        g.cap_order = []
+
+    def node(name):
+        if name not in node_idx:
+            raise ValueError(f'Unknown node {name}')
+        return node_idx[name]
+
+    def cell(name):
+        if name not in cell_idx:
+            raise ValueError(f'Unknown cell {name}')
+        return cell_idx[name]
+
+    inc = []
+    caps = []
+    degree = {}
+    linked = []
+    edges = {}
+    disabled = False
+    for args in parsed.init:
+        pred = args[0] if len(args) > 0 else ''
+        if pred == 'cell-edge' and len(args) == 5:
+            (g, c1), (g2, c2) = cell(args[1]), cell(args[2])
+            (g3, n1), (g4, n2) = node(args[3]), node(args[4])
+            if not (g is g2 is g3 is g4):
+                raise ValueError('Edge between sub-puzzles ({0})'.format(' '.join(args)))
+            edges[(args[3], args[4])] = g.addEdge(n1, n2, c1, c2)
+        elif pred == 'cell-capacity' and len(args) == 3:
+            caps += [(args[1], args[2])]
+        elif pred == 'cell-capacity-inc' and len(args) == 3:
+            inc += [(args[1], args[2])]
+        elif pred in ['node-degree0', 'node-degree1', 'node-degree2'] \
+                and len(args) == 2:
+            node(args[1])
+            if args[1] in degree:
+                raise ValueError(f'Node {args[1]} has two degrees')
+            degree[args[1]] = int(pred[-1])
+        elif pred == 'linked' and len(args) == 3:
+            linked += [(args[1], args[2])]
+        elif pred == 'disable-link-0-0' and len(args) == 1:
+            disabled = True
+        else:
+            raise ValueError('Unsupported initial atom ({0})'.format(' '.join(args)))
+
+    out.num_levels = _levels(parsed.objects, inc)
+    for name, lvl in caps:
+        g, c = cell(name)
+        if g.cap[c] >= 0:
+            raise ValueError(f'Cell {name} has two capacities')
+        g.cap[c] = int(lvl[4:]) if _LEVEL.match(lvl) else -1
+        if not 0 <= g.cap[c] < out.num_levels:
+            raise ValueError(f'Unknown capacity level {lvl}')
+        g.cap_order += [c]
+
+    for n1, n2 in linked:
+        e = edges.get((n1, n2), edges.get((n2, n1)))
+        if e is None:
+            raise ValueError(f'Linked nodes {n1} {n2} do not form an edge')
+        node(n1)[0].linked += [e]
+    if disabled != (len(linked) > 0):
+        raise ValueError('(disable-link-0-0) does not match the linked edges')
+
+    for g in out.graphs:
+        if -1 in g.cap:
+            raise ValueError('Cell {0} has no capacity'.format(
+                                g.cell_names[g.cap.index(-1)]))
+        if g.cap_order == list(range(g.num_cells)):
+            g.cap_order = None
+        for n, d in enumerate(g.degree()):
+            if degree.get(g.node_names[n], -1) != d:
+                raise ValueError('Degree of node {0} does not match the'
+                                 ' linked edges'.format(g.node_names[n]))
+
+    for args in parsed.neg_goal:
+        if len(args) != 2 or args[0] != 'node-degree1':
+            raise ValueError('Unsupported goal (not ({0}))'.format(' '.join(args)))
+        node(args[1])
+    for args in parsed.goal:
+        if args[0] != 'cell-capacity' or len(args) != 3 or args[2] != 'cap-0':
+            raise ValueError('Unsupported goal ({0})'.format(' '.join(args)))
+        g, c = cell(args[1])
+        g.clue_cells += [c]
+        g.cell_clue[c] = g.cap[c]
+    for g in out.graphs:
+        for e in g.linked:
+            for c in g.edgeCells(e):
+                if g.cell_clue[c] >= 0:
+                    g.cell_clue[c] += 1
+    return out
+
+# Returns the puzzles and the solutions drawn in the header of a problem of
+# generate-pddl.py as two lists with a list of rows for every sub-puzzle, or
+# None if there is no such header
+def headerGrids(problem):
+    dims = []
+    for g in problem.graphs:
+        rows = 0
+        cols = 0
+        for name in g.node_names:
+            m = _GRID_NODE.match(name)
+            if m is None:
+                return None
+            rows = max(rows, int(m.group(2)))
+            cols = max(cols, int(m.group(3)))
+        dims += [(rows, cols)]
+
+    blocks = [[]]
+    for line in problem.header:
+        if line.rstrip() == ';;':
+            blocks += [[]]
+        else:
+            blocks[-1] += [line]
+    if len(blocks) < 2:
+        return None
+
+    width = max([2 * cols + 1 for _, cols in dims])
+    puzzles = []
+    solutions = []
+    for k, (rows, cols) in enumerate(dims):
+        start = 4 + k * (width + 2)
+        puzzle = [line[start:start + cols].ljust(cols) for line in blocks[-2][:rows]]
+        solution = [line[start:start + 2 * cols + 1].ljust(2 * cols + 1)
+                        for line in blocks[-1][:2 * rows + 1]]
+        if len(puzzle) != rows or len(solution) != 2 * rows + 1:
+            return None
+        if any([c not in '.01234' for row in puzzle for c in row]):
+            return None
+        puzzles += [puzzle]
+        solutions += [solution]
+    return puzzles, solutions
@@ -0,0 +1,120 @@
+# Deductions run before a problem is written: edges that cannot be part of
+# the loop are dropped from CELL-EDGE and edges that must be part of it are
+# linked in the initial state.
+#
+# Only the local rules of the solver (clue counts, node degrees, no early
+# closing of the loop and, on rectangular grids, the corner and adjacent-3
+# patterns) are propagated to a fixpoint, there is no search. Since the
+# domain relies on a single use of link-0-0 to produce a single loop, the
+# linked edges must form one path and (disable-link-0-0) is added to the
+# initial state; the remaining edges known to be part of the loop are left
+# to the planner.
+#
+# The start edge linked instead of letting the planner choose where link-0-0
+# starts the loop is selected here as well, without looking at any solution.
+
+from slitherlink import solver as solvermod
+
+UNKNOWN = solvermod.UNKNOWN
+ON = solvermod.ON
+OFF = solvermod.OFF
+
+class Result(object):
+    __slots__ = ('val', 'linked', 'num_off', 'num_on')
+
+    def __init__(self, val, linked):
+        # val[e] is UNKNOWN, ON or OFF, and linked is the list of edges to
+        # be linked in the initial state
+        self.val = val
+        self.linked = linked
+        self.num_off = val.count(OFF)
+        self.num_on = val.count(ON)
+
+# Returns the edges of the path of ON edges containing the edge start, or
+# of the longest path if start is -1
+def _path(edges, val, start):
+    node_edges = {}
+    for ei, v in enumerate(val):
+        if v == ON:
+            for n in edges[ei]:
+                node_edges.setdefault(n, []).append(ei)
+
+    seen = set()
+    best = []
+    for first in ([start] if start >= 0 else range(len(val))):
+        if val[first] != ON or first in seen:
+            continue
+        path = [first]
+        seen.add(first)
+        i = 0
+        while i < len(path):
+            for n in edges[path[i]]:
+                for ej in node_edges[n]:
+                    if ej not in seen:
+                        seen.add(ej)
+                        path += [ej]
+            i += 1
+        if len(path) > len(best):
+            best = path
+    return sorted(best)
+
+def _finish(solver, edges, start):
+    if start >= 0 and not solver.assign(start, ON):
+        return None
+    if not solver.deduce():
+        return None
+    val = bytes(solver.val)
+    return Result(val, _path(edges, val, start))
+
+# edges is a list of pairs of nodes, cells a list of pairs (list of edges,
+# clue) as for solver.Solver. If start is given, the edge is assumed to be
+# part of the loop and the linked path contains it.
+# Returns None if the deductions show that there is no solution.
+def deduce(num_nodes, edges, cells, start = -1):
+    solver = solvermod.Solver(num_nodes, edges, cells)
+    return _finish(solver, edges, start)
+
+# The same for the rectangular puzzle given as a list of rows, the edges are
+# indexed as in grid.Grid
+def deduceGrid(puzzle, start = -1):
+    solver, g, clues = solvermod.gridSolver(puzzle)
+    for ei, v in solvermod.gridPatterns(g, clues):
+        if not solver.assign(ei, v):
+            return None
+    edges = [g.edgeNodes(ei) for ei in range(g.num_edges)]
+    return _finish(solver, edges, start)
+
+# Returns the ON edge next to the cell with the largest clue, or -1 if there
+# is no ON edge
+def _pickOn(solver):
+    best = -1
+    best_clue = -1
+    for ei, v in enumerate(solver.val):
+        if v != ON:
+            continue
+        clue = max([solver.cell_clue[ci] for ci in solver.edge_cells[ei]],
+                   default = 0)
+        if clue > best_clue:
+            best = ei
+            best_clue = clue
+    return best
+
+def _start(solver):
+    if not solver.deduce(probe = True):
+        return -1
+    return _pickOn(solver)
+
+# Selects an edge that is part of every solution: the candidates are the
+# edges forced by the local rules and by failed-literal probing, and the one
+# next to the largest clue (usually a 3) is preferred. Returns -1 if no edge
+# is certain to be part of the loop.
+def startEdge(num_nodes, edges, cells):
+    return _start(solvermod.Solver(num_nodes, edges, cells))
+
+# The same for the rectangular puzzle given as a list of rows
+def startEdgeGrid(puzzle):
+    solver, g, clues = solvermod.gridSolver(puzzle)
+    for ei, v in solvermod.gridPatterns(g, clues):
+        if not solver.assign(ei, v):
+            return -1
+    return _start(solver)
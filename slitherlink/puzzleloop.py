@@ -0,0 +1,183 @@
+# Download of puzzles from the old version of www.puzzle-loop.com.
+#
+# Pages are fetched over a pool of persistent HTTP connections shared by
+# any number of threads. All threads together make at most `rate` requests
+# per second. Connection errors, 429 and 5xx responses are retried with
+# exponential backoff. The puzzle is extracted from the LoopTable of the page
+# by scanning the raw text with regular expressions, without building a
+# document tree, so saved pages can also be parsed in bulk offline.
+
+import html
+import http.client
+import re
+import threading
+import time
+import urllib.parse
+
+# The "size" argument of the website doesn't specify the actual puzzle size;
+# rather, it maps to one of a number of sizes and difficulties, see
+# get_puzzle() in generate-pddl.py
+SPEC_MAP = {
+    '5x5 normal' : None,
+    '5x5 hard' : '4',
+    '7x7 normal' : '10',
+    '7x7 hard' : '11',
+    '10x10 normal' : '1',
+    '10x10 hard' : '5',
+    '15x15 normal' : '2',
+    '15x15 hard' : '6',
+    '20x20 normal' : '3',
+    '20x20 hard' : '7',
+    '25x30 normal' : '8',
+    '25x30 hard' : '9',
+    'special daily loop' : '13',
+    'special weekly loop' : '12',
+    'special monthly loop' : '14',
+}
+
+DEFAULT_URL = 'http://www.puzzle-loop.com/?v=0'
+
+# Returns the URL of a random puzzle of the spec, a key of SPEC_MAP
+def puzzleUrl(spec, base = DEFAULT_URL):
+    s = SPEC_MAP[spec]
+    if s is None:
+        return base
+    return base + ('&' if '?' in base else '?') + f'size={s}'
+
+_TABLE = re.compile(r'<table\b[^>]*\bid\s*=\s*["\']?LoopTable\b[^>]*>(.*?)</table\s*>',
+                    re.I | re.S)
+_ROW = re.compile(r'<tr\b[^>]*>(.*?)</tr\s*>', re.I | re.S)
+_CELL = re.compile(r'<td\b[^>]*>(.*?)</td\s*>', re.I | re.S)
+_TAG = re.compile(r'<[^>]*>')
+
+# Returns the puzzle in the LoopTable of the page as a list of rows, '.' for
+# cells without a clue. The rows of the table alternate between the nodes
+# and the cells, and so do the columns. Raises ValueError if the page
+# contains no puzzle.
+def parseLoopTable(text):
+    m = _TABLE.search(text)
+    if m is None:
+        raise ValueError('No LoopTable in the page')
+
+    rows = _ROW.findall(m.group(1))[1::2]
+    puzzle = []
+    for row in rows:
+        spec = ''
+        for cell in _CELL.findall(row)[1::2]:
+            val = html.unescape(_TAG.sub('', cell)).strip()
+            if val == '':
+                val = '.'
+            if len(val) != 1 or val not in '.0123':
+                raise ValueError(f'Invalid cell "{val}" in the LoopTable')
+            spec += val
+        puzzle += [spec]
+
+    if len(puzzle) == 0 or len(puzzle[0]) == 0 \
+            or any([len(r) != len(puzzle[0]) for r in puzzle]):
+        raise ValueError('The LoopTable is not a rectangular puzzle')
+    return puzzle
+
+# Returns a page with the puzzle in the LoopTable as on the website
+def renderPage(puzzle):
+    out = ['<html><head><title>Loop</title></head><body>\n',
+           '<table id="LoopTable" border="0" cellpadding="0" cellspacing="0">\n']
+    cols = len(puzzle[0])
+    node_row = '<tr>' + '<td class="dot"></td><td class="h"></td>' * cols \
+                + '<td class="dot"></td></tr>\n'
+    for row in puzzle:
+        out += [node_row, '<tr>']
+        for c in row:
+            out += ['<td class="v"></td><td class="cell">{0}</td>'.format(
+                        '' if c == '.' else c)]
+        out += ['<td class="v"></td></tr>\n']
+    out += [node_row, '</table>\n</body></html>\n']
+    return ''.join(out)
+
+# Spreads the requests of all threads so that at most rate of them are
+# started per second, 0 for no limit
+class RateLimiter(object):
+    def __init__(self, rate):
+        self.interval = 1. / rate if rate > 0 else 0.
+        self.next = 0.
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            t = max(now, self.next)
+            self.next = t + self.interval
+        if t > now:
+            time.sleep(t - now)
+
+class Session(object):
+    def __init__(self, rate = 1., retries = 3, timeout = 30., backoff = 1.):
+        self.limiter = RateLimiter(rate)
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        # Idle connections by (scheme, host, port)
+        self.idle = {}
+        self.lock = threading.Lock()
+        # Number of requests made, including the retried ones
+        self.num_requests = 0
+
+    def _connect(self, key):
+        with self.lock:
+            if len(self.idle.get(key, [])) > 0:
+                return self.idle[key].pop()
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout = self.timeout)
+        return http.client.HTTPConnection(host, port, timeout = self.timeout)
+
+    def _release(self, key, conn):
+        with self.lock:
+            self.idle.setdefault(key, []).append(conn)
+
+    def close(self):
+        with self.lock:
+            for conns in self.idle.values():
+                for conn in conns:
+                    conn.close()
+            self.idle = {}
+
+    # Returns the body of the page as text, raises RuntimeError if it cannot
+    # be fetched after the retries
+    def get(self, url):
+        u = urllib.parse.urlsplit(url)
+        if u.scheme not in ['http', 'https']:
+            raise RuntimeError(f'{url}: Unsupported URL')
+        key = (u.scheme, u.hostname, u.port)
+        path = u.path or '/'
+        if u.query != '':
+            path += '?' + u.query
+
+        err = None
+        for attempt in range(self.retries + 1):
+            if attempt > 0:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            self.limiter.wait()
+            with self.lock:
+                self.num_requests += 1
+            conn = self._connect(key)
+            try:
+                conn.request('GET', path, headers = {'Connection' : 'keep-alive'})
+                resp = conn.getresponse()
+                body = resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                # Also a kept-alive connection closed by the server
+                conn.close()
+                err = f'{url}: {e}'
+                continue
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+            if resp.status == 200:
+                charset = resp.headers.get_content_charset() or 'utf-8'
+                return body.decode(charset, errors = 'replace')
+            err = f'{url}: HTTP {resp.status} {resp.reason}'
+            if resp.status != 429 and resp.status < 500:
+                break
+        raise RuntimeError(err)
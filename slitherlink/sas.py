@@ -0,0 +1,266 @@
+# Writer of the grounded task of graphs (see graph.py) in the finite-domain
+# representation read by the search component of Fast Downward (the output
+# format of its translator, version 3), so that planners do not need to
+# translate and ground domain.pddl.
+#
+# The variables are
+#   - (linked n1 n2) of every edge that may still be linked,
+#   - (node-degree0 n) and (node-degree1 n) of every node that may still
+#     change its degree, degree 2 being neither of them, so that the goal
+#     (not (node-degree1 n)) is a single fact,
+#   - the capacity of every cell that may still change, with the values
+#     cap-0 to its initial capacity,
+#   - (disable-link-0-0) if link-0-0 is applicable at all.
+# Operators are written only for the groundings reachable in the relaxed
+# task: edges with both nodes of degree less than 2 and both cells of
+# capacity at least 1, capacity levels that a cell can reach by linking its
+# other edges, and node degrees as required by domain.pddl. Operators are
+# named like the actions of domain.pddl with the same parameters, so their
+# plans are plans of the PDDL problem as well.
+
+from slitherlink import graph as graphmod
+from slitherlink import pddl
+
+_VERSION = 3
+
+def _binary(atom):
+    return [f'Atom {atom}', f'NegatedAtom {atom}']
+
+def _variable(var, values):
+    yield 'begin_variable'
+    yield f'var{var}'
+    yield '-1'
+    yield str(len(values))
+    yield from values
+    yield 'end_variable'
+
+# The reachable part of the task of one graph with the indices of its
+# variables, -1 for nodes and cells without a variable
+class _Grounding(object):
+    def __init__(self, g, first_var):
+        self.g = g
+        self.degree = g.degree()
+        cap = g.cap
+        linked = set(g.linked)
+
+        self.live = []
+        node_live = [0] * g.num_nodes
+        cell_live = [0] * g.num_cells
+        for e in range(g.num_edges):
+            if e in linked or (g.val is not None and g.val[e] == graphmod.OFF):
+                continue
+            n1, n2 = g.edgeNodes(e)
+            c1, c2 = g.edgeCells(e)
+            if self.degree[n1] >= 2 or self.degree[n2] >= 2 \
+                    or cap[c1] < 1 or cap[c2] < 1:
+                continue
+            self.live += [e]
+            node_live[n1] += 1
+            node_live[n2] += 1
+            cell_live[c1] += 1
+            cell_live[c2] += 1
+
+        # Degrees of a node when one of its edges is linked, and the lowest
+        # capacity of a cell when one of its edges is linked
+        self.node_from = []
+        for n in range(g.num_nodes):
+            d = self.degree[n]
+            if d == 0 and node_live[n] >= 2:
+                self.node_from += [(0, 1)]
+            elif d == 0 and node_live[n] == 1:
+                self.node_from += [(0,)]
+            elif d == 1 and node_live[n] >= 1:
+                self.node_from += [(1,)]
+            else:
+                self.node_from += [()]
+        self.cell_min = [max(1, cap[c] - cell_live[c] + 1) for c in range(g.num_cells)]
+
+        var = first_var
+        self.var_edge = {}
+        for e in self.live:
+            self.var_edge[e] = var
+            var += 1
+        # A node of degree 1 keeps its variable even without edges for the
+        # goal, and so does a cell with a clue
+        self.var_deg0 = [-1] * g.num_nodes
+        self.var_deg1 = [-1] * g.num_nodes
+        for n in range(g.num_nodes):
+            if self.degree[n] == 0 and node_live[n] > 0:
+                self.var_deg0[n] = var
+                var += 1
+            if self.degree[n] == 1 or self.var_deg0[n] >= 0:
+                self.var_deg1[n] = var
+                var += 1
+        clue = set(g.clue_cells)
+        self.var_cap = [-1] * g.num_cells
+        for c in range(g.num_cells):
+            if cap[c] > 0 and (cell_live[c] > 0 or c in clue):
+                self.var_cap[c] = var
+                var += 1
+        self.end_var = var
+
+    # Pairs of degrees (d1, d2) of the link-d1-d2 operators of the edge
+    def _degrees(self, e, with_link_0_0):
+        n1, n2 = self.g.edgeNodes(e)
+        out = [(d1, d2) for d1 in self.node_from[n1] for d2 in self.node_from[n2]
+                   if d1 + d2 > 0]
+        if with_link_0_0 and 0 in self.node_from[n1] and 0 in self.node_from[n2]:
+            out = [(0, 0)] + out
+        return out
+
+    def numOperators(self, with_link_0_0):
+        g = self.g
+        num = 0
+        for e in self.live:
+            c1, c2 = g.edgeCells(e)
+            num += len(self._degrees(e, with_link_0_0)) \
+                       * (g.cap[c1] - self.cell_min[c1] + 1) \
+                       * (g.cap[c2] - self.cell_min[c2] + 1)
+        return num
+
+    # Yields the lines of the variables in the order of their indices
+    def variables(self):
+        g = self.g
+        names = g.node_names
+        for e in self.live:
+            n1, n2 = g.edgeNodes(e)
+            yield from _variable(self.var_edge[e],
+                                 _binary(f'linked({names[n1]}, {names[n2]})'))
+        for n in range(g.num_nodes):
+            if self.var_deg0[n] >= 0:
+                yield from _variable(self.var_deg0[n],
+                                     _binary(f'node-degree0({names[n]})'))
+            if self.var_deg1[n] >= 0:
+                yield from _variable(self.var_deg1[n],
+                                     _binary(f'node-degree1({names[n]})'))
+        for c in range(g.num_cells):
+            if self.var_cap[c] >= 0:
+                name = g.cell_names[c]
+                yield from _variable(self.var_cap[c],
+                        [f'Atom cell-capacity({name}, cap-{k})' for k in range(g.cap[c] + 1)])
+
+    def mutexGroups(self):
+        for n in range(self.g.num_nodes):
+            if self.var_deg0[n] >= 0:
+                yield ['begin_mutex_group', '2', f'{self.var_deg0[n]} 0',
+                       f'{self.var_deg1[n]} 0', 'end_mutex_group']
+
+    # The value of every variable in the initial state
+    def initialState(self):
+        for e in self.live:
+            yield '1'
+        for n in range(self.g.num_nodes):
+            if self.var_deg0[n] >= 0:
+                yield '0'
+            if self.var_deg1[n] >= 0:
+                yield '0' if self.degree[n] == 1 else '1'
+        for c in range(self.g.num_cells):
+            if self.var_cap[c] >= 0:
+                yield str(self.g.cap[c])
+
+    def goal(self):
+        for n in range(self.g.num_nodes):
+            if self.var_deg1[n] >= 0:
+                yield f'{self.var_deg1[n]} 1'
+        for c in self.g.clue_cells:
+            if self.var_cap[c] >= 0:
+                yield f'{self.var_cap[c]} 0'
+
+    # Effects "0 var pre post" of the node n in degree d
+    def _nodeEffects(self, n, d):
+        if d == 0:
+            return [f'0 {self.var_deg0[n]} 0 1', f'0 {self.var_deg1[n]} 1 0']
+        return [f'0 {self.var_deg1[n]} 0 1']
+
+    # Yields the operators as strings of lines, var_disable is the variable
+    # of (disable-link-0-0), -1 if link-0-0 is not applicable
+    def operators(self, var_disable):
+        g = self.g
+        names = g.node_names
+        cells = g.cell_names
+        for e in self.live:
+            n1, n2 = g.edgeNodes(e)
+            c1, c2 = g.edgeCells(e)
+            for d1, d2 in self._degrees(e, var_disable >= 0):
+                name = f'link-{d1}-{d2} {names[n1]} {names[n2]}'
+                eff = [f'0 {self.var_edge[e]} 1 0']
+                eff += self._nodeEffects(n1, d1)
+                eff += self._nodeEffects(n2, d2)
+                if d1 == 0 and d2 == 0:
+                    eff += [f'0 {var_disable} 1 0']
+                for f1 in range(self.cell_min[c1], g.cap[c1] + 1):
+                    for f2 in range(self.cell_min[c2], g.cap[c2] + 1):
+                        lines = ['begin_operator',
+                                 f'{name} {cells[c1]} cap-{f1} cap-{f1 - 1}'
+                                 f' {cells[c2]} cap-{f2} cap-{f2 - 1}',
+                                 '0', str(len(eff) + 2)]
+                        lines += eff
+                        lines += [f'0 {self.var_cap[c1]} {f1} {f1 - 1}',
+                                  f'0 {self.var_cap[c2]} {f2} {f2 - 1}',
+                                  '1', 'end_operator']
+                        yield '\n'.join(lines)
+
+# Writes the grounded task of solving all graphs at once, the same task as
+# the problem written by pddl.writeGraphs(). Returns the counts of the
+# variables and operators.
+def writeGraphs(fout, graphs):
+    grounds = []
+    var = 0
+    for g in graphs:
+        grounds += [_Grounding(g, var)]
+        var = grounds[-1].end_var
+    var_disable = -1
+    if all([len(g.linked) == 0 for g in graphs]):
+        var_disable = var
+        var += 1
+    num_vars = var
+    num_ops = sum([gr.numOperators(var_disable >= 0) for gr in grounds])
+
+    def variables():
+        for gr in grounds:
+            yield from gr.variables()
+        if var_disable >= 0:
+            yield from _variable(var_disable, _binary('disable-link-0-0()'))
+
+    def mutexGroups():
+        for gr in grounds:
+            for group in gr.mutexGroups():
+                yield '\n'.join(group)
+
+    def state():
+        for gr in grounds:
+            yield from gr.initialState()
+        if var_disable >= 0:
+            yield '1'
+
+    goal = []
+    for gr in grounds:
+        goal += list(gr.goal())
+
+    def operators():
+        for gr in grounds:
+            yield from gr.operators(var_disable)
+
+    fout.write(f'begin_version\n{_VERSION}\nend_version\n')
+    fout.write('begin_metric\n0\nend_metric\n')
+    fout.write(f'{num_vars}\n')
+    pddl.writeJoined(fout, '\n', variables())
+    fout.write('\n' if num_vars > 0 else '')
+    num_mutex = sum([sum([1 for _ in gr.mutexGroups()]) for gr in grounds])
+    fout.write(f'{num_mutex}\n')
+    pddl.writeJoined(fout, '\n', mutexGroups())
+    fout.write('\n' if num_mutex > 0 else '')
+    fout.write('begin_state\n')
+    pddl.writeJoined(fout, '\n', state())
+    fout.write('\n' if num_vars > 0 else '')
+    fout.write('end_state\n')
+    fout.write(f'begin_goal\n{len(goal)}\n')
+    pddl.writeJoined(fout, '\n', goal)
+    fout.write('\n' if len(goal) > 0 else '')
+    fout.write('end_goal\n')
+    fout.write(f'{num_ops}\n')
+    pddl.writeJoined(fout, '\n', operators())
+    fout.write('\n' if num_ops > 0 else '')
+    # No axioms
+    fout.write('0\n')
+    return {'variables' : num_vars, 'operators' : num_ops}
@@ -0,0 +1,692 @@
+# Constraint-propagation solver for Slitherlink puzzles on arbitrary graphs.
+#
+# Edge states are kept in a bytearray (UNKNOWN, ON, OFF) together with
+# per-node and per-cell counters of ON and UNKNOWN edges. Propagation applies
+# the local rules (clue counts and node degree 0 or 2) to a fixpoint and
+# keeps track of the two end points of every path formed by ON edges so that
+# no loop is closed while there are still other paths, i.e., only a single
+# loop can ever be formed. If the faces on both sides of every edge are
+# known, the faces are also joined in a union-find structure recording
+# whether two faces lie on the same side of the loop (an edge is ON iff the
+# faces on its two sides lie on different sides), which determines every
+# edge between two faces of the same set.
+# When propagation stalls, the solver checks that all paths can still be
+# connected, probes both values of every edge near the loop or a clue to
+# find more assignments, and then branches on the edge whose probes
+# propagated the most, backtracking on failure. A probe also fails if it
+# disconnects the loop; OFF edges cutting the graph are found cheaply as
+# cycles of faces joined across OFF edges (the dual of a cut of a planar
+# graph is a cycle), so the full check runs only for those.
+
+from slitherlink import grid as gridmod
+
+UNKNOWN = 0
+ON = 1
+OFF = 2
+
+class Solver(object):
+    # edges is a list of pairs of nodes (integers from 0 to num_nodes - 1),
+    # cells is a list of pairs (list of edge indices, clue), cells without
+    # a clue may be omitted.
+    # Optionally, faces is a list of pairs of faces (integers from 0 to
+    # num_faces - 1) on the two sides of each edge, and outside are the
+    # faces known to lie outside of the loop.
+    def __init__(self, num_nodes, edges, cells, faces = None, num_faces = 0,
+                 outside = ()):
+        self.num_nodes = num_nodes
+        self.edge_nodes = [tuple(e) for e in edges]
+        self.node_edges = [[] for _ in range(num_nodes)]
+        for ei, (n1, n2) in enumerate(self.edge_nodes):
+            self.node_edges[n1] += [ei]
+            self.node_edges[n2] += [ei]
+
+        self.cell_edges = []
+        self.cell_clue = []
+        self.edge_cells = [[] for _ in edges]
+        for es, clue in cells:
+            if clue is None:
+                continue
+            ci = len(self.cell_edges)
+            self.cell_edges += [list(es)]
+            self.cell_clue += [clue]
+            for ei in es:
+                self.edge_cells[ei] += [ci]
+
+        self.val = bytearray(len(edges))
+        self.node_on = [0] * num_nodes
+        self.node_unk = [len(es) for es in self.node_edges]
+        self.cell_on = [0] * len(self.cell_edges)
+        self.cell_unk = [len(es) for es in self.cell_edges]
+        # For a node with exactly one ON edge, end[n] is the other end of the
+        # path it belongs to
+        self.end = [-1] * num_nodes
+        self.num_ends = 0
+
+        self.edge_faces = None
+        self.outside = list(outside)
+        if faces is not None:
+            self.edge_faces = [tuple(f) for f in faces]
+            # The extra face num_faces stands for everything outside of the
+            # loop
+            self.face_edges = [[] for _ in range(num_faces + 1)]
+            for ei, (f1, f2) in enumerate(self.edge_faces):
+                self.face_edges[f1] += [ei]
+                self.face_edges[f2] += [ei]
+            # parity[f] is 1 iff f lies on the other side of the loop than
+            # parent[f]; the members of every set are linked in a ring
+            self.parent = list(range(num_faces + 1))
+            self.parity = bytearray(num_faces + 1)
+            self.size = [1] * (num_faces + 1)
+            self.ring = list(range(num_faces + 1))
+            # Faces joined across OFF edges: an OFF edge between two faces
+            # already joined closes a cycle around a part of the graph and
+            # so cuts the edges that are not OFF into two parts
+            self.off_parent = list(range(num_faces + 1))
+            self.off_size = [1] * (num_faces + 1)
+        # Set by assign() when an OFF edge cuts the graph, see _probe()
+        self.cut_off = False
+        # Edge selected for branching by _probe()
+        self.branch_edge = -1
+        self.num_on = 0
+        self.num_unknown = len(edges)
+        self.closed = False
+
+        # Every change is recorded so it can be undone when backtracking:
+        # edge indices for assignments and triples ('end', node, old value),
+        # ('union', root, new root), ('off', root, new root) and ('closed',
+        # 0, old value) for the rest. The queue holds edges to check.
+        self.trail = []
+        self.queue = []
+
+    def _edgeBetween(self, n1, n2):
+        for ei in self.node_edges[n1]:
+            a, b = self.edge_nodes[ei]
+            if (a == n1 and b == n2) or (a == n2 and b == n1):
+                return ei
+        return -1
+
+    def _setEnd(self, n, other):
+        self.trail.append(('end', n, self.end[n]))
+        self.end[n] = other
+
+    def _offFind(self, f):
+        parent = self.off_parent
+        while parent[f] != f:
+            f = parent[f]
+        return f
+
+    # Joins the faces on the two sides of an OFF edge, returns True if they
+    # were joined already
+    def _offUnion(self, f1, f2):
+        r1 = self._offFind(f1)
+        r2 = self._offFind(f2)
+        if r1 == r2:
+            return True
+        if self.off_size[r1] < self.off_size[r2]:
+            r1, r2 = r2, r1
+        self.off_parent[r2] = r1
+        self.off_size[r1] += self.off_size[r2]
+        self.trail.append(('off', r2, r1))
+        return False
+
+    def _find(self, f):
+        p = 0
+        parent = self.parent
+        while parent[f] != f:
+            p ^= self.parity[f]
+            f = parent[f]
+        return f, p
+
+    # Records that the faces f1 and f2 lie on the same side of the loop
+    # (d = 0) or on different sides (d = 1) and assigns all edges that
+    # become determined by it
+    def _union(self, f1, f2, d):
+        r1, p1 = self._find(f1)
+        r2, p2 = self._find(f2)
+        if r1 == r2:
+            return p1 ^ p2 == d
+        if self.size[r1] < self.size[r2]:
+            r1, r2 = r2, r1
+            p1, p2 = p2, p1
+        link = p1 ^ p2 ^ d
+
+        # Edges between the smaller set and the larger one
+        forced = []
+        f = r2
+        while True:
+            _, fp = self._find(f)
+            for ei in self.face_edges[f]:
+                if self.val[ei] == UNKNOWN:
+                    a, b = self.edge_faces[ei]
+                    r, p = self._find(b if a == f else a)
+                    if r == r1:
+                        forced += [(ei, ON if fp ^ link ^ p else OFF)]
+            f = self.ring[f]
+            if f == r2:
+                break
+
+        self.parent[r2] = r1
+        self.parity[r2] = link
+        self.size[r1] += self.size[r2]
+        self.ring[r1], self.ring[r2] = self.ring[r2], self.ring[r1]
+        self.trail.append(('union', r2, r1))
+        for ei, v in forced:
+            if not self.assign(ei, v):
+                return False
+        return True
+
+    def assign(self, ei, v):
+        cur = self.val[ei]
+        if cur != UNKNOWN:
+            return cur == v
+
+        n1, n2 = self.edge_nodes[ei]
+        if v == ON:
+            if self.closed:
+                return False
+            deg1 = self.node_on[n1]
+            deg2 = self.node_on[n2]
+            if deg1 == 2 or deg2 == 2:
+                return False
+            e1 = self.end[n1] if deg1 == 1 else n1
+            e2 = self.end[n2] if deg2 == 1 else n2
+
+        self.val[ei] = v
+        self.trail.append(ei)
+        self.queue.append(ei)
+        self.num_unknown -= 1
+        self.node_unk[n1] -= 1
+        self.node_unk[n2] -= 1
+        for ci in self.edge_cells[ei]:
+            self.cell_unk[ci] -= 1
+        if v == OFF:
+            # Cutting off a node without any other edge does not matter
+            if self.edge_faces is not None and self._offUnion(*self.edge_faces[ei]) \
+                    and self.node_unk[n1] + self.node_on[n1] > 0 \
+                    and self.node_unk[n2] + self.node_on[n2] > 0:
+                self.cut_off = True
+            return True
+
+        self.num_on += 1
+        self.node_on[n1] += 1
+        self.node_on[n2] += 1
+        for ci in self.edge_cells[ei]:
+            self.cell_on[ci] += 1
+        self.num_ends += (1 if deg1 == 0 else -1) + (1 if deg2 == 0 else -1)
+
+        if e1 == n2:
+            # This closes a loop which is allowed only if there is no other
+            # path, after that all remaining edges must be OFF
+            if self.num_ends > 0:
+                return False
+            self.closed = True
+            self.trail.append(('closed', 0, False))
+            for ej in range(len(self.val)):
+                if self.val[ej] == UNKNOWN and not self.assign(ej, OFF):
+                    return False
+            return True
+
+        self._setEnd(e1, e2)
+        self._setEnd(e2, e1)
+        if self.num_ends > 2:
+            # Linking the two ends of the new path would close a loop
+            ej = self._edgeBetween(e1, e2)
+            if ej >= 0 and ej != ei and not self.assign(ej, OFF):
+                return False
+        return True
+
+    def undo(self, mark):
+        trail = self.trail
+        while len(trail) > mark:
+            t = trail.pop()
+            if type(t) is tuple:
+                if t[0] == 'end':
+                    self.end[t[1]] = t[2]
+                elif t[0] == 'off':
+                    r2, r1 = t[1], t[2]
+                    self.off_parent[r2] = r2
+                    self.off_size[r1] -= self.off_size[r2]
+                elif t[0] == 'union':
+                    r2, r1 = t[1], t[2]
+                    self.parent[r2] = r2
+                    self.parity[r2] = 0
+                    self.size[r1] -= self.size[r2]
+                    self.ring[r1], self.ring[r2] = self.ring[r2], self.ring[r1]
+                else:
+                    self.closed = t[2]
+                continue
+
+            ei = t
+            v = self.val[ei]
+            self.val[ei] = UNKNOWN
+            n1, n2 = self.edge_nodes[ei]
+            self.num_unknown += 1
+            self.node_unk[n1] += 1
+            self.node_unk[n2] += 1
+            for ci in self.edge_cells[ei]:
+                self.cell_unk[ci] += 1
+            if v == ON:
+                deg1 = self.node_on[n1] - 1
+                deg2 = self.node_on[n2] - 1
+                self.node_on[n1] = deg1
+                self.node_on[n2] = deg2
+                self.num_ends -= (1 if deg1 == 0 else -1) + (1 if deg2 == 0 else -1)
+                self.num_on -= 1
+                for ci in self.edge_cells[ei]:
+                    self.cell_on[ci] -= 1
+        self.queue = []
+
+    def _setRest(self, edges, v):
+        for ei in edges:
+            if self.val[ei] == UNKNOWN and not self.assign(ei, v):
+                return False
+        return True
+
+    def _checkNode(self, n):
+        on = self.node_on[n]
+        unk = self.node_unk[n]
+        if on == 0:
+            if unk == 1:
+                return self._setRest(self.node_edges[n], OFF)
+        elif on == 1:
+            if unk == 0:
+                return False
+            if unk == 1:
+                return self._setRest(self.node_edges[n], ON)
+        elif on == 2:
+            if unk > 0:
+                return self._setRest(self.node_edges[n], OFF)
+        else:
+            return False
+        return True
+
+    def _checkCell(self, ci):
+        on = self.cell_on[ci]
+        unk = self.cell_unk[ci]
+        clue = self.cell_clue[ci]
+        if on > clue or on + unk < clue:
+            return False
+        if unk > 0:
+            if on == clue:
+                return self._setRest(self.cell_edges[ci], OFF)
+            if on + unk == clue:
+                return self._setRest(self.cell_edges[ci], ON)
+        return True
+
+    def _check(self, x):
+        n1, n2 = self.edge_nodes[x]
+        if not self._checkNode(n1) or not self._checkNode(n2):
+            return False
+        for ci in self.edge_cells[x]:
+            if not self._checkCell(ci):
+                return False
+        if self.edge_faces is not None:
+            f1, f2 = self.edge_faces[x]
+            return self._union(f1, f2, 1 if self.val[x] == ON else 0)
+        return True
+
+    def propagate(self):
+        queue = self.queue
+        while len(queue) > 0:
+            if not self._check(queue.pop()):
+                self.queue = []
+                return False
+            queue = self.queue
+        return True
+
+    # Checks that all paths and all cells that still need an edge can be
+    # joined into one loop using edges that are not OFF
+    def _connected(self):
+        if self.closed or self.num_on == 0:
+            return True
+
+        start = self.node_on.index(1) if self.num_ends > 0 else self.node_on.index(2)
+        seen = bytearray(self.num_nodes)
+        seen[start] = 1
+        stack = [start]
+        val = self.val
+        edge_nodes = self.edge_nodes
+        node_edges = self.node_edges
+        while len(stack) > 0:
+            n = stack.pop()
+            for ei in node_edges[n]:
+                if val[ei] != OFF:
+                    n1, n2 = edge_nodes[ei]
+                    m = n2 if n1 == n else n1
+                    if not seen[m]:
+                        seen[m] = 1
+                        stack.append(m)
+
+        for n in range(self.num_nodes):
+            if self.node_on[n] > 0 and not seen[n]:
+                return False
+        for ci, clue in enumerate(self.cell_clue):
+            if clue > 0 and self.cell_on[ci] == 0:
+                for ei in self.cell_edges[ci]:
+                    if val[ei] == UNKNOWN and seen[edge_nodes[ei][0]]:
+                        break
+                else:
+                    return False
+        return True
+
+    # Initial propagation of all cells and nodes
+    def _propagateAll(self):
+        if self.edge_faces is not None:
+            for f in self.outside:
+                if not self._union(f, len(self.parent) - 1, 0):
+                    return False
+                self._offUnion(f, len(self.parent) - 1)
+        for ci in range(len(self.cell_edges)):
+            if not self._checkCell(ci):
+                return False
+        for n in range(self.num_nodes):
+            if not self._checkNode(n):
+                return False
+        return self.propagate()
+
+    # Returns the list of (edge, value) assigned since the trail mark
+    def _assignedSince(self, mark):
+        return [(x, self.val[x]) for x in self.trail[mark:] if type(x) is int]
+
+    # Failed-literal probing: an edge whose assignment leads to a
+    # contradiction by propagation alone gets the opposite value, and the
+    # edges assigned the same value by propagating both values of an edge
+    # are assigned that value. A value fails as well if its OFF edges cut the
+    # graph so that the paths and clues can no longer be connected. The
+    # edges are probed in a cycle until none of them changed anything since
+    # the last change. Only edges next to ON edges or clue cells are probed
+    # as the others rarely give anything.
+    # The edge to branch on next is the one whose both values propagate the
+    # most in the probes since the last change.
+    def _probe(self):
+        num_edges = len(self.val)
+        self.branch_edge = -1
+        best = -1
+        ei = -1
+        left = num_edges
+        while left > 0:
+            left -= 1
+            ei = (ei + 1) % num_edges
+            if self.val[ei] != UNKNOWN:
+                continue
+            n1, n2 = self.edge_nodes[ei]
+            if self.node_on[n1] == 0 and self.node_on[n2] == 0 \
+                    and len(self.edge_cells[ei]) == 0:
+                continue
+
+            mark = len(self.trail)
+            self.cut_off = False
+            ok = self.assign(ei, ON) and self.propagate()
+            if ok and self.cut_off:
+                ok = self._connected()
+            num_on = len(self.trail) - mark
+            implied = dict(self._assignedSince(mark))
+            self.undo(mark)
+            if not ok:
+                if not self.assign(ei, OFF) or not self.propagate():
+                    return False
+                self.branch_edge = -1
+                best = -1
+                left = num_edges
+                continue
+
+            self.cut_off = False
+            ok = self.assign(ei, OFF) and self.propagate()
+            if ok and self.cut_off:
+                ok = self._connected()
+            num_off = len(self.trail) - mark
+            common = [(x, v) for x, v in self._assignedSince(mark)
+                              if implied.get(x) == v]
+            self.undo(mark)
+            if not ok:
+                if not self.assign(ei, ON) or not self.propagate():
+                    return False
+                self.branch_edge = -1
+                best = -1
+                left = num_edges
+                continue
+
+            if len(common) > 0:
+                for x, v in common:
+                    if not self.assign(x, v):
+                        return False
+                if not self.propagate():
+                    return False
+                self.branch_edge = -1
+                best = -1
+                left = num_edges
+                continue
+
+            score = (num_on + 1) * (num_off + 1)
+            if score > best:
+                best = score
+                self.branch_edge = ei
+        return True
+
+    def _choose(self):
+        if self.branch_edge >= 0 and self.val[self.branch_edge] == UNKNOWN:
+            return self.branch_edge
+
+        # Prefer extending a path through the end with the fewest options
+        best = -1
+        best_unk = 100
+        for n in range(self.num_nodes):
+            if self.node_on[n] == 1 and self.node_unk[n] < best_unk:
+                best = n
+                best_unk = self.node_unk[n]
+                if best_unk == 2:
+                    break
+        if best >= 0:
+            for ei in self.node_edges[best]:
+                if self.val[ei] == UNKNOWN:
+                    return ei
+
+        # Otherwise start at the cell with the largest clue
+        best = -1
+        best_clue = -1
+        for ci, clue in enumerate(self.cell_clue):
+            if self.cell_unk[ci] > 0 and clue - self.cell_on[ci] > best_clue:
+                best = ci
+                best_clue = clue - self.cell_on[ci]
+        if best >= 0:
+            for ei in self.cell_edges[best]:
+                if self.val[ei] == UNKNOWN:
+                    return ei
+
+        for ei, v in enumerate(self.val):
+            if v == UNKNOWN:
+                return ei
+        return -1
+
+    # Runs the search calling on_solution() for every solution found until
+    # it returns True. If bound is a function, branches where the number of
+    # ON edges is not smaller than bound() are pruned.
+    def search(self, on_solution, bound = None):
+        ok = self._propagateAll()
+        stack = []
+        while True:
+            if ok and bound is not None and self.num_on >= bound():
+                ok = False
+            if ok and not self._connected():
+                ok = False
+            if ok and not self._probe():
+                ok = False
+            if ok:
+                ei = self._choose()
+                if ei < 0:
+                    # Probing may have closed a loop beyond the bound
+                    if self.closed and (bound is None or self.num_on < bound()) \
+                            and on_solution():
+                        return True
+                    ok = False
+                else:
+                    # ON first: an ON edge extends a path and propagates
+                    # further, so a wrong guess is refuted sooner
+                    stack.append((len(self.trail), ei, True))
+                    ok = self.assign(ei, ON) and self.propagate()
+                    continue
+
+            while True:
+                if len(stack) == 0:
+                    return False
+                mark, ei, first = stack.pop()
+                self.undo(mark)
+                if first:
+                    stack.append((mark, ei, False))
+                    ok = self.assign(ei, OFF) and self.propagate()
+                    break
+
+    # Propagates the local rules to a fixpoint without any search, the
+    # values of the edges are left in self.val. If probe is set, failed
+    # literals are probed as well. Returns False if there is no solution.
+    def deduce(self, probe = False):
+        if not self._propagateAll():
+            return False
+        if probe:
+            return self._connected() and self._probe()
+        return True
+
+    def solution(self):
+        return [ei for ei, v in enumerate(self.val) if v == ON]
+
+    # Returns up to limit solutions (lists of ON edges), or, if minimize is
+    # set, a single solution with the smallest number of edges
+    def solve(self, limit = 1, minimize = False):
+        sols = []
+        if minimize:
+            best = [len(self.val) + 1]
+            def found():
+                sols[:] = [self.solution()]
+                best[0] = self.num_on
+                return False
+            self.search(found, lambda: best[0])
+        else:
+            def found():
+                sols.append(self.solution())
+                return len(sols) >= limit
+            self.search(found)
+        return sols
+
+
+def _gridCellEdges(g, r, c):
+    return [g.hedge[r * g.cols + c], g.hedge[(r + 1) * g.cols + c],
+            g.vedge[r * (g.cols + 1) + c], g.vedge[r * (g.cols + 1) + c + 1]]
+
+# Returns True if the edges satisfy all clues
+def _isGridSolution(g, clues, edges):
+    count = {}
+    for ei in edges:
+        for cell in g.edgeCells(ei):
+            if cell < g.num_inner_cells:
+                rc = divmod(cell, g.cols)
+                count[rc] = count.get(rc, 0) + 1
+    for cell, clue in clues.items():
+        if count.get(cell, 0) != clue:
+            return False
+    return True
+
+# Well-known patterns of rectangular grids that do not follow from the
+# local rules alone. Returns a list of (edge, value).
+def gridPatterns(g, clues):
+    out = []
+    def h(r, c):
+        return g.hedge[r * g.cols + c]
+    def v(r, c):
+        return g.vedge[r * (g.cols + 1) + c]
+
+    corners = [((0, 0), h(0, 0), v(0, 0)),
+               ((0, g.cols - 1), h(0, g.cols - 1), v(0, g.cols)),
+               ((g.rows - 1, 0), h(g.rows, 0), v(g.rows - 1, 0)),
+               ((g.rows - 1, g.cols - 1), h(g.rows, g.cols - 1), v(g.rows - 1, g.cols))]
+    for cell, e1, e2 in corners:
+        # A 3 in a corner uses both edges at the corner, a 1 neither
+        if clues.get(cell) == 3:
+            out += [(e1, ON), (e2, ON)]
+        elif clues.get(cell) == 1:
+            out += [(e1, OFF), (e2, OFF)]
+
+    for (r, c), clue in clues.items():
+        if clue != 3:
+            continue
+        # Two horizontally adjacent 3s: all three vertical edges are used,
+        # unless the loop is just the rectangle around both cells
+        if clues.get((r, c + 1)) == 3:
+            rect = [h(r, c), h(r, c + 1), h(r + 1, c), h(r + 1, c + 1),
+                    v(r, c), v(r, c + 2)]
+            if not _isGridSolution(g, clues, rect):
+                out += [(v(r, c), ON), (v(r, c + 1), ON), (v(r, c + 2), ON)]
+        # Two vertically adjacent 3s: all three horizontal edges are used,
+        # with the same exception
+        if clues.get((r + 1, c)) == 3:
+            rect = [v(r, c), v(r + 1, c), v(r, c + 1), v(r + 1, c + 1),
+                    h(r, c), h(r + 2, c)]
+            if not _isGridSolution(g, clues, rect):
+                out += [(h(r, c), ON), (h(r + 1, c), ON), (h(r + 2, c), ON)]
+        # Two diagonally adjacent 3s: the outer corners are used
+        if clues.get((r + 1, c + 1)) == 3:
+            out += [(h(r, c), ON), (v(r, c), ON),
+                    (h(r + 2, c + 1), ON), (v(r + 1, c + 2), ON)]
+        if clues.get((r + 1, c - 1)) == 3:
+            out += [(h(r, c), ON), (v(r, c + 1), ON),
+                    (h(r + 2, c - 1), ON), (v(r + 1, c - 1), ON)]
+    return out
+
+def gridSolver(puzzle):
+    rows = len(puzzle)
+    cols = max([len(row) for row in puzzle])
+    g = gridmod.Grid(rows, cols)
+    edges = [g.edgeNodes(ei) for ei in range(g.num_edges)]
+
+    clues = {}
+    cells = []
+    for r, row in enumerate(puzzle):
+        for c, ch in enumerate(row):
+            if ch != '.' and ch != ' ':
+                clues[(r, c)] = int(ch)
+                cells += [(_gridCellEdges(g, r, c), int(ch))]
+
+    faces = [g.edgeCells(ei) for ei in range(g.num_edges)]
+    solver = Solver(g.num_nodes, edges, cells, faces, g.num_cells,
+                    range(g.num_inner_cells, g.num_cells))
+    return solver, g, clues
+
+# Renders the solution in the same ASCII format as the former docplex-based
+# solveCP: '+' on every node, '-' and '|' for edges of the loop, and the
+# clues inside the cells
+def gridToAscii(g, clues, on_edges):
+    out = [[' '] * (2 * g.cols + 1) for _ in range(2 * g.rows + 1)]
+    for r in range(g.rows + 1):
+        for c in range(g.cols + 1):
+            out[2 * r][2 * c] = '+'
+    for (r, c), clue in clues.items():
+        out[2 * r + 1][2 * c + 1] = str(clue)
+    for ei in on_edges:
+        n1, n2 = g.edgeNodes(ei)
+        r1, c1 = divmod(n1, g.cols + 1)
+        r2, c2 = divmod(n2, g.cols + 1)
+        if r1 == r2:
+            out[2 * r1][2 * min(c1, c2) + 1] = '-'
+        else:
+            out[2 * min(r1, r2) + 1][2 * c1] = '|'
+    return ''.join([''.join(row) + '\n' for row in out])
+
+# Solves the rectangular puzzle given as a list of rows ('.' for cells
+# without a clue). Returns the ASCII solution or None if there is none.
+def solveGrid(puzzle, minimize = False):
+    solver, g, clues = gridSolver(puzzle)
+    for ei, v in gridPatterns(g, clues):
+        if not solver.assign(ei, v):
+            return None
+
+    sols = solver.solve(minimize = minimize)
+    if len(sols) == 0:
+        return None
+    return gridToAscii(g, clues, sols[0])
+
+# Returns the number of solutions of the puzzle, counting at most limit
+def countGridSolutions(puzzle, limit = 2):
+    solver, g, clues = gridSolver(puzzle)
+    for ei, v in gridPatterns(g, clues):
+        if not solver.assign(ei, v):
+            return 0
+    return len(solver.solve(limit = limit))
@@ -0,0 +1,122 @@
+# Decomposition of problems with several independent puzzles, e.g., those
+# of generate-pddl.py gen-parallel, into one problem per connected
+# component, and merging of the plans of the components.
+#
+# Nodes and cells are connected through the edges between them, so the
+# components share only the static capacity levels and (disable-link-0-0).
+# If every component has a linked edge, link-0-0 is disabled in all of them
+# and plans of the components, concatenated in any order, form a plan of
+# the whole problem whose cost is the sum of their costs. The objects keep
+# their names, so the plan of a component is a plan of the whole problem as
+# it is.
+
+from slitherlink import graph as graphmod
+
+# Returns the components of the graph with edges as lists (nodes, cells,
+# edges) of indices in increasing order
+def components(g):
+    # Union-find over the nodes followed by the cells
+    parent = list(range(g.num_nodes + g.num_cells))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(x, y):
+        x, y = find(x), find(y)
+        if x != y:
+            parent[max(x, y)] = min(x, y)
+
+    off = g.num_nodes
+    for e in range(g.num_edges):
+        n1, n2 = g.edgeNodes(e)
+        c1, c2 = g.edgeCells(e)
+        union(n1, n2)
+        union(n1, off + c1)
+        union(n1, off + c2)
+
+    comps = {}
+    def comp(x):
+        root = find(x)
+        if root not in comps:
+            comps[root] = ([], [], [])
+        return comps[root]
+    for n in range(g.num_nodes):
+        comp(n)[0].append(n)
+    for c in range(g.num_cells):
+        comp(off + c)[1].append(c)
+    for e in range(g.num_edges):
+        comp(g.edgeNodes(e)[0])[2].append(e)
+
+    # Nodes and cells without edges, e.g., after edges decided to be off
+    # were dropped, are added to the first component, they are in their goal
+    # state already
+    out = [x for x in comps.values() if len(x[2]) > 0]
+    rest = [x for x in comps.values() if len(x[2]) == 0]
+    if len(out) == 0:
+        out = [([], [], [])]
+    for nodes, cells, _ in rest:
+        out[0][0].extend(nodes)
+        out[0][1].extend(cells)
+    for nodes, cells, _ in out:
+        nodes.sort()
+        cells.sort()
+    return out
+
+# Returns the graph of the nodes, cells and edges of g with their
+# capacities, clues and linked edges, in the same order as in g
+def subgraph(g, nodes, cells, edges):
+    out = graphmod.Graph()
+    node_idx = {}
+    for n in nodes:
+        node_idx[n] = out.addNode(g.node_names[n])
+    cell_idx = {}
+    for c in cells:
+        cell_idx[c] = out.addCell(g.cell_names[c], g.cap[c], g.cell_clue[c])
+    out.clue_cells = [cell_idx[c] for c in g.clue_cells if c in cell_idx]
+    if g.cap_order is not None:
+        out.cap_order = [cell_idx[c] for c in g.cap_order if c in cell_idx]
+
+    edge_idx = {}
+    for e in edges:
+        n1, n2 = g.edgeNodes(e)
+        c1, c2 = g.edgeCells(e)
+        edge_idx[e] = out.addEdge(node_idx[n1], node_idx[n2],
+                                  cell_idx[c1], cell_idx[c2])
+    # The capacities are those after linking already
+    out.linked = [edge_idx[e] for e in g.linked if e in edge_idx]
+    if g.val is not None:
+        out.val = bytes([g.val[e] for e in edges])
+    return out
+
+# Returns the list of pairs (index of the graph, graph of the component)
+# for all components of the graphs. Raises ValueError if they cannot be
+# solved independently.
+def splitGraphs(graphs):
+    out = []
+    for i, g in enumerate(graphs):
+        comps = components(g)
+        if len(comps) == 1:
+            out += [(i, g)]
+        else:
+            out += [(i, subgraph(g, *comp)) for comp in comps]
+    if len(out) > 1 and any([len(g.linked) == 0 for _, g in out]):
+        raise ValueError('Components without a linked edge share link-0-0')
+    return out
+
+# Returns the steps of the plans (see validate.readPlan()) of the
+# components one after another
+def mergePlans(plans):
+    out = []
+    for steps in plans:
+        out += steps
+    return out
+
+# Writes the steps of a plan in the format of the planners, with the cost
+# of the plan in the last line
+def writeSteps(fout, steps):
+    for _, args in steps:
+        fout.write('({0})\n'.format(' '.join(args)))
+    fout.write(f'; cost = {len(steps)} (unit cost)\n')
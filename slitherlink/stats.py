@@ -0,0 +1,103 @@
+# Phase timing and instance statistics of the converters (--stats).
+#
+# A Stats object collects the time spent in the phases of one conversion in
+# the order they were first entered, and counts of the objects of the
+# converted problem. The statistics of any number of conversions are printed
+# either as one table or as JSON lines.
+
+import contextlib
+import json
+import time
+
+class Stats(object):
+    def __init__(self, name):
+        self.name = name
+        self.phases = {}
+        self.counts = {}
+
+    def addTime(self, phase, t):
+        self.phases[phase] = self.phases.get(phase, 0.) + t
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.addTime(name, time.perf_counter() - t)
+
+    def total(self):
+        return sum(self.phases.values())
+
+    def toDict(self):
+        return {'name' : self.name, 'phases' : self.phases,
+                'total' : self.total(), 'counts' : self.counts}
+
+# Times the phase if stats is not None
+def phase(stats, name):
+    if stats is None:
+        return contextlib.nullcontext()
+    return stats.phase(name)
+
+# Wraps the output file and adds the time spent in its write() to the phase
+# of stats, everything else done by the writer of the problem is formatting
+class TimedWriter(object):
+    def __init__(self, fout, stats, phase = 'write'):
+        self.fout = fout
+        self.stats = stats
+        self.phase = phase
+
+    def write(self, s):
+        t = time.perf_counter()
+        ret = self.fout.write(s)
+        self.stats.addTime(self.phase, time.perf_counter() - t)
+        return ret
+
+# Writes the problem with pddl.writeGraphs() or any other writer fn(fout)
+# timing the formatting and the writing separately. The output is flushed
+# so that the write phase is not just copying to a buffer.
+def timeWrite(stats, fout, fn):
+    if stats is None:
+        return fn(fout)
+    stats.addTime('format', 0.)
+    before = stats.phases.get('write', 0.)
+    t = time.perf_counter()
+    ret = fn(TimedWriter(fout, stats))
+    with stats.phase('write'):
+        fout.flush()
+    t = time.perf_counter() - t
+    stats.addTime('format', t - (stats.phases['write'] - before))
+    return ret
+
+def printJson(stats, fout):
+    for s in stats:
+        fout.write(json.dumps(s.toDict()) + '\n')
+
+# Prints one row per conversion with the phases in the order they were
+# first seen, followed by the counts
+def printTable(stats, fout):
+    phases = []
+    counts = []
+    for s in stats:
+        phases += [p for p in s.phases.keys() if p not in phases]
+        counts += [c for c in s.counts.keys() if c not in counts]
+
+    width = max([len(s.name) for s in stats] + [8])
+    cols = [max(len(x), 9) for x in phases + ['total'] + counts]
+    head = [x.rjust(w) for x, w in zip(phases + ['total'] + counts, cols)]
+    fout.write('{0}  {1}\n'.format('instance'.ljust(width), ' '.join(head)))
+    for s in stats:
+        row = ['{0:.3f}s'.format(s.phases[p]) if p in s.phases else '-'
+                    for p in phases]
+        row += ['{0:.3f}s'.format(s.total())]
+        row += [str(s.counts.get(c, '-')) for c in counts]
+        row = [x.rjust(w) for x, w in zip(row, cols)]
+        fout.write('{0}  {1}\n'.format(s.name.ljust(width), ' '.join(row)))
+
+def printStats(stats, fout, fmt = 'table'):
+    if len(stats) == 0:
+        return
+    if fmt == 'json':
+        printJson(stats, fout)
+    else:
+        printTable(stats, fout)
@@ -0,0 +1,80 @@
+# Synthetic Slitherlink puzzles with known solutions, generated without the
+# external generator, e.g., for benchmarks.
+#
+# A random region of cells is grown from a single cell. A cell is added to
+# the region only if none of the cells in front of it or diagonally in front
+# of it belongs to the region, so the region never touches itself and its
+# border is a single loop. The clues are the numbers of border edges around
+# the cells, and each of them is kept with the given probability. The
+# puzzles do not necessarily have a unique solution.
+
+import random
+
+from slitherlink import grid as gridmod
+from slitherlink import solver
+
+_DIRS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+# Returns the set of (row, col) of the region
+def _region(rows, cols, rnd):
+    def inGrid(r, c):
+        return 0 <= r < rows and 0 <= c < cols
+
+    r, c = rnd.randrange(rows), rnd.randrange(cols)
+    region = set([(r, c)])
+    # Candidate cells with the direction they are entered from, a cell may be
+    # listed more than once
+    seeds = [((r + dr, c + dc), (dr, dc)) for dr, dc in _DIRS
+                if inGrid(r + dr, c + dc)]
+    while len(seeds) > 0:
+        i = rnd.randrange(len(seeds))
+        seeds[i], seeds[-1] = seeds[-1], seeds[i]
+        (r, c), (dr, dc) = seeds.pop()
+        if (r, c) in region:
+            continue
+        left = (-dc, dr)
+        right = (dc, -dr)
+        front = [(r + left[0], c + left[1]), (r + right[0], c + right[1]),
+                 (r + dr, c + dc), (r + left[0] + dr, c + left[1] + dc),
+                 (r + right[0] + dr, c + right[1] + dc)]
+        if any([x in region for x in front]):
+            continue
+        region.add((r, c))
+        for d in [(dr, dc), left, right]:
+            if inGrid(r + d[0], c + d[1]):
+                seeds += [((r + d[0], c + d[1]), d)]
+    return region
+
+# Returns (puzzle, solution) of a random rows x cols puzzle: the puzzle as a
+# list of rows ('.' for cells without a clue) and the solution as a list of
+# rows of the ASCII drawing as returned by solver.gridToAscii()
+def randomPuzzle(rows, cols, seed = 0, clue_prob = 0.6):
+    rnd = random.Random(seed)
+    region = _region(rows, cols, rnd)
+    g = gridmod.Grid(rows, cols)
+
+    inside = [False] * g.num_cells
+    for r, c in region:
+        inside[g.cell(r, c)] = True
+    on_edges = [e for e in range(g.num_edges)
+                    if inside[g.edge_cells[2 * e]] != inside[g.edge_cells[2 * e + 1]]]
+
+    border = [0] * g.num_cells
+    for e in on_edges:
+        for c in g.edgeCells(e):
+            border[c] += 1
+
+    clues = {}
+    puzzle = []
+    for r in range(rows):
+        row = ''
+        for c in range(cols):
+            if rnd.random() < clue_prob:
+                clues[(r, c)] = border[g.cell(r, c)]
+                row += str(clues[(r, c)])
+            else:
+                row += '.'
+        puzzle += [row]
+
+    solution = solver.gridToAscii(g, clues, on_edges).rstrip('\n').split('\n')
+    return puzzle, solution
@@ -0,0 +1,415 @@
+# Fast validation of plans for Slitherlink PDDL problems.
+#
+# The problem is loaded into integer-indexed arrays: the capacity level of
+# every cell, the degree of every node, and the cells and nodes of every
+# edge. The plan is simulated on these per-cell and per-node counters,
+# checking the preconditions of every link action, and the final state is
+# checked against the goal. On top of what the domain itself guarantees,
+# the links must form exactly one loop in every connected part of the graph,
+# and the cost of the plan is compared with the optimal cost if it is known.
+
+import os
+import re
+from array import array
+
+from slitherlink import graph as graphmod
+from slitherlink import asp
+from slitherlink import compress
+from slitherlink import pddl
+
+# Degrees of the two nodes required by each action
+ACTIONS = {
+    'link-0-0' : (0, 0),
+    'link-0-1' : (0, 1),
+    'link-1-0' : (1, 0),
+    'link-1-1' : (1, 1),
+}
+
+_OPTIMAL_COST = re.compile(r'Optimal cost:\s*(\d+)')
+
+class Task(object):
+    def __init__(self):
+        self.name = ''
+        # Names of objects and their indices
+        self.node_names = []
+        self.cell_names = []
+        self.level_names = []
+        self.nodes = {}
+        self.cells = {}
+        self.levels = {}
+        # The edge between nodes (n1, n2) has index edges[(n1, n2)], and
+        # edge_cells[2 * e], edge_cells[2 * e + 1] are its cells
+        self.edges = {}
+        self.edge_cells = array('i')
+        self.edge_nodes = array('i')
+        # Initial state: capacity level of every cell and degree of every
+        # node (-1 if not defined), linked pairs of nodes
+        self.cap = array('b')
+        self.degree = array('b')
+        self.linked = []
+        self.disabled = False
+        # Goal: pairs (cell, level) and nodes that must not have degree 1
+        self.goal_cap = []
+        self.goal_nodes = []
+
+    def _add(self, names, index, name):
+        if name in index:
+            raise ValueError(f'Duplicate object {name}')
+        index[name] = len(names)
+        names += [name]
+
+    def addNode(self, name):
+        self._add(self.node_names, self.nodes, name)
+        self.degree.append(-1)
+
+    def addCell(self, name):
+        self._add(self.cell_names, self.cells, name)
+        self.cap.append(-1)
+
+    def addEdge(self, c1, c2, n1, n2):
+        if (n1, n2) in self.edges:
+            raise ValueError('Duplicate edge {0} {1}'.format(
+                                self.node_names[n1], self.node_names[n2]))
+        self.edges[(n1, n2)] = len(self.edge_cells) // 2
+        self.edge_cells.extend((c1, c2))
+        self.edge_nodes.extend((n1, n2))
+
+    def node(self, name):
+        n = self.nodes.get(name)
+        if n is None:
+            raise ValueError(f'Unknown node {name}')
+        return n
+
+    def cell(self, name):
+        c = self.cells.get(name)
+        if c is None:
+            raise ValueError(f'Unknown cell {name}')
+        return c
+
+    def level(self, name):
+        lvl = self.levels.get(name)
+        if lvl is None:
+            raise ValueError(f'Unknown capacity level {name}')
+        return lvl
+
+    # Component of the graph of every node
+    def components(self):
+        parent = list(range(len(self.node_names)))
+        def find(n):
+            while parent[n] != n:
+                parent[n] = parent[parent[n]]
+                n = parent[n]
+            return n
+        for i in range(0, len(self.edge_nodes), 2):
+            r1 = find(self.edge_nodes[i])
+            r2 = find(self.edge_nodes[i + 1])
+            if r1 != r2:
+                parent[r1] = r2
+        return [find(n) for n in range(len(parent))]
+
+# Orders the capacity levels following the CELL-CAPACITY-INC facts
+def _setLevels(task, names, inc):
+    higher = {}
+    for lower, high in inc:
+        if lower in higher:
+            raise ValueError(f'Capacity level {lower} has two successors')
+        higher[lower] = high
+    lowest = [x for x in names if x not in set(higher.values())]
+    if len(lowest) != 1:
+        raise ValueError('Capacity levels do not form a chain')
+
+    lvl = lowest[0]
+    while lvl is not None:
+        if lvl in task.levels:
+            raise ValueError('Capacity levels do not form a chain')
+        task._add(task.level_names, task.levels, lvl)
+        lvl = higher.get(lvl)
+    if len(task.levels) != len(names):
+        raise ValueError('Capacity levels do not form a chain')
+
+def loadPddl(fin):
+    parsed = pddl.parseProblem(fin.read())
+    task = Task()
+    task.name = parsed.name
+
+    levels = []
+    for name, typ in parsed.objects:
+        if typ == 'node':
+            task.addNode(name)
+        elif typ == 'cell':
+            task.addCell(name)
+        elif typ == 'cell-capacity-level':
+            levels += [name]
+        else:
+            raise ValueError(f'Unknown type {typ}')
+
+    inc = []
+    cap = []
+    for args in parsed.init:
+        pred = args[0] if len(args) > 0 else ''
+        if pred == 'cell-edge' and len(args) == 5:
+            task.addEdge(task.cell(args[1]), task.cell(args[2]),
+                         task.node(args[3]), task.node(args[4]))
+        elif pred == 'cell-capacity' and len(args) == 3:
+            cap += [(args[1], args[2])]
+        elif pred == 'cell-capacity-inc' and len(args) == 3:
+            inc += [(args[1], args[2])]
+        elif pred in ['node-degree0', 'node-degree1', 'node-degree2'] \
+                and len(args) == 2:
+            n = task.node(args[1])
+            if task.degree[n] >= 0:
+                raise ValueError(f'Node {args[1]} has two degrees')
+            task.degree[n] = int(pred[-1])
+        elif pred == 'linked' and len(args) == 3:
+            task.linked += [(task.node(args[1]), task.node(args[2]))]
+        elif pred == 'disable-link-0-0' and len(args) == 1:
+            task.disabled = True
+        else:
+            raise ValueError('Unsupported initial atom ({0})'.format(' '.join(args)))
+
+    _setLevels(task, levels, inc)
+    for cell, lvl in cap:
+        c = task.cell(cell)
+        if task.cap[c] >= 0:
+            raise ValueError(f'Cell {cell} has two capacities')
+        task.cap[c] = task.level(lvl)
+
+    for args in parsed.neg_goal:
+        if len(args) != 2 or args[0] != 'node-degree1':
+            raise ValueError('Unsupported goal (not ({0}))'.format(' '.join(args)))
+        task.goal_nodes += [task.node(args[1])]
+    for args in parsed.goal:
+        if args[0] != 'cell-capacity' or len(args) != 3:
+            raise ValueError('Unsupported goal ({0})'.format(' '.join(args)))
+        task.goal_cap += [(task.cell(args[1]), task.level(args[2]))]
+    return task
+
+# Builds the task of the graphs (see graph.py) as written by
+# pddl.writeGraphs()
+def fromGraphs(graphs, num_levels):
+    task = Task()
+    _setLevels(task, [f'cap-{i}' for i in range(num_levels)],
+               [(f'cap-{i}', f'cap-{i + 1}') for i in range(num_levels - 1)])
+    for g in graphs:
+        nodes = [len(task.node_names) + n for n in range(g.num_nodes)]
+        cells = [len(task.cell_names) + c for c in range(g.num_cells)]
+        for name in g.node_names:
+            task.addNode(name)
+        for name in g.cell_names:
+            task.addCell(name)
+
+        for e in range(g.num_edges):
+            n1, n2 = g.edgeNodes(e)
+            c1, c2 = g.edgeCells(e)
+            if g.val is None or g.val[e] != graphmod.OFF:
+                task.addEdge(cells[c1], cells[c2], nodes[n1], nodes[n2])
+        for e in g.linked:
+            n1, n2 = g.edgeNodes(e)
+            task.linked += [(nodes[n1], nodes[n2])]
+        for n, d in enumerate(g.degree()):
+            task.degree[nodes[n]] = d
+        task.goal_nodes += nodes
+        for c in range(g.num_cells):
+            task.cap[cells[c]] = g.cap[c]
+        task.goal_cap += [(cells[c], 0) for c in g.clue_cells]
+    task.disabled = len(task.linked) > 0
+    return task
+
+# Builds the same task as generate-pddl.py for the puzzle given as a list of
+# rows ('.' for cells without a clue)
+def fromGrid(puzzle, idx = ''):
+    return fromGraphs([graphmod.fromGrid(puzzle, idx)], 5)
+
+def fromAsp(fn):
+    g = graphmod.fromFacts(asp.readFacts(fn))
+    return fromGraphs([g], g.maxCapacity() + 1)
+
+# Loads the problem according to the extension of the file: .pddl, .asp, or
+# anything else for a puzzle with one row per line. Compressed files are
+# recognized by the extension before .gz, .xz or .zst.
+def loadTask(fn):
+    ext = os.path.splitext(compress.stripExt(fn))[1]
+    if ext == '.asp':
+        return fromAsp(fn)
+    with compress.openFile(fn, 'r') as fin:
+        if ext == '.pddl':
+            return loadPddl(fin)
+        puzzle = []
+        for line in fin:
+            line = line.strip()
+            if len(line) > 0:
+                puzzle += [line]
+    if len(puzzle) == 0:
+        raise ValueError(f'{fn}: Empty puzzle')
+    return fromGrid(puzzle)
+
+# Returns the list of steps (line number, [action, arg, ...]) of the plan
+def readPlan(fin):
+    steps = []
+    for lineno, line in enumerate(fin, 1):
+        line = line.split(';', 1)[0].strip().lower()
+        if len(line) == 0:
+            continue
+        i = line.find('(')
+        j = line.rfind(')')
+        if i < 0 or j < i:
+            raise ValueError(f'line {lineno}: Malformed action {line}')
+        steps += [(lineno, line[i + 1:j].split())]
+    return steps
+
+# Returns the optimal cost stored by generate-pddl.py or None
+def readOptimalCost(fn):
+    with compress.openFile(fn, 'r') as fin:
+        m = _OPTIMAL_COST.search(fin.read())
+    if m is None:
+        return None
+    return int(m.group(1))
+
+def _names(names, idxs, limit = 5):
+    out = ' '.join([names[i] for i in idxs[:limit]])
+    if len(idxs) > limit:
+        out += ' ...'
+    return out
+
+# Applies one step to the state, returns an error message or None
+def _apply(task, args, cap, degree, linked, state):
+    req = ACTIONS.get(args[0])
+    if req is None:
+        return f'Unknown action {args[0]}'
+    if len(args) != 9:
+        return f'Expected 8 arguments of {args[0]}'
+    n1 = task.nodes.get(args[1])
+    n2 = task.nodes.get(args[2])
+    c1 = task.cells.get(args[3])
+    c2 = task.cells.get(args[6])
+    lvl = [task.levels.get(args[i]) for i in (4, 5, 7, 8)]
+    if None in (n1, n2, c1, c2) or None in lvl:
+        return 'Unknown object'
+
+    if (n1, n2) in linked:
+        return f'(linked {args[1]} {args[2]}) holds'
+    if degree[n1] != req[0]:
+        return f'(node-degree{req[0]} {args[1]}) does not hold'
+    if degree[n2] != req[1]:
+        return f'(node-degree{req[1]} {args[2]}) does not hold'
+    e = task.edges.get((n1, n2))
+    if e is None or task.edge_cells[2 * e] != c1 or task.edge_cells[2 * e + 1] != c2:
+        return 'Edge ({0} {1} {2} {3}) does not exist'.format(
+                    args[3], args[6], args[1], args[2])
+    if cap[c1] != lvl[0]:
+        return f'(cell-capacity {args[3]} {args[4]}) does not hold'
+    if cap[c2] != lvl[2]:
+        return f'(cell-capacity {args[6]} {args[7]}) does not hold'
+    if lvl[1] != lvl[0] - 1:
+        return f'(cell-capacity-inc {args[5]} {args[4]}) does not hold'
+    if lvl[3] != lvl[2] - 1:
+        return f'(cell-capacity-inc {args[8]} {args[7]}) does not hold'
+    if req == (0, 0):
+        if state[0]:
+            return '(disable-link-0-0) holds'
+        state[0] = True
+
+    linked.add((n1, n2))
+    degree[n1] += 1
+    degree[n2] += 1
+    cap[c1] = lvl[1]
+    cap[c2] = lvl[3]
+    return None
+
+# Returns the number of closed loops formed by the linked pairs of nodes in
+# every component of the graph (a dictionary indexed by the component)
+def _countLoops(task, linked):
+    parent = {}
+    def find(n):
+        while parent.setdefault(n, n) != n:
+            parent[n] = parent[parent[n]]
+            n = parent[n]
+        return n
+    num_edges = {}
+    for n1, n2 in linked:
+        r1 = find(n1)
+        r2 = find(n2)
+        if r1 != r2:
+            parent[r1] = r2
+            num_edges[r2] = num_edges.get(r2, 0) + num_edges.get(r1, 0)
+        num_edges[r2] = num_edges.get(r2, 0) + 1
+
+    num_nodes = {}
+    for n in parent:
+        r = find(n)
+        num_nodes[r] = num_nodes.get(r, 0) + 1
+
+    comp = task.components()
+    loops = {}
+    for r, num in num_nodes.items():
+        if num_edges.get(r, 0) == num:
+            loops[comp[r]] = loops.get(comp[r], 0) + 1
+    return loops
+
+# Validates the plan given as a list of steps returned by readPlan().
+# Returns a dictionary with the keys valid, cost, optimal_cost, optimal
+# (None if optimal_cost is not known) and errors (list of messages).
+def validate(task, steps, optimal_cost = None):
+    errors = []
+    cap = array('b', task.cap)
+    degree = array('b', task.degree)
+    linked = set(task.linked)
+    state = [task.disabled]
+    for i, (lineno, args) in enumerate(steps):
+        err = _apply(task, args, cap, degree, linked, state)
+        if err is not None:
+            errors += [f'Step {i + 1} (line {lineno}): {err}']
+            break
+
+    if len(errors) == 0:
+        nodes = [n for n in task.goal_nodes if degree[n] == 1]
+        if len(nodes) > 0:
+            errors += ['{0} nodes have degree 1: {1}'.format(
+                            len(nodes), _names(task.node_names, nodes))]
+        cells = [c for c, lvl in task.goal_cap if cap[c] != lvl]
+        if len(cells) > 0:
+            errors += ['{0} cells do not match their clue: {1}'.format(
+                            len(cells), _names(task.cell_names, cells))]
+        loops = _countLoops(task, linked)
+        if any([num > 1 for num in loops.values()]):
+            errors += ['The links form {0} loops'.format(sum(loops.values()))]
+
+    optimal = None
+    if optimal_cost is not None:
+        optimal = len(steps) == optimal_cost
+    return {
+        'valid' : len(errors) == 0,
+        'cost' : len(steps),
+        'optimal_cost' : optimal_cost,
+        'optimal' : optimal,
+        'errors' : errors,
+    }
+
+# Validates every plan against the problem in the file fn_problem. Errors in
+# the input files are reported in the results instead of being raised.
+def validateFiles(fn_problem, fn_plans, fn_cost = None):
+    try:
+        task = loadTask(fn_problem)
+        optimal_cost = None
+        if fn_cost is not None:
+            optimal_cost = readOptimalCost(fn_cost)
+    except (OSError, ValueError) as e:
+        task = None
+        err = f'{fn_problem}: {e}'
+
+    results = []
+    for fn in fn_plans:
+        if task is not None:
+            try:
+                with compress.openFile(fn, 'r') as fin:
+                    res = validate(task, readPlan(fin), optimal_cost)
+            except (OSError, ValueError) as e:
+                res = {'valid' : False, 'cost' : None, 'optimal_cost' : None,
+                       'optimal' : None, 'errors' : [f'{fn}: {e}']}
+        else:
+            res = {'valid' : False, 'cost' : None, 'optimal_cost' : None,
+                   'optimal' : None, 'errors' : [err]}
+        res['plan'] = fn
+        res['problem'] = fn_problem
+        results += [res]
+    return results
@@ -0,0 +1,6 @@
+import os
+import sys
+
+TESTDIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.dirname(TESTDIR))
+sys.path.insert(0, TESTDIR)
@@ -0,0 +1,115 @@
+# Helpers shared by the tests: synthetic problems with known optimal plans
+# and loading of the scripts of the repository as modules.
+
+import os
+import sys
+import importlib.util
+
+from slitherlink import synth
+from slitherlink import validate
+from slitherlink.generator import Prob, writeProblem, writePlan
+
+TESTDIR = os.path.dirname(os.path.realpath(__file__))
+TOPDIR = os.path.dirname(TESTDIR)
+STUB_PLANNER = os.path.join(TESTDIR, 'stub-planner.py')
+
+# Loads a script such as run-planners.py, whose name is not a module name.
+# The module is registered, so that the functions it runs in a process pool
+# can be pickled, and loaded once for all tests.
+def loadScript(path):
+    name = os.path.basename(path).replace('-', '_').replace('.py', '')
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(TOPDIR, path))
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+# Returns a Prob with one synthetic rows x cols puzzle for every seed
+def makeProb(rows, cols, seeds = (0,), start_edge = False, preprocess = False):
+    prob = Prob(use_start_edge = start_edge, preprocess = preprocess)
+    for seed in seeds:
+        puzzle, solution = synth.randomPuzzle(rows, cols, seed = seed)
+        prob.add(puzzle, solution)
+    return prob
+
+# Writes NAME.pddl and NAME.plan with the optimal cost to dirname, returns
+# the path of the problem
+def writeProb(prob, dirname, name):
+    fn = os.path.join(dirname, name + '.pddl')
+    with open(fn, 'w') as fout:
+        writeProblem(prob, fout)
+    with open(os.path.join(dirname, name + '.plan'), 'w') as fout:
+        writePlan(prob, fout)
+    return fn
+
+# Returns an optimal plan of the problem as a list of lines: the loops of
+# the solutions are linked one after another, each starting at the first
+# edge of a linked path so that every link extends it
+def planLines(prob):
+    chains = []
+    for i, chain in enumerate(prob.plans):
+        idx = str(i) if i > 0 else ''
+        chains += [[(f'n{idx}-{a[0]}-{a[1]}', f'n{idx}-{b[0]}-{b[1]}') for a, b in chain]]
+    return loopPlanLines(validate.fromGraphs(prob.graphs, 5), chains)
+
+# Same as planLines() for the validate.Task of any problem with the loops
+# given as chains of pairs of node names
+def loopPlanLines(task, chains):
+    linked = set([tuple(sorted(x)) for x in task.linked])
+    degree = list(task.degree)
+    cap = list(task.cap)
+    levels = task.level_names
+    out = []
+    for chain in chains:
+        pairs = [(task.nodes[a], task.nodes[b]) for a, b in chain]
+        is_linked = [tuple(sorted(p)) in linked for p in pairs]
+        start = [k for k in range(len(pairs)) if is_linked[k] and not is_linked[k - 1]]
+        if len(start) > 0:
+            pairs = pairs[start[0]:] + pairs[:start[0]]
+        for n1, n2 in pairs:
+            if (n1, n2) not in task.edges:
+                n1, n2 = n2, n1
+            if tuple(sorted((n1, n2))) in linked:
+                continue
+            e = task.edges[(n1, n2)]
+            c1, c2 = task.edge_cells[2 * e], task.edge_cells[2 * e + 1]
+            out += ['(link-{0}-{1} {2} {3} {4} {5} {6} {7} {8} {9})'.format(
+                        degree[n1], degree[n2], task.node_names[n1],
+                        task.node_names[n2], task.cell_names[c1],
+                        levels[cap[c1]], levels[cap[c1] - 1],
+                        task.cell_names[c2], levels[cap[c2]], levels[cap[c2] - 1])]
+            degree[n1] += 1
+            degree[n2] += 1
+            cap[c1] -= 1
+            cap[c2] -= 1
+    return out
+
+def writePlanFile(fn, lines):
+    with open(fn, 'w') as fout:
+        for line in lines:
+            fout.write(line + '\n')
+        fout.write(f'; cost = {len(lines)} (unit cost)\n')
+
+# Writes the rows x cols puzzle as an ASP instance to fn. Node (r, c) is
+# r * (cols + 1) + c, so it is named n-NUM in the converted problem.
+def writeAsp(puzzle, fn):
+    cols = len(puzzle[0])
+    def node(r, c):
+        return r * (cols + 1) + c
+    with open(fn, 'w') as fout:
+        for r in range(len(puzzle) + 1):
+            for c in range(cols + 1):
+                if c < cols:
+                    fout.write(f'edge({node(r, c)},{node(r, c + 1)}).\n')
+                if r < len(puzzle):
+                    fout.write(f'edge({node(r, c)},{node(r + 1, c)}).\n')
+        for r, row in enumerate(puzzle):
+            for c, clue in enumerate(row):
+                name = f'c{r * cols + c}'
+                for a, b in [(node(r, c), node(r, c + 1)), (node(r + 1, c), node(r + 1, c + 1)),
+                             (node(r, c), node(r + 1, c)), (node(r, c + 1), node(r + 1, c + 1))]:
+                    fout.write(f'cell_contains({name},{a},{b}).\n')
+                if clue != '.':
+                    fout.write(f'clue({name},{clue}).\n')
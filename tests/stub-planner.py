@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+# Stand-in for a planner in the tests of run-planners.py. The arguments
+# following those of the mode, e.g., the domain and the problem, are ignored.
+
+import sys
+import time
+
+def main(argv):
+    mode = argv[1]
+    if mode == 'plan':
+        # Copies the plan src to dst
+        with open(argv[2], 'r') as fin:
+            text = fin.read()
+        with open(argv[3], 'w') as fout:
+            fout.write(text)
+        return 0
+    if mode == 'partial':
+        # Writes the first half of the plan src to dst and sleeps
+        with open(argv[2], 'r') as fin:
+            lines = fin.readlines()
+        with open(argv[3], 'w') as fout:
+            fout.write(''.join(lines[:len(lines) // 2]))
+        time.sleep(float(argv[4]))
+        return 0
+    if mode == 'sleep':
+        time.sleep(float(argv[2]))
+        return 0
+    if mode == 'spin':
+        # Uses CPU time until it is stopped
+        while True:
+            pass
+    if mode == 'exit':
+        return int(argv[2])
+    print(f'Unknown mode {mode}', file = sys.stderr)
+    return 1
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,57 @@
+import io
+import os
+
+from slitherlink import asp
+from slitherlink import synth
+
+from helpers import loadScript, writeAsp
+
+a2p = loadScript('asp-2011/asp-to-pddl.py')
+
+# Writes the instances p0.asp and p1.asp of synthetic puzzles and a
+# malformed bad.asp to tmp_path/asp, returns the directory
+def _instances(tmp_path):
+    aspdir = tmp_path / 'asp'
+    aspdir.mkdir()
+    for i in range(2):
+        writeAsp(synth.randomPuzzle(4, 5, seed = i)[0], str(aspdir / f'p{i}.asp'))
+    (aspdir / 'bad.asp').write_text('edge(0,1).\nedge(1,\n')
+    return str(aspdir)
+
+def _convert(fn, **kwargs):
+    fout = io.StringIO()
+    asp.convert(fn, fout, **kwargs)
+    return fout.getvalue()
+
+def test_batch(tmp_path, capsys):
+    aspdir = _instances(tmp_path)
+    outdir = str(tmp_path / 'out')
+    assert a2p.batch(2, outdir, [aspdir]) == -1
+    out = capsys.readouterr().out.split('\n')
+    assert any([x.startswith('FAIL ' + os.path.join(aspdir, 'bad.asp')) for x in out])
+    assert 'Converted 2/3, failed 1' in out
+    # Nothing is left of the failed conversion
+    assert sorted(os.listdir(outdir)) == ['p0.pddl', 'p1.pddl']
+    for name in ['p0', 'p1']:
+        with open(os.path.join(outdir, name + '.pddl'), 'r') as fin:
+            assert fin.read() == _convert(os.path.join(aspdir, name + '.asp'))
+
+def test_batch_inputs(tmp_path, capsys):
+    aspdir = _instances(tmp_path)
+    # A list of instances relative to the list, a glob and a file, all
+    # naming p0.asp, which is converted once
+    (tmp_path / 'list').write_text('# instances\nasp/p0.asp\n\n')
+    inputs = [str(tmp_path / 'list'), os.path.join(aspdir, 'p[0-1].asp'),
+              os.path.join(aspdir, 'p0.asp')]
+    outdir = str(tmp_path / 'out')
+    assert a2p.batch(1, outdir, inputs, preprocess = True, ext = '.gz') == 0
+    out = capsys.readouterr().out.split('\n')
+    assert [x.split()[1] for x in out if x.startswith('OK')] == \
+                [os.path.join(aspdir, 'p0.asp'), os.path.join(aspdir, 'p1.asp')]
+    assert 'Converted 2/2, failed 0' in out
+    assert sorted(os.listdir(outdir)) == ['p0.pddl.gz', 'p1.pddl.gz']
+    with a2p.compress.openFile(os.path.join(outdir, 'p1.pddl.gz'), 'r') as fin:
+        assert fin.read() == _convert(os.path.join(aspdir, 'p1.asp'), preprocess = True)
+
+def test_batch_no_inputs(tmp_path):
+    assert a2p.batch(1, str(tmp_path / 'out'), [str(tmp_path / '*.asp')]) == -1
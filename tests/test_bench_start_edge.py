@@ -0,0 +1,33 @@
+import sys
+import time
+
+from helpers import STUB_PLANNER, loadScript, makeProb, writeProb
+
+bse = loadScript('bench-start-edge.py')
+
+def _stub(*args):
+    return ' '.join([sys.executable, STUB_PLANNER] + [str(a) for a in args])
+
+def test_run_planner(tmp_path):
+    fn = writeProb(makeProb(4, 4), str(tmp_path), 'p0')
+    assert type(bse.runPlanner(_stub('exit', 0), fn)) is float
+    assert bse.runPlanner(_stub('exit', 1), fn) == 'failed'
+    t = time.time()
+    assert bse.runPlanner(_stub('sleep', 30), fn, time_limit = 0.5) == 'timeout'
+    assert time.time() - t < 10
+
+def test_times_of_problems_solved_by_both(tmp_path, capsys):
+    base = tmp_path / 'base'
+    start = tmp_path / 'start'
+    base.mkdir()
+    start.mkdir()
+    for i in range(2):
+        writeProb(makeProb(4, 4, seeds = (i,)), str(base), f'p{i}')
+        writeProb(makeProb(4, 4, seeds = (i,), start_edge = True), str(start), f'p{i}')
+
+    # Fails on p1 with start edges
+    planner = "sh -c 'case \"$2\" in */start/p1.pddl) exit 1;; esac' planner"
+    assert bse.main(str(base), str(start), planner, time_limit = 30) == 0
+    out = capsys.readouterr().out
+    assert 'Solved: base 2/2 (0 timeouts), start 1/2 (0 timeouts)' in out
+    assert 'on the 1 problems solved by both' in out
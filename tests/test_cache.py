@@ -0,0 +1,47 @@
+import os
+import concurrent.futures
+
+from slitherlink import cache as cachemod
+
+def _total(cache):
+    return sum([size for _, _, size, _ in cache.entries()])
+
+def test_get_put(tmp_path):
+    cache = cachemod.Cache(str(tmp_path), 1 << 20)
+    assert cache.get(('solve', '1.\n.2')) is None
+    cache.put(('solve', '1.\n.2'), ['+-+'])
+    assert cache.get(('solve', '1.\n.2')) == ['+-+']
+    assert cache.get(('solve', '1.\n.3')) is None
+
+def test_overwrite(tmp_path):
+    cache = cachemod.Cache(str(tmp_path), 1 << 20)
+    cache.put(('a',), 'x')
+    cache.put(('b',), 'x' * 100)
+    for value in ['y' * 1000, 'z', 'w' * 10]:
+        cache.put(('b',), value)
+        assert cache._size == _total(cache)
+    assert cache.get(('b',)) == 'w' * 10
+
+def test_threads(tmp_path):
+    cache = cachemod.Cache(str(tmp_path), 20000)
+    def put(i):
+        cache.put(('generate', 5, 5, 'seed', i % 50), 'x' * (100 + i % 7))
+    with concurrent.futures.ThreadPoolExecutor(max_workers = 8) as pool:
+        list(pool.map(put, range(400)))
+    assert cache._size == _total(cache)
+    assert len(list(cache.entries())) == 50
+    assert not any([name.endswith('.tmp') for _, _, names in os.walk(str(tmp_path))
+                        for name in names])
+
+def test_prune(tmp_path):
+    cache = cachemod.Cache(str(tmp_path), 1000)
+    for i in range(20):
+        cache.put(('k', i), 'x' * 100)
+        fn = cache._fn(cachemod.keyHash(('k', i)))
+        os.utime(fn, (i, i))
+        assert cache._size <= 1000
+    # The most recent entries are kept
+    assert cache.get(('k', 19)) is not None
+    assert cache.get(('k', 0)) is None
+    assert cache.prune(0) > 0
+    assert cache._size == 0 and _total(cache) == 0
@@ -0,0 +1,169 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from slitherlink import catalog as catalogmod
+from slitherlink import synth
+
+from helpers import TOPDIR, loadScript, writeAsp
+
+gp = loadScript('generator-solver/generate-pddl.py')
+a2p = loadScript('asp-2011/asp-to-pddl.py')
+qc = loadScript('query-catalog.py')
+
+# Writes d4x4.pddl, d5x6.pddl and d6x6.pddl with their plans through
+# writePuzzle and converts two ASP instances of 4x5 puzzles, all recorded
+# in tmp_path/catalog.db. Returns the path of the catalog.
+def _catalog(tmp_path, capsys):
+    fndb = str(tmp_path / 'catalog.db')
+    catalog = catalogmod.Catalog(fndb)
+    outdir = tmp_path / 'out'
+    outdir.mkdir()
+    for rows, cols, seed in [(4, 4, 0), (5, 6, 1), (6, 6, 2)]:
+        fnpddl = str(outdir / f'd{rows}x{cols}.pddl')
+        assert gp.writePuzzle(synth.randomPuzzle(rows, cols, seed = seed)[0],
+                              fnpddl, str(outdir / f'd{rows}x{cols}.plan'),
+                              stats = gp._stats(fnpddl, None, catalog),
+                              catalog = catalog) == 0
+
+    aspdir = tmp_path / 'asp'
+    aspdir.mkdir()
+    for i in range(2):
+        writeAsp(synth.randomPuzzle(4, 5, seed = i)[0], str(aspdir / f'a{i}.asp'))
+    assert a2p.batch(1, str(outdir), [str(aspdir)], catalog = catalog) == 0
+    catalog.close()
+    capsys.readouterr()
+    return fndb
+
+def _query(capsys, fndb, filters, **kwargs):
+    assert qc.main(fndb, filters, **kwargs) == 0
+    return capsys.readouterr().out.split('\n')[:-1]
+
+def test_records(tmp_path, capsys):
+    fndb = _catalog(tmp_path, capsys)
+    catalog = catalogmod.Catalog(fndb)
+    rows = {r['name'] : r for r in catalog.query()}
+    catalog.close()
+    assert sorted(rows.keys()) == ['a0', 'a1', 'd4x4', 'd5x6', 'd6x6']
+
+    r = rows['d5x6']
+    assert r['path'] == str(tmp_path / 'out' / 'd5x6.pddl')
+    assert r['source'] == 'download'
+    assert (r['rows'], r['cols'], r['puzzles']) == (5, 6, 1)
+    assert r['nodes'] == 6 * 7 and r['cells'] == 30 + 2 * 5 + 2 * 6
+    assert r['sha256'] == catalogmod.fileHash(r['path'])
+    assert r['plan_sha256'] == catalogmod.fileHash(r['plan'])
+    with open(r['plan'], 'r') as fin:
+        assert fin.readline() == f';; Optimal cost: {r["optimal_cost"]}\n'
+
+    # The ASP instances have no puzzle, plan nor cost
+    r = rows['a1']
+    assert r['source'] == 'asp-2011'
+    assert r['rows'] is None and r['plan'] is None and r['optimal_cost'] is None
+    assert r['nodes'] == 5 * 6
+    assert r['sha256'] == catalogmod.fileHash(r['path'])
+
+def test_replace(tmp_path):
+    fn = str(tmp_path / 'p.pddl')
+    with open(fn, 'w') as fout:
+        fout.write('x')
+    catalog = catalogmod.Catalog(str(tmp_path / 'catalog.db'))
+    catalog.add([catalogmod.record(fn, 'gen', {'nodes' : 4}, [['..', '..']], 4)])
+    # Writing the problem again replaces its row
+    catalog.add([catalogmod.record(fn, 'gen', {'nodes' : 5}, [['..', '..']], 6)])
+    rows = catalog.query()
+    assert len(rows) == 1
+    assert rows[0]['nodes'] == 5 and rows[0]['optimal_cost'] == 6
+    assert rows[0]['sha256'] == catalogmod.fileHash(fn)
+    assert catalog.query('nodes > ?', (5,)) == []
+    catalog.close()
+
+def test_old_catalog(tmp_path):
+    fndb = str(tmp_path / 'catalog.db')
+    db = sqlite3.connect(fndb)
+    db.execute('CREATE TABLE instances (path TEXT PRIMARY KEY, name TEXT NOT NULL, source TEXT NOT NULL)')
+    db.execute("INSERT INTO instances VALUES ('/p.pddl', 'p', 'gen')")
+    db.commit()
+    db.close()
+    # The missing columns are added
+    catalog = catalogmod.Catalog(fndb)
+    rows = catalog.query()
+    assert list(rows[0].keys()) == catalogmod.COLUMN_NAMES
+    assert rows[0]['name'] == 'p' and rows[0]['start_edges'] is None
+    catalog.close()
+
+def test_query_filters(tmp_path, capsys):
+    fndb = _catalog(tmp_path, capsys)
+    out = str(tmp_path / 'out')
+    def paths(*names):
+        return [os.path.join(out, n + '.pddl') for n in names]
+
+    assert _query(capsys, fndb, []) == paths('a0', 'a1', 'd4x4', 'd5x6', 'd6x6')
+    assert _query(capsys, fndb, [('--source', 'asp-2011')]) == paths('a0', 'a1')
+    assert _query(capsys, fndb, [('--source', 'gen,download')]) \
+                == paths('d4x4', 'd5x6', 'd6x6')
+    assert _query(capsys, fndb, [('--size', '5x6')]) == paths('d5x6')
+    assert _query(capsys, fndb, [('--min-cells', '50'), ('--max-nodes', '42')]) \
+                == paths('d5x6')
+    assert _query(capsys, fndb, [('--where', "name LIKE 'd%' AND nodes > 30")],
+                  order = '-nodes') == paths('d6x6', 'd5x6')
+    assert _query(capsys, fndb, [('--where', "source = 'asp-2011' OR nodes < 30"),
+                                 ('--max-cells', '40')]) == paths('a0', 'a1', 'd4x4')
+    assert _query(capsys, fndb, [], order = 'path', limit = 2) == paths('a0', 'a1')
+
+def test_query_cost(tmp_path, capsys):
+    fndb = _catalog(tmp_path, capsys)
+    catalog = catalogmod.Catalog(fndb)
+    costs = {r['name'] : r['optimal_cost'] for r in catalog.query()}
+    catalog.close()
+    cost = costs['d5x6']
+    expect = sorted([str(tmp_path / 'out' / (n + '.pddl'))
+                        for n, c in costs.items() if c is not None and c <= cost])
+    assert _query(capsys, fndb, [('--max-cost', str(cost))]) == expect
+    assert _query(capsys, fndb, [('--max-cost', str(cost))], fmt = 'count') \
+                == [str(len(expect))]
+
+def test_query_formats(tmp_path, capsys):
+    fndb = _catalog(tmp_path, capsys)
+    rows = [json.loads(x) for x in _query(capsys, fndb, [('--size', '4x4')], fmt = 'json')]
+    assert len(rows) == 1
+    assert rows[0]['name'] == 'd4x4' and rows[0]['nodes'] == 25
+
+    lines = _query(capsys, fndb, [('--source', 'download')], order = 'nodes', fmt = 'table')
+    assert lines[0].split() == qc._TABLE
+    assert [x.split()[:3] for x in lines[1:]] == [['d4x4', 'download', '4x4'],
+                                                  ['d5x6', 'download', '5x6'],
+                                                  ['d6x6', 'download', '6x6']]
+
+    lines = _query(capsys, fndb, [('--source', 'asp-2011')], fmt = 'table')
+    assert [x.split()[2] for x in lines[1:]] == ['-', '-']
+
+@pytest.mark.parametrize('filters, order', [([('--min-name', '3')], 'path'),
+                                            ([('--max-color', '3')], 'path'),
+                                            ([('--color', 'red')], 'path'),
+                                            ([], 'color'),
+                                            ([('--where', 'nodes >')], 'path')])
+def test_query_errors(tmp_path, capsys, filters, order):
+    fndb = _catalog(tmp_path, capsys)
+    assert qc.main(fndb, filters, order) == -1
+    assert capsys.readouterr().err.startswith('Error: ')
+
+def test_query_no_catalog(tmp_path, capsys):
+    assert qc.main(str(tmp_path / 'catalog.db'), []) == -1
+    assert 'No catalog' in capsys.readouterr().err
+
+def test_query_command(tmp_path, capsys):
+    fndb = _catalog(tmp_path, capsys)
+    cmd = [sys.executable, os.path.join(TOPDIR, 'query-catalog.py')]
+    p = subprocess.run(cmd + ['--source', 'download', '--max-cost', '1000', '--order', '-cells',
+                              '--limit', '2', '--format', 'paths', fndb],
+                       capture_output = True, text = True)
+    assert p.returncode == 0, p.stderr
+    assert p.stdout.split() == [str(tmp_path / 'out' / 'd6x6.pddl'),
+                                str(tmp_path / 'out' / 'd5x6.pddl')]
+    p = subprocess.run(cmd + ['--format', 'xml', fndb], capture_output = True, text = True)
+    assert p.returncode != 0 and p.stderr.startswith('Usage: ')
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from slitherlink import asp
+from slitherlink import compress
+from slitherlink import synth
+from slitherlink import validate
+from slitherlink.generator import writeProblem, writePlan
+
+from helpers import makeProb, planLines, writeAsp
+
+EXTS = ['', '.gz', '.xz',
+        pytest.param('.zst', marks = pytest.mark.skipif(compress.zstandard is None,
+                                                        reason = 'No zstandard module'))]
+MAGIC = {'.gz' : b'\x1f\x8b', '.xz' : b'\xfd7zXZ', '.zst' : b'\x28\xb5\x2f\xfd'}
+
+def test_names():
+    assert compress.compressionExt('p.pddl.xz') == '.xz'
+    assert compress.compressionExt('p.pddl') == ''
+    assert compress.stripExt('p.pddl.zst') == 'p.pddl'
+    assert compress.stripExt('p.pddl') == 'p.pddl'
+    assert compress.replaceExt('dir/p.pddl.gz', '.map') == 'dir/p.map.gz'
+    assert compress.replaceExt('dir/p.pddl', '.map') == 'dir/p.map'
+
+@pytest.mark.parametrize('ext', EXTS)
+def test_round_trip(tmp_path, ext):
+    prob = makeProb(6, 6, seeds = (0, 1), start_edge = True)
+    fn = str(tmp_path / ('p.pddl' + ext))
+    text = prob.toPddl()
+    with compress.openFile(fn, 'w') as fout:
+        fout.write(text)
+    with compress.openFile(fn, 'r') as fin:
+        assert fin.read() == text
+
+    with open(fn, 'rb') as fin:
+        data = fin.read()
+    if ext == '':
+        assert data.decode('utf-8') == text
+    else:
+        assert data.startswith(MAGIC[ext])
+        assert len(data) < len(text) / 4
+
+    with compress.plainFile(fn) as plain:
+        with open(plain, 'r') as fin:
+            assert fin.read() == text
+    assert os.path.exists(fn)
+    if ext != '':
+        assert not os.path.exists(plain)
+
+# Problem, plan and optimal cost compressed differently
+def test_validate_compressed(tmp_path):
+    prob = makeProb(5, 5, seeds = (0, 1), start_edge = True)
+    fn = str(tmp_path / 'p.pddl.gz')
+    with compress.openFile(fn, 'w') as fout:
+        writeProblem(prob, fout)
+    with compress.openFile(str(tmp_path / 'p.plan.xz'), 'w') as fout:
+        writePlan(prob, fout)
+    fnplan = str(tmp_path / 'sas_plan.gz')
+    with compress.openFile(fnplan, 'w') as fout:
+        fout.write('\n'.join(planLines(prob)) + '\n; cost = 1\n')
+
+    res = validate.validateFiles(fn, [fnplan], str(tmp_path / 'p.plan.xz'))
+    assert res[0]['valid'], res[0]['errors']
+    assert res[0]['optimal'] is True
+
+def test_asp_compressed(tmp_path):
+    fn = str(tmp_path / 'p.asp')
+    writeAsp(synth.randomPuzzle(4, 4, seed = 0)[0], fn)
+    with open(fn, 'rb') as fin, compress.openFile(fn + '.xz', 'wb') as fout:
+        fout.write(fin.read())
+    assert asp.readFacts(fn + '.xz') == asp.readFacts(fn)
+
+def test_missing_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(compress, 'zstandard', None)
+    with pytest.raises(RuntimeError, match = 'zstandard'):
+        compress.openFile(str(tmp_path / 'p.pddl.zst'), 'w')
@@ -0,0 +1,129 @@
+import hashlib
+import itertools
+import json
+import os
+import tarfile
+import threading
+
+import pytest
+
+from slitherlink import cache as cachemod
+from slitherlink import corpus
+from slitherlink import dedup
+from slitherlink import generator
+from slitherlink import synth
+
+from helpers import loadScript
+
+gp = loadScript('generator-solver/generate-pddl.py')
+
+SPEC = {'seed' : 'test',
+        'groups' : [{'rows' : 4, 'count' : 3},
+                    {'rows' : 5, 'cols' : 4, 'count' : 2, 'parallel' : [2, 3]}]}
+
+# Replaces the external generator by synthetic puzzles, every tenth one
+# a duplicate of the one before
+@pytest.fixture
+def fake_generate(monkeypatch, tmp_path):
+    (tmp_path / 'generate').write_text('')
+    monkeypatch.setattr(generator, 'PROGDIR', str(tmp_path))
+    count = itertools.count()
+    lock = threading.Lock()
+    def gen(rows, cols):
+        with lock:
+            i = next(count)
+        return synth.randomPuzzle(rows, cols, seed = i - (i % 10 == 9))
+    monkeypatch.setattr(generator, 'runGenerate', gen)
+
+def test_check_spec():
+    spec = corpus.checkSpec(SPEC)
+    assert spec['groups'][0] == {'rows' : 4, 'cols' : 4, 'count' : 3, 'parallel' : [1]}
+    assert spec['groups'][1]['parallel'] == [2, 3]
+    assert spec['preprocess'] is False and spec['compact_names'] is False
+    assert corpus.numTasks(spec) == 3 + 2 * 2
+
+    for bad in [{'groups' : [{'rows' : 4, 'count' : 0}]},
+                {'groups' : [{'rows' : 4, 'count' : 1, 'parallel' : [2, 'x']}]},
+                {'groups' : [{'rows' : 4}]},
+                {'groups' : [{'rows' : 4, 'count' : 1, 'size' : 3}]},
+                {'groups' : [], 'jobs' : 4},
+                {'groups' : {}}]:
+        with pytest.raises(ValueError):
+            corpus.checkSpec(bad)
+
+def test_tasks():
+    metas = list(corpus.tasks(corpus.checkSpec(SPEC)))
+    assert [m['name'] for m in metas] == ['4x4-p1-00000', '4x4-p1-00001', '4x4-p1-00002',
+                                         '5x4-p2-00000', '5x4-p2-00001',
+                                         '5x4-p3-00000', '5x4-p3-00001']
+    assert metas[3]['seed'] == 'test/5x4-p2-00000'
+    assert metas[3]['parallel'] == 2 and metas[3]['rows'] == 5 and metas[3]['cols'] == 4
+
+def test_instances(fake_generate):
+    spec = corpus.checkSpec(SPEC)
+    out = list(corpus.instances(spec, jobs = 2, ahead = 3))
+    assert [m['name'] for _, m in out] == [m['name'] for m in corpus.tasks(spec)]
+    hashes = set()
+    for prob, meta in out:
+        assert len(prob.puzzles) == meta['parallel']
+        assert len(prob.puzzles[0]) == meta['rows'] and len(prob.puzzles[0][0]) == meta['cols']
+        for puzzle in prob.puzzles:
+            hashes.add(dedup.puzzleHash(puzzle))
+    # No puzzle is used twice
+    assert len(hashes) == 3 + 2 * 2 + 2 * 3
+
+    # The consumer may stop early
+    for prob, meta in corpus.instances(spec, jobs = 2):
+        break
+    assert meta['name'] == '4x4-p1-00000'
+
+def test_instances_from_cache(fake_generate, tmp_path, monkeypatch):
+    spec = corpus.checkSpec(SPEC)
+    cache = cachemod.Cache(str(tmp_path / 'cache'))
+    first = [prob.puzzles for prob, _ in corpus.instances(spec, jobs = 2, cache = cache)]
+    def fail(rows, cols):
+        raise RuntimeError('Not cached')
+    monkeypatch.setattr(generator, 'runGenerate', fail)
+    again = [prob.puzzles for prob, _ in corpus.instances(spec, jobs = 1, cache = cache)]
+    assert again == first
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+@pytest.mark.parametrize('out', ['corpus', 'corpus.tar.gz'])
+def test_build_corpus(fake_generate, tmp_path, capsys, out):
+    fnspec = str(tmp_path / 'spec.json')
+    with open(fnspec, 'w') as fout:
+        json.dump(dict(SPEC, compact_names = True), fout)
+    out = str(tmp_path / out)
+    assert gp.buildCorpus(fnspec, out, jobs = 2) == 0
+    assert 'Wrote 7/7 problems to' in capsys.readouterr().out
+
+    if corpus.isTar(out):
+        with tarfile.open(out, 'r:gz') as tar:
+            files = {m.name : tar.extractfile(m).read() for m in tar.getmembers()}
+    else:
+        files = {}
+        for fn in os.listdir(out):
+            with open(os.path.join(out, fn), 'rb') as fin:
+                files[fn] = fin.read()
+
+    metas = [json.loads(line) for line in files['corpus.jsonl'].decode().split('\n')[:-1]]
+    names = [m['name'] for m in metas]
+    assert names == [m['name'] for m in corpus.tasks(corpus.checkSpec(SPEC))]
+    assert sorted(files.keys()) == sorted(['spec.json', 'corpus.jsonl']
+                                          + [n + ext for n in names
+                                                for ext in ['.pddl', '.plan', '.map']])
+    for m in metas:
+        assert _sha256(files[m['name'] + '.pddl']) == m['sha256']
+        assert _sha256(files[m['name'] + '.plan']) == m['plan_sha256']
+        assert files[m['name'] + '.plan'].decode().startswith(
+                    f';; Optimal cost: {m["optimal_cost"]}\n')
+        assert ('start_edges' in m) == (m['parallel'] > 1)
+
+def test_build_corpus_bad_spec(tmp_path):
+    fnspec = str(tmp_path / 'spec.json')
+    with open(fnspec, 'w') as fout:
+        json.dump({'groups' : [{'rows' : 0, 'count' : 1}]}, fout)
+    assert gp.buildCorpus(fnspec, str(tmp_path / 'out')) == -1
+    assert not os.path.exists(str(tmp_path / 'out'))
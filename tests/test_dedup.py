@@ -0,0 +1,49 @@
+import os
+
+from slitherlink import dedup
+
+PUZZLE = ['1.2', '.3.']
+
+def test_images():
+    images = dedup.images(PUZZLE)
+    assert len(images) == 8
+    assert len(set([dedup.puzzleHash(p) for p in images])) == 1
+    assert dedup.puzzleHash(PUZZLE) != dedup.puzzleHash(['2.1', '.3.', '...'])
+
+def test_index(tmp_path):
+    fn = str(tmp_path / 'index' / 'index.txt')
+    index = dedup.Index(fn)
+    assert len(index) == 0
+    assert not index.contains(PUZZLE)
+    index.add([PUZZLE], 'p0')
+    assert index.contains(dedup.images(PUZZLE)[5])
+    assert len(dedup.Index(fn)) == 1
+
+def test_refresh(tmp_path, monkeypatch):
+    fn = str(tmp_path / 'index.txt')
+    index = dedup.Index(fn)
+    other = dedup.Index(fn)
+    other.add([PUZZLE], 'p0')
+
+    # Lookups never touch the file
+    def fail(*args, **kwargs):
+        raise AssertionError('file accessed')
+    monkeypatch.setattr(os, 'stat', fail)
+    monkeypatch.setattr(dedup, 'open', fail, raising = False)
+    assert not index.contains(PUZZLE)
+    monkeypatch.undo()
+
+    index.refresh()
+    assert index.contains(PUZZLE)
+
+    # A line being written is read once it is complete
+    h = dedup.puzzleHash(['0'])
+    with open(fn, 'a') as fout:
+        fout.write(h[:10])
+    index.refresh()
+    assert not index.containsHash(h)
+    with open(fn, 'a') as fout:
+        fout.write(h[10:] + ' p1\n')
+    index.refresh()
+    assert index.containsHash(h)
+    assert len(index) == 2
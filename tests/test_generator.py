@@ -0,0 +1,178 @@
+import io
+import os
+import sqlite3
+import sys
+
+import pytest
+
+from slitherlink import synth
+from slitherlink import catalog
+from slitherlink import generator
+from slitherlink import cache as cachemod
+from slitherlink import validate
+from slitherlink.generator import Prob, writeProblem, writePlan
+
+from helpers import TOPDIR, planLines
+
+# A stand-in for the external generator writing a synthetic puzzle after
+# a while and logging its output directory and when it ran
+FAKE_GENERATE = f'''#!{sys.executable}
+import os, sys, time
+sys.path.insert(0, {TOPDIR!r})
+from slitherlink import synth
+start = time.time()
+time.sleep(0.3)
+rows, cols, fnprob, fnsol = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3], sys.argv[4]
+puzzle, solution = synth.randomPuzzle(rows, cols, seed = os.getpid())
+with open(fnprob, 'w') as fout:
+    fout.write('\\n'.join(puzzle) + '\\n')
+with open(fnsol, 'w') as fout:
+    fout.write('\\n'.join(solution) + '\\n')
+with open(os.path.join(os.path.dirname(sys.argv[0]), 'log'), 'a') as fout:
+    fout.write(f'{{os.path.dirname(fnprob)}} {{start}} {{time.time()}}\\n')
+'''
+
+# A puzzle without clues, so no edge is certain to be part of its loop
+def _blank(rows, cols, seed):
+    puzzle, solution = synth.randomPuzzle(rows, cols, seed = seed)
+    return ['.' * cols] * rows, solution
+
+# Replaces the external generator by one returning the puzzles in turn, the
+# last one forever
+def _fakeGenerate(monkeypatch, tmp_path, puzzles):
+    (tmp_path / 'generate').write_text('')
+    monkeypatch.setattr(generator, 'PROGDIR', str(tmp_path))
+    puzzles = list(puzzles)
+    def gen(rows, cols):
+        if len(puzzles) > 1:
+            return puzzles.pop(0)
+        return puzzles[0]
+    monkeypatch.setattr(generator, 'runGenerate', gen)
+
+def _validate(prob):
+    fout = io.StringIO()
+    writeProblem(prob, fout)
+    task = validate.loadPddl(io.StringIO(fout.getvalue()))
+    lines = planLines(prob)
+    steps = validate.readPlan(io.StringIO('\n'.join(lines) + '\n; cost = 1\n'))
+    return validate.validate(task, steps, prob.optimalCost())
+
+def _plan(prob):
+    fout = io.StringIO()
+    writePlan(prob, fout)
+    return fout.getvalue()
+
+def test_deduced_start_edge():
+    prob = Prob(use_start_edge = True)
+    prob.add(*synth.randomPuzzle(5, 5, seed = 4))
+    assert prob.start_edges == ['deduced']
+    assert prob.num_linked == 1
+    assert ';; Start edges: deduced\n' in _plan(prob)
+
+def test_no_start_edge_keeps_link_0_0():
+    prob = Prob(use_start_edge = True)
+    prob.add(*_blank(4, 4, 0))
+    assert prob.start_edges == ['none']
+    assert prob.num_linked == 0
+    assert '(disable-link-0-0)' not in prob.toPddl()
+    assert ';; Start edges: none\n' in _plan(prob)
+    res = _validate(prob)
+    assert res['valid'], res['errors']
+    assert res['optimal'] is True
+
+def test_solution_start_edge():
+    prob = Prob(use_start_edge = True, solution_start_edge = True)
+    prob.add(*_blank(4, 4, 0))
+    assert prob.start_edges == ['solution']
+    assert prob.num_linked == 1
+    assert '(disable-link-0-0)' in prob.toPddl()
+    assert ';; Start edges: solution\n' in _plan(prob)
+    res = _validate(prob)
+    assert res['valid'], res['errors']
+    assert res['optimal'] is True
+
+def test_several_puzzles_need_start_edges():
+    prob = Prob(use_start_edge = True)
+    prob.add(*_blank(4, 4, 0))
+    with pytest.raises(RuntimeError):
+        prob.add(*synth.randomPuzzle(5, 5, seed = 4))
+
+    prob = Prob(use_start_edge = True, solution_start_edge = True)
+    prob.add(*synth.randomPuzzle(5, 5, seed = 4))
+    prob.add(*_blank(4, 4, 0))
+    assert prob.start_edges == ['deduced', 'solution']
+    assert [len(p.start_edges) for p in prob.split()] == [1, 1]
+    res = _validate(prob)
+    assert res['valid'], res['errors']
+
+def test_gen_parallel_regenerates_without_start_edge(monkeypatch, tmp_path):
+    _fakeGenerate(monkeypatch, tmp_path, [_blank(5, 5, 0), synth.randomPuzzle(5, 5, seed = 4),
+                                          synth.randomPuzzle(5, 5, seed = 5)])
+    prob = Prob(use_start_edge = True)
+    assert prob.addGen(5, 5, 2, jobs = 1) == 0
+    assert prob.num_no_start_edge == 1
+    assert prob.start_edges == ['deduced', 'deduced']
+    assert prob.puzzles[0] == synth.randomPuzzle(5, 5, seed = 5)[0]
+
+def test_gen_parallel_falls_back_to_solution_edge(monkeypatch, tmp_path):
+    _fakeGenerate(monkeypatch, tmp_path, [synth.randomPuzzle(5, 5, seed = 4), _blank(5, 5, 0)])
+    prob = Prob(use_start_edge = True)
+    assert prob.addGen(5, 5, 2, jobs = 1) == 0
+    assert prob.num_no_start_edge == generator.MAX_REGENERATE
+    assert prob.start_edges == ['deduced', 'solution']
+    res = _validate(prob)
+    assert res['valid'], res['errors']
+    assert res['optimal'] is True
+
+def test_native_solver_finds_shortest_loop(monkeypatch, tmp_path):
+    monkeypatch.setattr(generator, 'PROGDIR', str(tmp_path))
+    # Any loop solves a puzzle without clues, the shortest goes around a cell
+    solution = generator.runSolve(['...', '...', '...'])
+    assert len(generator.solutionEdges(solution)) == 4
+
+def test_concurrent_generation(monkeypatch, tmp_path):
+    prog = tmp_path / 'generate'
+    prog.write_text(FAKE_GENERATE)
+    prog.chmod(0o755)
+    monkeypatch.setattr(generator, 'PROGDIR', str(tmp_path))
+    cache = cachemod.Cache(str(tmp_path / 'cache'))
+
+    prob = Prob()
+    assert prob.addGen(4, 5, 4, jobs = 4, seed = 'test', cache = cache) == 0
+    assert len(prob.puzzles) == 4
+    with open(tmp_path / 'log', 'r') as fin:
+        runs = [line.split() for line in fin]
+    assert len(runs) == 4
+    # Every run has its own directory, and they ran at the same time
+    assert len(set([r[0] for r in runs])) == 4
+    assert max([float(r[1]) for r in runs]) < min([float(r[2]) for r in runs])
+
+    # The same seed takes the puzzles from the cache in the same order
+    os.unlink(prog)
+    again = Prob()
+    assert again.addGen(4, 5, 4, jobs = 2, seed = 'test', cache = cache) == 0
+    assert again.puzzles == prob.puzzles
+    assert again.solutions == prob.solutions
+    assert again.optimalCost() == prob.optimalCost()
+
+def test_no_start_edge_line():
+    prob = Prob()
+    prob.add(*synth.randomPuzzle(5, 5, seed = 4))
+    assert prob.start_edges == []
+    assert _plan(prob) == f';; Optimal cost: {prob.optimalCost()}\n'
+
+def test_catalog_start_edges(tmp_path):
+    fn = str(tmp_path / 'catalog.db')
+    # A catalog written before the column was added
+    db = sqlite3.connect(fn)
+    with db:
+        db.execute('CREATE TABLE instances ({0})'.format(', '.join(
+                        [f'{c} {t}' for c, t in catalog.COLUMNS if c != 'start_edges'])))
+    db.close()
+
+    cat = catalog.Catalog(fn)
+    cat.add([catalog.record(str(tmp_path / 'p.pddl'), 'gen', {}, start_edge = True,
+                            start_edges = ['deduced', 'solution'])])
+    rows = cat.query()
+    cat.close()
+    assert rows[0]['start_edges'] == 'deduced solution'
@@ -0,0 +1,105 @@
+import io
+import re
+
+from slitherlink import asp
+from slitherlink import graph
+from slitherlink import synth
+
+from helpers import writeAsp
+
+# Keywords of PDDL up to 3.1 (the names of requirements start with ':')
+PDDL_RESERVED = set(['define', 'domain', 'problem', 'object', 'either', 'and',
+                     'or', 'not', 'imply', 'forall', 'exists', 'when',
+                     'preference', 'at', 'over', 'all', 'start', 'end',
+                     'always', 'sometime', 'within', 'hold-after',
+                     'hold-during', 'number', 'increase', 'decrease', 'assign',
+                     'scale-up', 'scale-down', 'minimize', 'maximize',
+                     'total-time', 'is-violated'])
+
+def test_compact_names_not_reserved():
+    # All ids of up to three base-36 digits
+    num = 36 ** 3 + 10
+    g = graph.Graph()
+    for i in range(num):
+        g.addNode(f'n-{i}')
+        g.addCell(f'c-{i}', 4)
+    pairs = graph.compactNames([g])
+    assert len(pairs) == 2 * num
+    for names in [g.node_names, g.cell_names]:
+        assert len(set(names)) == num
+        for name in names:
+            assert name.lower() not in PDDL_RESERVED
+            assert re.fullmatch(r'[a-z][a-z0-9_-]*', name)
+    assert dict(pairs)[g.node_names[893]] == 'n-893'
+
+# One square cell with clue 2 and the nodes 0, 1, 2, 3 around it
+def _squareFacts():
+    return {'edge' : [(0, 1), (1, 2), (3, 2), (0, 3)],
+            'cell_contains' : [('c0', 0, 1), ('c0', 2, 1), ('c0', 3, 2), ('c0', 0, 3)],
+            'clue' : [('c0', 2)]}
+
+def test_from_facts():
+    g = graph.fromFacts(_squareFacts())
+    assert g.node_names == ['n-0', 'n-1', 'n-2', 'n-3']
+    # Every edge borders only c0, so it gets a cell outside of it
+    assert g.cell_names == ['c-c0', 'c-outside-cell-0-1', 'c-outside-cell-0-3',
+                            'c-outside-cell-1-2', 'c-outside-cell-3-2']
+    assert list(g.cap) == [2, 1, 1, 1, 1]
+    assert list(g.cell_clue) == [2, -1, -1, -1, -1]
+    assert g.clue_cells == [0]
+    assert g.num_edges == 4
+    assert g.edgeNodes(2) == (3, 2)
+    assert g.edgeCells(2) == (0, 4)
+    assert sorted(g.cellEdges(0)) == [0, 1, 2, 3]
+    assert sorted(g.nodeEdges(3)) == [2, 3]
+    edges, cells = g.solverInput()
+    assert edges == [(0, 1), (1, 2), (3, 2), (0, 3)]
+    assert [(sorted(es), clue) for es, clue in cells] == [([0, 1, 2, 3], 2)]
+
+def test_from_grid():
+    puzzle = ['2.', '.3']
+    g = graph.fromGrid(puzzle, '1')
+    assert g.num_nodes == 9 and g.num_cells == 4 + 2 * 2 + 2 * 2 and g.num_edges == 12
+    assert g.node_names[4] == 'n1-1-1'
+    assert g.cell_names[:4] == ['cell1-0-0', 'cell1-0-1', 'cell1-1-0', 'cell1-1-1']
+    assert list(g.cap[:4]) == [2, 4, 4, 3]
+    assert all([c == 1 for c in g.cap[4:]])
+    assert g.clue_cells == [0, 3]
+    # The capacities of the outside cells are written first
+    assert g.cap_order == list(range(4, 12)) + list(range(4))
+    for c in range(4):
+        assert len(g.cellEdges(c)) == 4
+    assert sorted([len(g.nodeEdges(n)) for n in range(g.num_nodes)]) == [2] * 4 + [3] * 4 + [4]
+
+# The ASP instance of a puzzle gives the same graph up to the names
+def test_facts_and_grid_agree(tmp_path):
+    puzzle, _ = synth.randomPuzzle(4, 6, seed = 3)
+    fn = str(tmp_path / 'p.asp')
+    writeAsp(puzzle, fn)
+    g1 = graph.fromFacts(asp.readFacts(fn))
+    g2 = graph.fromGrid(puzzle)
+    num_levels = max(g1.maxCapacity(), g2.maxCapacity()) + 1
+    assert graph.problemCounts([g1], num_levels) == graph.problemCounts([g2], num_levels)
+    assert sorted(g1.cap) == sorted(g2.cap)
+
+def test_link():
+    g = graph.fromGrid(['2.', '.3'])
+    counts = graph.problemCounts([g], 5)
+    assert counts['link-0-0'] == counts['link-x-y'] > 0
+    e = g.edgeCells(0)
+    g.link(0)
+    assert [g.cap[c] for c in e] == [graph.fromGrid(['2.', '.3']).cap[c] - 1 for c in e]
+    assert [g.degree()[n] for n in g.edgeNodes(0)] == [1, 1]
+    assert sum(g.degree()) == 2
+    counts = graph.problemCounts([g], 5)
+    assert counts['linked'] == 1
+    assert counts['link-0-0'] == 0
+    assert counts['actions'] == 3 * counts['link-x-y']
+
+def test_name_map():
+    g = graph.fromGrid(['2.', '.3'])
+    old = list(g.node_names) + list(g.cell_names)
+    fout = io.StringIO()
+    graph.writeNameMap(fout, graph.compactNames([g]))
+    names = graph.readNameMap(io.StringIO(fout.getvalue()))
+    assert [names[x] for x in list(g.node_names) + list(g.cell_names)] == old
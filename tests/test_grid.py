@@ -0,0 +1,66 @@
+import pytest
+
+from slitherlink import grid
+
+def test_counts():
+    g = grid.Grid(3, 4)
+    assert g.num_nodes == 20
+    assert g.num_inner_cells == 12
+    assert g.num_cells == 12 + 2 * 3 + 2 * 4
+    # 4 rows of 4 horizontal edges and 3 rows of 5 vertical ones
+    assert g.num_edges == 16 + 15
+    assert len(g.nodeNames()) == g.num_nodes
+    assert len(set(g.cellNames())) == g.num_cells
+
+def test_every_edge_borders_two_cells():
+    g = grid.Grid(3, 4)
+    cell_edges = [[] for _ in range(g.num_cells)]
+    for e in range(g.num_edges):
+        c1, c2 = g.edgeCells(e)
+        assert c1 != c2
+        cell_edges[c1] += [e]
+        cell_edges[c2] += [e]
+    assert all([len(es) == 4 for es in cell_edges[:g.num_inner_cells]])
+    assert all([len(es) == 1 for es in cell_edges[g.num_inner_cells:]])
+
+def test_edges_of_nodes():
+    g = grid.Grid(3, 4)
+    edges = []
+    for r in range(4):
+        for c in range(5):
+            if c < 4:
+                e = g.edge((r, c), (r, c + 1))
+                assert g.edgeNodes(e) == (g.node(r, c), g.node(r, c + 1))
+                assert g.edge((r, c + 1), (r, c)) == e
+                edges += [e]
+            if r < 3:
+                e = g.edge((r, c), (r + 1, c))
+                assert g.edgeNodes(e) == (g.node(r, c), g.node(r + 1, c))
+                edges += [e]
+    assert sorted(edges) == list(range(g.num_edges))
+    with pytest.raises(ValueError):
+        g.edge((0, 0), (1, 1))
+    with pytest.raises(ValueError):
+        g.edge((0, 0), (0, 2))
+
+def test_cells_of_edges():
+    g = grid.Grid(3, 4)
+    assert g.edgeCells(g.edge((1, 2), (1, 3))) == (g.cell(0, 2), g.cell(1, 2))
+    assert g.edgeCells(g.edge((1, 2), (2, 2))) == (g.cell(1, 1), g.cell(1, 2))
+    assert g.edgeCells(g.edge((0, 1), (0, 2))) == (g.outsideUp(1), g.cell(0, 1))
+    assert g.edgeCells(g.edge((3, 1), (3, 2))) == (g.cell(2, 1), g.outsideDown(1))
+    assert g.edgeCells(g.edge((2, 0), (3, 0))) == (g.outsideLeft(2), g.cell(2, 0))
+    assert g.edgeCells(g.edge((2, 4), (3, 4))) == (g.cell(2, 3), g.outsideRight(2))
+
+def test_names():
+    g = grid.Grid(3, 4)
+    assert g.nodeName(g.node(2, 3), 'n1') == 'n1-2-3'
+    assert g.nodeNames()[g.node(3, 4)] == 'n-3-4'
+    names = g.cellNames('cell2')
+    for cell in range(g.num_cells):
+        assert g.cellName(cell, 'cell2') == names[cell]
+    assert g.cellName(g.cell(1, 3)) == 'cell-1-3'
+    assert g.cellName(g.outsideLeft(2)) == 'cell-outside-2-left'
+    assert g.cellName(g.outsideRight(0)) == 'cell-outside-0-right'
+    assert g.cellName(g.outsideUp(3)) == 'cell-outside-3-up'
+    assert g.cellName(g.outsideDown(1)) == 'cell-outside-1-down'
@@ -0,0 +1,48 @@
+import pytest
+
+from slitherlink import loop
+from slitherlink.generator import solutionEdges
+
+from helpers import makeProb
+
+SQUARE = [(0, 1), (2, 3), (1, 3), (0, 2)]
+
+def test_chain_square():
+    out = loop.chainLoop(SQUARE)
+    assert out[0] == SQUARE[0]
+    assert sorted(out) == sorted(SQUARE)
+    for (a1, b1), (a2, b2) in zip(out, out[1:] + out[:1]):
+        assert len(set([a1, b1]) & set([a2, b2])) == 1
+
+def test_chain_solution():
+    prob = makeProb(8, 7, seeds = (3,))
+    edges = solutionEdges(prob.solutions[0])
+    out = loop.chainLoop(edges)
+    assert sorted(out) == sorted(edges)
+
+def _kind(edges):
+    with pytest.raises(loop.LoopError) as e:
+        loop.chainLoop(edges)
+    return e.value
+
+def test_empty():
+    assert _kind([]).kind == 'empty'
+
+def test_duplicate():
+    err = _kind(SQUARE + [(1, 0)])
+    assert err.kind == 'duplicate'
+    assert err.nodes == [0, 1]
+
+def test_degree():
+    err = _kind(SQUARE[:3])
+    assert err.kind == 'degree'
+    assert err.nodes == [0, 2]
+    err = _kind(SQUARE + [(0, 4), (4, 5)])
+    assert err.kind == 'degree'
+    assert err.nodes == [0, 5]
+
+def test_disconnected():
+    other = [(a + 10, b + 10) for a, b in SQUARE]
+    err = _kind(SQUARE + other + [(a + 20, b + 20) for a, b in SQUARE])
+    assert err.kind == 'disconnected'
+    assert err.num_loops == 3
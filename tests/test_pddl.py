@@ -0,0 +1,91 @@
+import io
+import os
+
+import pytest
+
+from slitherlink import asp
+from slitherlink import pddl
+
+from helpers import TOPDIR, makeProb, writeAsp
+
+# The problem without its header of comments and the empty lines at its end
+def _body(text):
+    return text[text.index('(define'):].rstrip('\n')
+
+def _roundTrip(text):
+    problem = pddl.readProblem(io.StringIO(text))
+    fout = io.StringIO()
+    pddl.writeGraphs(fout, *problem.args())
+    return problem, fout.getvalue().rstrip('\n')
+
+@pytest.mark.parametrize('seeds, start_edge, preprocess', [((0,), False, False),
+                                                           ((0, 1, 2), True, False),
+                                                           ((0, 1), True, True)])
+def test_round_trip_gen(seeds, start_edge, preprocess):
+    prob = makeProb(6, 5, seeds = seeds, start_edge = start_edge, preprocess = preprocess)
+    text = prob.toPddl()
+    problem, out = _roundTrip(text)
+    assert out == _body(text)
+    assert len(problem.graphs) == len(prob.graphs)
+    assert problem.upper
+    assert pddl.headerGrids(problem) == (prob.puzzles, prob.solutions)
+
+@pytest.mark.parametrize('start_edge', [False, True])
+def test_round_trip_asp(start_edge):
+    fn = os.path.join(TOPDIR, 'asp-2011', '01-generalized_slitherlink-0-0.asp')
+    fout = io.StringIO()
+    asp.convert(fn, fout, start_edge = start_edge)
+    text = fout.getvalue()
+    problem, out = _roundTrip(text)
+    assert out == _body(text)
+    assert len(problem.graphs) == 1
+
+# Records the calls of write()
+class _Writes(object):
+    def __init__(self):
+        self.writes = []
+
+    def write(self, text):
+        self.writes += [text]
+
+def test_write_joined_in_chunks():
+    num = 2 * pddl.CHUNK_SIZE + 3
+    fout = _Writes()
+    # A generator, so the items are not in memory all at once
+    pddl.writeJoined(fout, ', ', (f'x{i}' for i in range(num)))
+    assert ''.join(fout.writes) == ', '.join([f'x{i}' for i in range(num)])
+    # Three chunks and the separators between them
+    assert len(fout.writes) == 5
+    assert max([w.count(', ') for w in fout.writes]) == pddl.CHUNK_SIZE - 1
+
+    fout = _Writes()
+    pddl.writeJoined(fout, ', ', iter([]))
+    assert fout.writes == []
+
+# Both converters write a large problem in many small pieces
+def test_converters_stream(tmp_path):
+    prob = makeProb(100, 100)
+    fout = _Writes()
+    prob.writePddl(fout)
+    total = sum([len(w) for w in fout.writes])
+    assert max([len(w) for w in fout.writes]) < total / 8
+
+    fn = str(tmp_path / 'p.asp')
+    writeAsp(prob.puzzles[0], fn)
+    fout = _Writes()
+    asp.convert(fn, fout)
+    total = sum([len(w) for w in fout.writes])
+    assert max([len(w) for w in fout.writes]) < total / 8
+
+def test_write_problem():
+    fout = io.StringIO()
+    pddl.writeProblem(fout, 'p', [('node', iter(['a', 'b']))],
+                      [iter(['(x a)', '(y b)']), ['(z)']], [['(g a)']])
+    assert fout.getvalue() == '(define (problem p)\n(:domain slitherlink)\n\n' \
+                              '(:objects\n    a b - node\n)\n\n' \
+                              '(:init\n    (x a)\n    (y b)\n\n    (z)\n)\n' \
+                              '(:goal\n    (and\n        (g a)\n    )\n)\n)\n\n\n'
+
+def test_missing_section():
+    with pytest.raises(ValueError):
+        pddl.readProblem(io.StringIO('(define (problem p) (:objects a - node))'))
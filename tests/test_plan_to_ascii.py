@@ -0,0 +1,86 @@
+import io
+import os
+
+from slitherlink import graph
+from slitherlink import synth
+
+from helpers import loadScript, makeProb, writeProb, planLines, writePlanFile
+
+p2a = loadScript('generator-solver/plan-to-ascii.py')
+
+# The drawings of the loops of the solutions of the problem
+def _loops(prob):
+    return [p2a.render(chain) for chain in prob.plans]
+
+def _text(rows):
+    return ''.join([row + '\n' for row in rows])
+
+# A plan of three puzzles of different sizes, tmp_path/sas_plan
+def _plan(tmp_path):
+    prob = makeProb(3, 4, seeds = (0,))
+    for seed, (rows, cols) in [(1, (5, 5)), (2, (2, 6))]:
+        prob.add(*synth.randomPuzzle(rows, cols, seed = seed))
+    fnplan = str(tmp_path / 'sas_plan')
+    writePlanFile(fnplan, planLines(prob))
+    return prob, fnplan
+
+def test_read_links(tmp_path):
+    prob, fnplan = _plan(tmp_path)
+    with open(fnplan, 'r') as fin:
+        links = p2a.readLinks(fin)
+    assert sorted(links.keys(), key = p2a.prefixIdx) == ['n', 'n1', 'n2']
+    for i, p in enumerate(['n', 'n1', 'n2']):
+        assert sorted([tuple(sorted(x)) for x in links[p]]) \
+                    == sorted([tuple(sorted(x)) for x in prob.plans[i]])
+
+def test_render():
+    assert p2a.render([((0, 0), (0, 1)), ((0, 1), (1, 1)), ((1, 1), (1, 0)),
+                       ((1, 0), (0, 0))]) == ['+-+', '| |', '+-+']
+    assert p2a.sideBySide([['+-+', '| |', '+-+'], ['+ +-+']]) \
+                == ['+-+  + +-+', '| |', '+-+']
+
+def test_all_and_split(tmp_path, capsys):
+    prob, fnplan = _plan(tmp_path)
+    loops = _loops(prob)
+    assert p2a.main(fnplan, 'all') == 0
+    assert capsys.readouterr().out == _text(p2a.sideBySide(loops))
+
+    for i in range(3):
+        assert p2a.main(fnplan, str(i)) == 0
+        assert capsys.readouterr().out == _text(loops[i])
+
+    outdir = str(tmp_path / 'split')
+    assert p2a.main(fnplan, 'split', outdir) == 0
+    assert sorted(os.listdir(outdir)) == ['puzzle-0.txt', 'puzzle-1.txt', 'puzzle-2.txt']
+    for i in range(3):
+        with open(os.path.join(outdir, f'puzzle-{i}.txt'), 'r') as fin:
+            assert fin.read() == _text(loops[i])
+
+def test_stdin_and_map(tmp_path, capsys, monkeypatch):
+    prob, fnplan = _plan(tmp_path)
+    lines = planLines(prob)
+    pairs = graph.compactNames(prob.graphs)
+    fnmap = str(tmp_path / 'p.map')
+    with open(fnmap, 'w') as fout:
+        graph.writeNameMap(fout, pairs)
+    # The plan of the problem with compact names
+    compact = {old : new for new, old in pairs}
+    lines = [' '.join([compact.get(x, x) for x in line[1:-1].split()]) for line in lines]
+    assert not any(['n-' in line for line in lines])
+    monkeypatch.setattr('sys.stdin', io.StringIO(''.join([f'({x})\n' for x in lines])))
+    assert p2a.main('-', 'all', fnmap = fnmap) == 0
+    assert capsys.readouterr().out == _text(p2a.sideBySide(_loops(prob)))
+
+def test_draws_linked_edges(tmp_path, capsys):
+    prob = makeProb(5, 5, seeds = (2, 4), start_edge = True, preprocess = True)
+    fn = writeProb(prob, str(tmp_path), 'p')
+    fnplan = str(tmp_path / 'sas_plan')
+    writePlanFile(fnplan, planLines(prob))
+
+    assert p2a.main(fnplan, 'all', fnprob = fn) == 0
+    assert capsys.readouterr().out == _text(p2a.sideBySide(_loops(prob)))
+
+    # Without the problem, the pre-linked edges are missing
+    assert p2a.main(fnplan, '1') == 0
+    out = capsys.readouterr().out
+    assert out != _text(_loops(prob)[1])
@@ -0,0 +1,125 @@
+import os
+import re
+import subprocess
+import sys
+import time
+
+import pytest
+
+from slitherlink import puzzleloop
+
+from helpers import TESTDIR, TOPDIR, loadScript
+
+gp = loadScript('generator-solver/generate-pddl.py')
+
+# Saved pages served in this order: two puzzles, a rotation of the first
+# one, a page without a puzzle and a 7x7 puzzle
+HTMLDIR = os.path.join(TESTDIR, 'html')
+PUZZLE_01 = ['2....', '3..2.', '.1...', '3.3.2', '2.2.2']
+
+def _read(fn):
+    with open(os.path.join(HTMLDIR, fn), 'r') as fin:
+        return fin.read()
+
+# Starts serve-puzzles.py on a free port, returns the process and its URL
+def _serve(*args):
+    proc = subprocess.Popen([sys.executable,
+                             os.path.join(TOPDIR, 'generator-solver', 'serve-puzzles.py')]
+                                + [str(a) for a in args],
+                            stderr = subprocess.PIPE, text = True)
+    line = proc.stderr.readline()
+    m = re.match(r'Serving on (\S+)', line)
+    if m is None:
+        proc.kill()
+        proc.wait()
+        raise RuntimeError(f'serve-puzzles.py: {line}')
+    return proc, m.group(1)
+
+@pytest.fixture
+def server():
+    procs = []
+    def start(*args):
+        proc, url = _serve(*args)
+        procs.append(proc)
+        return url
+    yield start
+    for proc in procs:
+        proc.terminate()
+        proc.wait()
+
+def test_parse_loop_table():
+    assert puzzleloop.parseLoopTable(_read('01-5x5.html')) == PUZZLE_01
+    assert len(puzzleloop.parseLoopTable(_read('05-7x7.html'))) == 7
+    assert puzzleloop.parseLoopTable(puzzleloop.renderPage(PUZZLE_01)) == PUZZLE_01
+
+    with pytest.raises(ValueError, match = 'No LoopTable'):
+        puzzleloop.parseLoopTable(_read('04-error.html'))
+    with pytest.raises(ValueError, match = 'Invalid cell "5"'):
+        puzzleloop.parseLoopTable(puzzleloop.renderPage(['5.', '..']))
+    with pytest.raises(ValueError, match = 'not a rectangular'):
+        puzzleloop.parseLoopTable(puzzleloop.renderPage(['..', '..', '.']))
+
+def test_rate_limiter():
+    limiter = puzzleloop.RateLimiter(20)
+    t = time.monotonic()
+    for _ in range(5):
+        limiter.wait()
+    assert time.monotonic() - t >= 0.19
+
+    limiter = puzzleloop.RateLimiter(0)
+    t = time.monotonic()
+    for _ in range(100):
+        limiter.wait()
+    assert time.monotonic() - t < 0.1
+
+def test_session_retries(server):
+    url = server('--fail-every', 3, 0, HTMLDIR)
+    session = puzzleloop.Session(rate = 0, retries = 1, backoff = 0.01)
+    pages = [session.get(url) for _ in range(4)]
+    session.close()
+    # The third request fails and is retried
+    assert session.num_requests == 5
+    assert pages == [_read(fn) for fn in sorted(os.listdir(HTMLDIR))[:4]]
+
+    url = server('--fail-every', 1, 0, HTMLDIR)
+    session = puzzleloop.Session(rate = 0, retries = 2, backoff = 0.01)
+    with pytest.raises(RuntimeError, match = 'HTTP 503'):
+        session.get(url)
+    session.close()
+    assert session.num_requests == 3
+
+def test_session_synthetic(server):
+    url = server(0)
+    session = puzzleloop.Session(rate = 0, retries = 2, backoff = 0.01)
+    puzzle = puzzleloop.parseLoopTable(session.get(puzzleloop.puzzleUrl('7x7 normal', url)))
+    assert len(puzzle) == 7 and len(puzzle[0]) == 7
+    # Client errors are not retried
+    with pytest.raises(RuntimeError, match = 'HTTP 404'):
+        session.get(url + '&size=99')
+    session.close()
+    assert session.num_requests == 2
+
+def test_download_bulk(server, tmp_path, capsys):
+    url = server('--fail-every', 3, 0, HTMLDIR)
+    out = str(tmp_path / 'out')
+    assert gp.downloadBulk('5x5 normal', 6, out, jobs = 1, rate = 0, url = url) == -1
+    lines = capsys.readouterr().out.split('\n')
+    assert 'DUP  5x5-normal-0002' in lines
+    assert 'DUP  5x5-normal-0005' in lines
+    assert any([x.startswith('FAIL 5x5-normal-0003: No LoopTable') for x in lines])
+    assert 'Wrote 3/6, duplicates 2, failed 1' in lines
+    # Two of the 6 pages are retried
+    assert any([x.startswith('8 requests in ') for x in lines])
+    assert sorted(os.listdir(out)) == ['5x5-normal-0000.pddl', '5x5-normal-0000.plan',
+                                       '5x5-normal-0001.pddl', '5x5-normal-0001.plan',
+                                       '5x5-normal-0004.pddl', '5x5-normal-0004.plan',
+                                       'html']
+    assert len(os.listdir(os.path.join(out, 'html'))) == 6
+
+    new = str(tmp_path / 'new')
+    assert gp.parseHtml(os.path.join(out, 'html'), new, jobs = 1) == -1
+    assert 'Wrote 3/6, duplicates 2, failed 1' in capsys.readouterr().out.split('\n')
+    assert sorted(os.listdir(new)) == sorted([x for x in os.listdir(out) if x != 'html'])
+    for fn in [x for x in os.listdir(new) if x.endswith('.plan')]:
+        with open(os.path.join(out, fn), 'r') as f1, open(os.path.join(new, fn), 'r') as f2:
+            assert f1.read() == f2.read()
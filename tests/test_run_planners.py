@@ -0,0 +1,140 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+from helpers import STUB_PLANNER, loadScript, makeProb, writeProb, planLines, \
+        writePlanFile
+
+rp = loadScript('run-planners.py')
+
+def _stub(*args):
+    return ' '.join([sys.executable, STUB_PLANNER] + [str(a) for a in args])
+
+# Two problems in tmp_path/problems with their optimal plans in
+# tmp_path/sols/NAME.sol
+@pytest.fixture
+def problems(tmp_path):
+    probdir = tmp_path / 'problems'
+    soldir = tmp_path / 'sols'
+    probdir.mkdir()
+    soldir.mkdir()
+    fns = []
+    for i in range(2):
+        prob = makeProb(4, 4, seeds = (i,))
+        fns += [writeProb(prob, str(probdir), f'p{i}')]
+        writePlanFile(str(soldir / f'p{i}.sol'), planLines(prob))
+    return fns, str(soldir)
+
+def _job(fn, template, outdir, time_limit = None, cpu_limit = None,
+         memory_limit = None):
+    return (fn, template, os.path.join(rp.TOPDIR, 'domain.pddl'), str(outdir),
+            time_limit, cpu_limit, memory_limit)
+
+def test_solved(problems, tmp_path):
+    fns, soldir = problems
+    res = rp.runJob(_job(fns[0], _stub('plan', soldir + '/{name}.sol', '{plan}'), tmp_path))
+    assert res['status'] == 'solved'
+    assert res['optimal'] is True
+    assert os.path.isfile(res['plan'])
+
+def test_sas_plan_in_workdir(problems, tmp_path):
+    fns, soldir = problems
+    res = rp.runJob(_job(fns[0], _stub('plan', soldir + '/{name}.sol', 'sas_plan'), tmp_path))
+    assert res['status'] == 'solved'
+
+def test_invalid(problems, tmp_path):
+    fns, soldir = problems
+    # The plan of the other problem
+    res = rp.runJob(_job(fns[0], _stub('plan', soldir + '/p1.sol', '{plan}'), tmp_path))
+    assert res['status'] == 'invalid'
+    assert len(res['errors']) > 0
+
+def test_timeout(problems, tmp_path):
+    fns, _ = problems
+    res = rp.runJob(_job(fns[0], _stub('sleep', 30), tmp_path, time_limit = 0.5))
+    assert res['status'] == 'timeout'
+    assert res['wall_time'] < 10
+
+def test_timeout_with_truncated_plan(problems, tmp_path):
+    fns, soldir = problems
+    res = rp.runJob(_job(fns[0], _stub('partial', soldir + '/{name}.sol', '{plan}', 30),
+                         tmp_path, time_limit = 1))
+    assert res['status'] == 'timeout'
+
+def test_cpu_limit(problems, tmp_path):
+    fns, _ = problems
+    res = rp.runJob(_job(fns[0], _stub('spin'), tmp_path, time_limit = 30, cpu_limit = 1))
+    assert res['status'] == 'cpu-limit'
+
+def test_memory_limit(problems, tmp_path):
+    fns, _ = problems
+    res = rp.runJob(_job(fns[0], _stub('exit', 22), tmp_path, memory_limit = 2000))
+    assert res['status'] == 'memory-limit'
+
+def test_limited_command():
+    assert rp._limitedCommand('plan', 10, 1.5) == 'ulimit -t 10; ulimit -v 1536; exec plan'
+    assert rp._limitedCommand('plan', None, None) == 'exec plan'
+
+def test_invalid_limits(problems, tmp_path):
+    fns, _ = problems
+    fnres = tmp_path / 'results.jsonl'
+    fnres.write_text('{}\n')
+    for opt, value in [('--cpu-limit', '1.5'), ('--memory-limit', 'lots'),
+                       ('--time-limit', '-1')]:
+        p = subprocess.run([sys.executable, os.path.join(rp.TOPDIR, 'run-planners.py'),
+                            opt, value, '1', _stub('exit', 0), str(tmp_path / 'out'),
+                            str(fnres)] + fns, stderr = subprocess.PIPE, text = True)
+        assert p.returncode != 0
+        assert f'Invalid {opt} "{value}"' in p.stderr
+        # The results are not truncated
+        assert fnres.read_text() == '{}\n'
+
+def test_no_plan_and_error(problems, tmp_path):
+    fns, _ = problems
+    assert rp.runJob(_job(fns[0], _stub('exit', 0), tmp_path))['status'] == 'no-plan'
+    assert rp.runJob(_job(fns[0], _stub('exit', 1), tmp_path))['status'] == 'error'
+
+def test_status():
+    assert rp._status(0, False, True, True, 0, None) == 'solved'
+    assert rp._status(0, False, True, False, 0, None) == 'invalid'
+    assert rp._status(-9, True, True, False, 0, None) == 'timeout'
+    assert rp._status(-9, True, True, True, 0, None) == 'solved'
+    assert rp._status(-24, False, False, False, 1, 1) == 'cpu-limit'
+    assert rp._status(-9, False, False, False, 1.2, 1) == 'cpu-limit'
+    assert rp._status(23, False, False, False, 0, None) == 'cpu-limit'
+    assert rp._status(20, False, False, False, 0, None) == 'memory-limit'
+
+def _results(fn):
+    with open(fn, 'r') as fin:
+        return [json.loads(line) for line in fin]
+
+def test_resume(problems, tmp_path):
+    fns, soldir = problems
+    outdir = str(tmp_path / 'out')
+    fnres = str(tmp_path / 'results.jsonl')
+    # p0 solved earlier, p1 timed out, and a truncated last line
+    with open(fnres, 'w') as fout:
+        fout.write(json.dumps({'problem' : fns[0], 'name' : 'p0', 'status' : 'solved',
+                               'optimal' : True, 'earlier' : True}) + '\n')
+        fout.write(json.dumps({'problem' : fns[1], 'name' : 'p1', 'status' : 'timeout',
+                               'earlier' : True}) + '\n')
+        fout.write('{"problem" : "')
+
+    template = _stub('plan', soldir + '/{name}.sol', '{plan}')
+    assert rp.run(1, template, outdir, fnres, fns, resume = True) == 0
+    res = _results(fnres)
+    assert [r['name'] for r in res] == ['p0', 'p1']
+    assert res[0].get('earlier') is True
+    assert res[1].get('earlier') is None
+    assert res[1]['status'] == 'solved'
+
+    # Nothing is left to run
+    assert rp.run(1, _stub('exit', 1), outdir, fnres, fns, resume = True) == 0
+    assert [r['status'] for r in _results(fnres)] == ['solved', 'solved']
+
+    # Without resume, everything is run again
+    assert rp.run(1, _stub('exit', 1), outdir, fnres, fns) == 0
+    assert [r['status'] for r in _results(fnres)] == ['error', 'error']
@@ -0,0 +1,152 @@
+import io
+import collections
+
+import pytest
+
+from slitherlink import sas
+from slitherlink import solver
+from slitherlink import validate
+from slitherlink.generator import Prob
+
+from helpers import makeProb, planLines
+
+# A task read from the output of sas.writeGraphs(): the values of the
+# variables, the initial state, the goal as pairs (var, value) and the
+# effects (var, pre, post) of the operators by their names
+class SasTask(object):
+    def __init__(self, text):
+        lines = iter(text.split('\n'))
+        def expect(value):
+            line = next(lines)
+            assert line == value, (line, value)
+        def ints():
+            return [int(x) for x in next(lines).split()]
+
+        expect('begin_version')
+        expect('3')
+        expect('end_version')
+        expect('begin_metric')
+        expect('0')
+        expect('end_metric')
+        self.values = []
+        for var in range(ints()[0]):
+            expect('begin_variable')
+            expect(f'var{var}')
+            expect('-1')
+            self.values += [[next(lines) for _ in range(ints()[0])]]
+            expect('end_variable')
+        for _ in range(ints()[0]):
+            expect('begin_mutex_group')
+            for _ in range(ints()[0]):
+                var, val = ints()
+                assert 0 <= val < len(self.values[var])
+            expect('end_mutex_group')
+        expect('begin_state')
+        self.init = [ints()[0] for _ in self.values]
+        expect('end_state')
+        expect('begin_goal')
+        self.goal = [tuple(ints()) for _ in range(ints()[0])]
+        expect('end_goal')
+        self.ops = {}
+        for _ in range(ints()[0]):
+            expect('begin_operator')
+            name = next(lines)
+            assert name not in self.ops
+            assert ints() == [0]
+            self.ops[name] = [tuple(ints()[1:]) for _ in range(ints()[0])]
+            expect('1')
+            expect('end_operator')
+        expect('0')
+        assert list(lines) == ['']
+        for var, val in enumerate(self.init):
+            assert 0 <= val < len(self.values[var])
+
+    def applicable(self, state):
+        return set([name for name, eff in self.ops.items()
+                        if all([state[var] == pre for var, pre, _ in eff])])
+
+    def apply(self, state, name):
+        state = list(state)
+        for var, pre, post in self.ops[name]:
+            assert state[var] == pre, (name, self.values[var][state[var]])
+            state[var] = post
+        return tuple(state)
+
+    def isGoal(self, state):
+        return all([state[var] == val for var, val in self.goal])
+
+def _sas(prob):
+    fout = io.StringIO()
+    counts = sas.writeGraphs(fout, prob.graphs)
+    task = SasTask(fout.getvalue())
+    assert counts == {'variables' : len(task.values), 'operators' : len(task.ops)}
+    return task
+
+@pytest.mark.parametrize('size, seeds, start_edge, preprocess', [(6, (0,), False, False),
+                                                                 (6, (1,), True, False),
+                                                                 (6, (2, 3), True, False),
+                                                                 (6, (4,), True, True),
+                                                                 (10, (4, 5), True, True)])
+def test_plan_reaches_goal(size, seeds, start_edge, preprocess):
+    prob = makeProb(size, size, seeds = seeds, start_edge = start_edge,
+                    preprocess = preprocess)
+    task = _sas(prob)
+    lines = planLines(prob)
+    state = tuple(task.init)
+    # Preprocessing may link every edge of small puzzles
+    assert task.isGoal(state) == (len(lines) == 0)
+    for line in lines:
+        state = task.apply(state, line[1:-1])
+    assert task.isGoal(state)
+
+# Name of the link action applicable to the edge of the PDDL task in the
+# state, and the next state, or None
+def _link(task, state, n1, n2, e):
+    linked, degree, cap, disabled = state
+    c1, c2 = task.edge_cells[2 * e], task.edge_cells[2 * e + 1]
+    if cap[c1] < 1 or cap[c2] < 1 or degree[n1] > 1 or degree[n2] > 1:
+        return None
+    levels = task.level_names
+    args = [f'link-{degree[n1]}-{degree[n2]}', task.node_names[n1], task.node_names[n2],
+            task.cell_names[c1], levels[cap[c1]], levels[cap[c1] - 1],
+            task.cell_names[c2], levels[cap[c2]], levels[cap[c2] - 1]]
+    linked = set(linked)
+    degree = list(degree)
+    cap = list(cap)
+    st = [disabled]
+    if validate._apply(task, args, cap, degree, linked, st) is not None:
+        return None
+    return ' '.join(args), (frozenset(linked), tuple(degree), tuple(cap), st[0])
+
+# Every state reachable in the PDDL task has exactly the same applicable
+# actions as the corresponding state of the grounded task
+@pytest.mark.parametrize('puzzle, start_edge', [(['3.', '.2', '2.'], False),
+                                                (['3.', '.2', '2.'], True),
+                                                (['.3.', '2..'], False),
+                                                (['0..', '.3.'], True)])
+def test_reachable_states(puzzle, start_edge):
+    prob = Prob(use_start_edge = start_edge)
+    prob.add(puzzle, solver.solveGrid(puzzle).rstrip('\n').split('\n'))
+    task = validate.loadPddl(io.StringIO(prob.toPddl()))
+    sas_task = _sas(prob)
+
+    init = (frozenset(task.linked), tuple(task.degree), tuple(task.cap), task.disabled)
+    seen = {init : tuple(sas_task.init)}
+    queue = collections.deque([init])
+    goals = 0
+    while len(queue) > 0:
+        state = queue.popleft()
+        sas_state = seen[state]
+        succ = [_link(task, state, n1, n2, e) for (n1, n2), e in task.edges.items()]
+        succ = [x for x in succ if x is not None]
+        assert set([name for name, _ in succ]) == sas_task.applicable(sas_state)
+        for name, nxt in succ:
+            sas_nxt = sas_task.apply(sas_state, name)
+            if nxt in seen:
+                assert seen[nxt] == sas_nxt
+                continue
+            seen[nxt] = sas_nxt
+            queue.append(nxt)
+        if sas_task.isGoal(sas_state):
+            goals += 1
+    assert goals > 0
@@ -0,0 +1,96 @@
+import random
+
+import pytest
+
+from slitherlink import grid as gridmod
+from slitherlink import loop
+from slitherlink import solver
+from slitherlink import synth
+
+# All loops of a rows x cols grid as pairs (frozenset of edges, clue of
+# every cell): every loop is the border of the set of cells inside of it,
+# so it is enough to check the borders of all sets of cells
+def _loops(rows, cols):
+    g = gridmod.Grid(rows, cols)
+    out = []
+    for mask in range(1, 1 << g.num_inner_cells):
+        inside = [c < g.num_inner_cells and (mask >> c) & 1 for c in range(g.num_cells)]
+        edges = [e for e in range(g.num_edges)
+                     if inside[g.edge_cells[2 * e]] != inside[g.edge_cells[2 * e + 1]]]
+        try:
+            loop.chainLoop([g.edgeNodes(e) for e in edges])
+        except loop.LoopError:
+            continue
+        clues = [0] * g.num_inner_cells
+        for e in edges:
+            for c in g.edgeCells(e):
+                if c < g.num_inner_cells:
+                    clues[c] += 1
+        out += [(frozenset(edges), clues)]
+    return g, out
+
+_LOOPS = {}
+
+# Brute-force solutions of the puzzle as sets of edges
+def _solutions(puzzle):
+    rows, cols = len(puzzle), len(puzzle[0])
+    if (rows, cols) not in _LOOPS:
+        _LOOPS[(rows, cols)] = _loops(rows, cols)
+    g, loops = _LOOPS[(rows, cols)]
+    given = [(r * cols + c, int(ch)) for r, row in enumerate(puzzle)
+                 for c, ch in enumerate(row) if ch != '.']
+    return g, [edges for edges, clues in loops
+                   if all([clues[c] == clue for c, clue in given])]
+
+# Edges of the loop drawn by solver.gridToAscii()
+def _asciiEdges(g, text):
+    lines = text.rstrip('\n').split('\n')
+    out = set()
+    for r in range(g.rows + 1):
+        for c in range(g.cols):
+            if lines[2 * r][2 * c + 1] == '-':
+                out.add(g.hedge[r * g.cols + c])
+    for r in range(g.rows):
+        for c in range(g.cols + 1):
+            if lines[2 * r + 1][2 * c] == '|':
+                out.add(g.vedge[r * (g.cols + 1) + c])
+    return frozenset(out)
+
+def _puzzles(num, seed):
+    rnd = random.Random(seed)
+    out = []
+    for _ in range(num):
+        rows, cols = rnd.choice([(1, 3), (2, 2), (2, 3), (3, 3), (3, 4)])
+        if rnd.random() < 0.5:
+            out += [[''.join([rnd.choice('..0123') for _ in range(cols)])
+                         for _ in range(rows)]]
+        else:
+            puzzle, _ = synth.randomPuzzle(rows, cols, seed = rnd.randrange(1000),
+                                           clue_prob = rnd.choice([0.3, 0.5, 0.8]))
+            out += [puzzle]
+    return out
+
+# Puzzles whose smallest loop is found only if a loop closed by probing is
+# checked against the bound as well
+_MINIMIZE = [['...', '2..', '..3'], ['2..2', '....', '.2..']]
+
+@pytest.mark.parametrize('puzzle', _puzzles(60, 8) + _MINIMIZE)
+def test_brute_force(puzzle):
+    g, sols = _solutions(puzzle)
+    assert solver.countGridSolutions(puzzle, limit = 1000) == len(sols)
+    text = solver.solveGrid(puzzle)
+    best = solver.solveGrid(puzzle, minimize = True)
+    if len(sols) == 0:
+        assert text is None and best is None
+        return
+    assert _asciiEdges(g, text) in sols
+    assert _asciiEdges(g, best) in sols
+    assert len(_asciiEdges(g, best)) == min([len(s) for s in sols])
+
+def test_synthetic():
+    for seed in range(5):
+        puzzle, solution = synth.randomPuzzle(10, 12, seed = seed, clue_prob = 0.8)
+        text = solver.solveGrid(puzzle)
+        assert text is not None
+        if solver.countGridSolutions(puzzle) == 1:
+            assert text.rstrip('\n').split('\n') == solution
@@ -0,0 +1,70 @@
+import io
+
+import pytest
+
+from slitherlink import pddl
+from slitherlink import split
+from slitherlink import validate
+
+from helpers import makeProb, planLines
+
+def _steps(lines):
+    return validate.readPlan(io.StringIO('\n'.join(lines) + '\n'))
+
+def _task(name, graphs):
+    fout = io.StringIO()
+    pddl.writeGraphs(fout, name, graphs, 5, upper = True)
+    return validate.loadPddl(io.StringIO(fout.getvalue()))
+
+# Splits the problem read from its text, validates the steps of the plan of
+# every part against the part alone, and the merged plans of the parts in
+# reverse order against the whole problem
+def _checkSplit(text, lines, num_parts):
+    problem = pddl.readProblem(io.StringIO(text))
+    parts = split.splitGraphs(problem.graphs)
+    assert len(parts) == num_parts
+    whole = validate.loadPddl(io.StringIO(text))
+    steps = _steps(lines)
+    plans = []
+    for _, g in parts:
+        task = _task(problem.name, [g])
+        own = [s for s in steps if s[1][1] in task.nodes]
+        res = validate.validate(task, own)
+        assert res['valid'], res['errors']
+        plans += [own]
+    assert sum([len(p) for p in plans]) == len(steps)
+    res = validate.validate(whole, split.mergePlans(plans[::-1]), len(steps))
+    assert res['valid'], res['errors']
+    assert res['optimal']
+
+def test_split_puzzles():
+    prob = makeProb(5, 5, seeds = (0, 1, 2), start_edge = True)
+    _checkSplit(prob.toPddl(), planLines(prob), 3)
+
+def test_split_compact_names():
+    # Without the index of the puzzle in the names, all objects are read
+    # into one graph and the components are found over its edges
+    prob = makeProb(4, 5, seeds = (3, 4), start_edge = True)
+    text = prob.toPddl()
+    lines = planLines(prob)
+    for a, b in [('n1-', 'x-'), ('cell1-', 'y-')]:
+        text = text.replace(a, b)
+        lines = [line.replace(a, b) for line in lines]
+    assert len(pddl.readProblem(io.StringIO(text)).graphs) == 1
+    _checkSplit(text, lines, 2)
+
+def test_split_prob():
+    prob = makeProb(5, 4, seeds = (5, 6), start_edge = True)
+    parts = prob.split()
+    assert [p.optimalCost() for p in parts] == [len(p) - len(g.linked)
+                                                    for p, g in zip(prob.plans, prob.graphs)]
+    assert sum([p.optimalCost() for p in parts]) == prob.optimalCost()
+
+def test_shared_link_0_0():
+    prob = makeProb(4, 4, seeds = (0, 1))
+    with pytest.raises(ValueError):
+        split.splitGraphs(prob.graphs)
+    with pytest.raises(ValueError):
+        prob.split()
+    # A single puzzle is left as it is
+    assert len(split.splitGraphs(makeProb(4, 4).graphs)) == 1
@@ -0,0 +1,96 @@
+import io
+import json
+import time
+
+from slitherlink import asp
+from slitherlink import graph
+from slitherlink import stats as statsmod
+from slitherlink import synth
+
+from helpers import loadScript, writeAsp
+
+gp = loadScript('generator-solver/generate-pddl.py')
+
+def test_phases():
+    stats = statsmod.Stats('p')
+    with stats.phase('b'):
+        time.sleep(0.01)
+    with stats.phase('a'):
+        pass
+    with stats.phase('b'):
+        time.sleep(0.01)
+    assert list(stats.phases.keys()) == ['b', 'a']
+    assert stats.phases['b'] >= 0.02
+    assert stats.total() == sum(stats.phases.values())
+    with statsmod.phase(None, 'c'):
+        pass
+
+def test_time_write():
+    stats = statsmod.Stats('p')
+    fout = io.StringIO()
+    def writer(f):
+        for i in range(1000):
+            f.write(f'{i}\n')
+        time.sleep(0.02)
+    t = time.perf_counter()
+    statsmod.timeWrite(stats, fout, writer)
+    t = time.perf_counter() - t
+    assert fout.getvalue() == ''.join([f'{i}\n' for i in range(1000)])
+    assert list(stats.phases.keys()) == ['format', 'write']
+    assert stats.phases['format'] >= 0.02
+    assert abs(stats.total() - t) < 0.01
+
+def _stats():
+    s1 = statsmod.Stats('first')
+    s1.addTime('parse', 0.5)
+    s1.counts = {'nodes' : 4}
+    s2 = statsmod.Stats('second-instance')
+    s2.addTime('parse', 0.25)
+    s2.addTime('write', 1.)
+    s2.counts = {'nodes' : 5, 'cells' : 6}
+    return [s1, s2]
+
+def test_print_table():
+    fout = io.StringIO()
+    statsmod.printStats(_stats(), fout)
+    lines = fout.getvalue().split('\n')
+    assert lines[0].split() == ['instance', 'parse', 'write', 'total', 'nodes', 'cells']
+    assert lines[1].split() == ['first', '0.500s', '-', '0.500s', '4', '-']
+    assert lines[2].split() == ['second-instance', '0.250s', '1.000s', '1.250s', '5', '6']
+    assert len(set([len(x) for x in lines[:3]])) == 1
+
+def test_print_json():
+    fout = io.StringIO()
+    statsmod.printStats(_stats(), fout, 'json')
+    rows = [json.loads(line) for line in fout.getvalue().split('\n')[:-1]]
+    assert rows[1] == {'name' : 'second-instance', 'phases' : {'parse' : 0.25, 'write' : 1.},
+                       'total' : 1.25, 'counts' : {'nodes' : 5, 'cells' : 6}}
+
+def test_asp_stats(tmp_path):
+    fn = str(tmp_path / 'p.asp')
+    writeAsp(synth.randomPuzzle(5, 6, seed = 0)[0], fn)
+    stats = statsmod.Stats(fn)
+    asp.convert(fn, io.StringIO(), start_edge = True, stats = stats)
+    for phase in ['parse', 'associate', 'outside-cells', 'index', 'solver-input',
+                  'start-edge', 'format', 'write']:
+        assert phase in stats.phases
+    assert stats.counts['nodes'] == 42
+    assert stats.counts['cells'] == 30 + 2 * 5 + 2 * 6
+    assert stats.counts['edges'] == 71
+    assert stats.counts['linked'] == 1
+    assert stats.counts['link-0-0'] == 0
+
+def test_gen_stats(tmp_path, capsys):
+    puzzle, _ = synth.randomPuzzle(5, 6, seed = 0)
+    fnpddl = str(tmp_path / 'p.pddl')
+    fnplan = str(tmp_path / 'p.plan')
+    assert gp.writePuzzle(puzzle, fnpddl, fnplan, preprocess = True, stats_fmt = 'json',
+                          stats = gp._stats(fnpddl, 'json')) == 0
+    row = json.loads(capsys.readouterr().err.strip().split('\n')[-1])
+    assert row['name'] == fnpddl
+    for phase in ['solve', 'chain', 'grid', 'preprocess', 'format', 'write']:
+        assert phase in row['phases']
+    g = graph.fromGrid(puzzle)
+    assert row['counts']['nodes'] == g.num_nodes
+    assert row['counts']['cells'] == g.num_cells
+    assert row['counts']['clues'] == len(g.clue_cells)
@@ -0,0 +1,100 @@
+import io
+
+from slitherlink import asp
+from slitherlink import synth
+from slitherlink import validate
+from slitherlink.generator import Prob, writeProblem
+
+from helpers import makeProb, planLines, loopPlanLines, writeAsp
+
+def _task(prob):
+    fout = io.StringIO()
+    writeProblem(prob, fout)
+    return validate.loadPddl(io.StringIO(fout.getvalue()))
+
+def _steps(lines):
+    return validate.readPlan(io.StringIO('\n'.join(lines) + '\n; cost = 1\n'))
+
+def test_valid():
+    prob = makeProb(5, 6, seeds = (1, 2), start_edge = True)
+    lines = planLines(prob)
+    res = validate.validate(_task(prob), _steps(lines), len(lines))
+    assert res['valid'], res['errors']
+    assert res['optimal'] is True
+    assert res['cost'] == len(lines)
+
+def test_valid_start_edge():
+    prob = makeProb(5, 5, seeds = (4,), start_edge = True)
+    lines = planLines(prob)
+    res = validate.validate(_task(prob), _steps(lines))
+    assert res['valid'], res['errors']
+    assert res['optimal'] is None
+
+# The edges pre-linked by --preprocess are left out of the optimal plan
+def test_valid_preprocessed_gen():
+    prob = makeProb(5, 5, seeds = (2, 4), start_edge = True, preprocess = True)
+    assert prob.num_linked > 20
+    lines = planLines(prob)
+    res = validate.validate(_task(prob), _steps(lines), prob.optimalCost())
+    assert res['valid'], res['errors']
+    assert res['optimal'] is True
+
+def test_valid_preprocessed_asp(tmp_path):
+    puzzle, solution = synth.randomPuzzle(8, 8, seed = 1)
+    fn = str(tmp_path / 'p.asp')
+    writeAsp(puzzle, fn)
+    fout = io.StringIO()
+    asp.convert(fn, fout, preprocess = True)
+    task = validate.loadPddl(io.StringIO(fout.getvalue()))
+    assert len(task.linked) > 0
+
+    prob = Prob()
+    prob.add(puzzle, solution)
+    chain = [(f'n-{a[0] * 9 + a[1]}', f'n-{b[0] * 9 + b[1]}') for a, b in prob.plans[0]]
+    lines = loopPlanLines(task, [chain])
+    res = validate.validate(task, _steps(lines), len(chain) - len(task.linked))
+    assert res['valid'], res['errors']
+    assert res['optimal'] is True
+
+def test_not_optimal():
+    prob = makeProb(4, 4)
+    lines = planLines(prob)
+    res = validate.validate(_task(prob), _steps(lines), len(lines) - 1)
+    assert res['valid']
+    assert res['optimal'] is False
+
+def test_unknown_action():
+    prob = makeProb(4, 4)
+    res = validate.validate(_task(prob), _steps(['(unlink a b)']))
+    assert not res['valid']
+    assert 'Unknown action' in res['errors'][0]
+
+def test_step_twice():
+    prob = makeProb(4, 4)
+    lines = planLines(prob)
+    res = validate.validate(_task(prob), _steps(lines[:2] + lines[1:2]))
+    assert not res['valid']
+    assert res['errors'][0].startswith('Step 3 (line 3)')
+
+def test_incomplete():
+    prob = makeProb(4, 4)
+    lines = planLines(prob)
+    res = validate.validate(_task(prob), _steps(lines[:-1]))
+    assert not res['valid']
+    assert 'degree 1' in res['errors'][0]
+
+def test_clues_unmet():
+    # The plan of the first of two puzzles leaves the second one unsolved
+    prob = makeProb(4, 4, seeds = (0, 1), start_edge = True)
+    lines = planLines(prob)
+    first = len(prob.plans[0])
+    res = validate.validate(_task(prob), _steps(lines[:first]))
+    assert not res['valid']
+    assert any(['clue' in err for err in res['errors']])
+
+def test_malformed_plan():
+    try:
+        validate.readPlan(io.StringIO('link-0-0 a b\n'))
+        assert False
+    except ValueError as e:
+        assert 'line 1' in str(e)
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+import sys
+import os
+import glob
+import json
+import multiprocessing
+
+TOPDIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, TOPDIR)
+from slitherlink import validate
+from slitherlink import compress
+
+PROBLEM_EXTS = ['.pddl', '.asp', '.txt']
+
+def _printResult(res):
+    if res['valid']:
+        opt = ''
+        if res['optimal'] is True:
+            opt = ', optimal'
+        elif res['optimal'] is False:
+            opt = ', optimal cost is {0}'.format(res['optimal_cost'])
+        print('OK   {0} (cost {1}{2})'.format(res['plan'], res['cost'], opt))
+    else:
+        print('FAIL {0}: {1}'.format(res['plan'], '; '.join(res['errors'])))
+
+def check(fn_problem, fn_plan, fn_cost = None):
+    res = validate.validateFiles(fn_problem, [fn_plan], fn_cost)[0]
+    _printResult(res)
+    if not res['valid']:
+        return -1
+    return 0
+
+def _expandPlans(inp):
+    if os.path.isdir(inp):
+        fns = [os.path.join(inp, x) for x in os.listdir(inp)]
+        return sorted([x for x in fns if os.path.isfile(x)])
+    if glob.has_magic(inp):
+        return sorted(glob.glob(inp))
+    return [inp]
+
+# Returns the first of the files NAME.EXT, possibly compressed, that exists
+# in the directory or None
+def _findFile(d, name, exts):
+    for ext in exts:
+        for cext in [''] + compress.EXTS:
+            fn = os.path.join(d, name + ext + cext)
+            if os.path.isfile(fn):
+                return fn
+    return None
+
+# The problem of the plan NAME.* is NAME.pddl, NAME.asp or NAME.txt in
+# problem_dir and its optimal cost is read from NAME.plan written by
+# generate-pddl.py if it exists. All of them may be compressed.
+def _findProblem(problem_dir, fn_plan):
+    name = os.path.basename(fn_plan).split('.')[0]
+    fn_cost = _findFile(problem_dir, name, ['.plan'])
+    fn = _findFile(problem_dir, name, PROBLEM_EXTS)
+    if fn is None:
+        fn = os.path.join(problem_dir, name + '.pddl')
+    return fn, fn_cost
+
+def _batchJob(job):
+    fn_problem, fn_cost, fn_plans = job
+    return validate.validateFiles(fn_problem, fn_plans, fn_cost)
+
+def batch(num_workers, problem_dir, fn_report, inputs):
+    jobs = {}
+    for inp in inputs:
+        for fn in _expandPlans(inp):
+            if os.path.splitext(compress.stripExt(fn))[1] in PROBLEM_EXTS + ['.json']:
+                continue
+            fn_problem, fn_cost = _findProblem(problem_dir, fn)
+            if fn_cost is not None and os.path.samefile(fn, fn_cost):
+                continue
+            key = (fn_problem, fn_cost)
+            jobs.setdefault(key, [])
+            if fn not in jobs[key]:
+                jobs[key] += [fn]
+    if len(jobs) == 0:
+        print('Error: No plans', file = sys.stderr)
+        return -1
+
+    # Each problem is loaded only once for all of its plans, and the largest
+    # problems are scheduled first
+    def size(fn):
+        return os.path.getsize(fn) if os.path.isfile(fn) else 0
+    sched = sorted([(p, c, fns) for (p, c), fns in jobs.items()],
+                   key = lambda x: -size(x[0]))
+    results = []
+    with multiprocessing.Pool(num_workers) as pool:
+        for res in pool.imap_unordered(_batchJob, sched):
+            results += res
+    results.sort(key = lambda x: x['plan'])
+
+    summary = {
+        'plans' : len(results),
+        'valid' : len([r for r in results if r['valid']]),
+        'invalid' : len([r for r in results if not r['valid']]),
+        'optimal' : len([r for r in results if r['valid'] and r['optimal'] is True]),
+        'suboptimal' : len([r for r in results if r['valid'] and r['optimal'] is False]),
+        'unknown_optimum' : len([r for r in results if r['valid'] and r['optimal'] is None]),
+    }
+    for res in results:
+        _printResult(res)
+    print('Valid {0}/{1}, optimal {2}, suboptimal {3}, unknown optimum {4}'.format(
+            summary['valid'], summary['plans'], summary['optimal'],
+            summary['suboptimal'], summary['unknown_optimum']))
+
+    with open(fn_report, 'w') as fout:
+        json.dump({'summary' : summary, 'results' : results}, fout, indent = 1)
+        fout.write('\n')
+    if summary['invalid'] > 0:
+        return -1
+    return 0
+
+if __name__ == '__main__':
+    if len(sys.argv) in [3, 4]:
+        sys.exit(check(*sys.argv[1:]))
+
+    if len(sys.argv) >= 6 and sys.argv[1] == 'batch':
+        sys.exit(batch(int(sys.argv[2]), sys.argv[3], sys.argv[4], sys.argv[5:]))
+
+    print('Usage: {0} problem plan [problem.plan]'.format(sys.argv[0]), file = sys.stderr)
+    print('       {0} batch num-workers problem-dir report.json plan [plan ...]'.format(sys.argv[0]), file = sys.stderr)
+    print('', file = sys.stderr)
+    print('problem is a PDDL problem (.pddl), an ASP instance (.asp) or a puzzle with', file = sys.stderr)
+    print('one row per line. problem.plan is the file with the optimal cost written', file = sys.stderr)
+    print('by generator-solver/generate-pddl.py.', file = sys.stderr)
+    print('plan is a plan file, a directory or a glob pattern. The plan NAME.* is', file = sys.stderr)
+    print('validated against NAME.pddl, NAME.asp or NAME.txt in problem-dir and its cost is', file = sys.stderr)
+    print('compared with the optimal cost in NAME.plan if it exists.', file = sys.stderr)
+    sys.exit(-1)